@@ -0,0 +1,26 @@
+import argparse
+
+from modules.storage.journal_storage import JournalStorage
+from modules.storage.storage import Storage
+
+STORAGES: dict[str, type[Storage]] = {
+    'json': Storage,
+    'journal': JournalStorage,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Move finished games out of history.json into the binary archive')
+    parser.add_argument('--storage', choices=list(STORAGES.keys()), default='json')
+    parser.add_argument('--player', default=None, help='archive the shard of a single player')
+    parser.add_argument('--base-path', default=None, help='storage root, defaults to ./media')
+    args = parser.parse_args()
+
+    storage = STORAGES[args.storage](player_id=args.player, base_path=args.base_path)
+    archived = storage.archive_finished_games()
+
+    print(f'Archived {archived} games, {len(storage.get_archive())} in archive')
+
+
+if __name__ == '__main__':
+    main()
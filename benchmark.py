@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+
+from modules.benchmarks.suite import (
+    DEFAULT_REPEAT, DEFAULT_SIZES, DEFAULT_SUBSCRIBERS, DEFAULT_TOLERANCE, LARGE_SIZES, STARTUP_MODULES, STORAGE_BACKENDS, THRESHOLDS_PATH, BenchmarkResult, load_thresholds, run_suite
+)
+
+
+def print_result(result: BenchmarkResult) -> None:
+    print(f"{result['name']}@{result['size']}: {result['median'] * 1000:.3f} ms", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time storage, model rounds and observer dispatch across history sizes')
+    parser.add_argument('--sizes', type=int, nargs='*', default=list(DEFAULT_SIZES), help='stored games to seed before timing')
+    parser.add_argument('--large', action='store_true', help=f'also time {", ".join(map(str, LARGE_SIZES))} stored games, slow on the JSON backend')
+    parser.add_argument('--backends', choices=list(STORAGE_BACKENDS.keys()), nargs='+', default=list(STORAGE_BACKENDS.keys()))
+    parser.add_argument('--subscribers', type=int, nargs='*', default=list(DEFAULT_SUBSCRIBERS))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--imports', nargs='*', default=list(STARTUP_MODULES), help='modules to time a cold import of')
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH, help='JSON of benchmark name to the slowdown allowed against --baseline, overrides --tolerance')
+    parser.add_argument('--no-thresholds', action='store_true')
+    parser.add_argument('--baseline', default=None, help='earlier report from this machine to compare medians against, nothing is gated without it')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='allowed slowdown against the baseline')
+    parser.add_argument('--output', default=None, help='defaults to stdout')
+    args = parser.parse_args()
+
+    baseline = None
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+
+    report = run_suite(
+        [*args.sizes, *LARGE_SIZES] if args.large else args.sizes,
+        args.backends,
+        args.subscribers,
+        args.repeat,
+        args.imports,
+        None if args.no_thresholds else load_thresholds(args.thresholds),
+        baseline,
+        args.tolerance,
+        print_result
+    )
+
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    for failure in report['failures']:
+        print(f"Regression in {failure['name']}@{failure['size']}: {failure['median']:.6f}s over {failure['limit']:.6f}s", file=sys.stderr)
+
+    if len(report['failures']) > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
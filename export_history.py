@@ -0,0 +1,60 @@
+import argparse
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from modules.storage.export import EXPORTERS
+from modules.storage.journal_storage import JournalStorage
+from modules.storage.sqlite_storage import SqliteStorage
+from modules.storage.storage import Storage
+
+STORAGES: dict[str, type[Storage]] = {
+    'json': Storage,
+    'journal': JournalStorage,
+    'sqlite': SqliteStorage,
+}
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+
+    date = datetime.fromisoformat(value)
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return date.timestamp()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Stream game history to newline-delimited JSON or CSV')
+    parser.add_argument('--storage', choices=list(STORAGES.keys()), default='json')
+    parser.add_argument('--player', default=None, help='export the shard of a single player')
+    parser.add_argument('--base-path', default=None, help='storage root, defaults to ./media')
+    parser.add_argument('--format', choices=list(EXPORTERS.keys()), default='ndjson')
+    parser.add_argument('--output', default=None, help='defaults to stdout')
+    parser.add_argument('--finished-only', action='store_true')
+    parser.add_argument('--winner', choices=['human', 'computer', 'draw'], default=None)
+    parser.add_argument('--since', default=None, help='ISO date, UTC unless an offset is given')
+    parser.add_argument('--until', default=None, help='ISO date, exclusive')
+    args = parser.parse_args()
+
+    games = STORAGES[args.storage](player_id=args.player, base_path=args.base_path).iter_games(
+        args.finished_only,
+        args.winner,
+        parse_date(args.since),
+        parse_date(args.until)
+    )
+
+    if args.output is None:
+        count = EXPORTERS[args.format](games, sys.stdout)
+    else:
+        with open(args.output, 'w', newline='') as file:
+            count = EXPORTERS[args.format](games, file)
+
+    print(f'Exported {count} games', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
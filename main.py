@@ -5,7 +5,8 @@ from modules.view.view import View
 
 
 def main() -> None:
-    controller: Controller = Controller(Model(Storage()), View())
+    with Storage() as storage:
+        controller: Controller = Controller(Model(storage), View())
 
 
 if __name__ == '__main__':
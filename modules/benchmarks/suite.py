@@ -0,0 +1,286 @@
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Iterable, Optional, TypedDict
+
+from modules.model.hand import score_cards
+from modules.model.model import Model
+from modules.model.rng import StdlibRandom
+from modules.model.strategy import compare_totals
+from modules.observer.observer import Observer
+from modules.storage.aggregates import rebuild_aggregates
+from modules.storage.journal_storage import JournalStorage
+from modules.storage.memory_storage import MemoryStorage
+from modules.storage.sqlite_storage import SqliteStorage
+from modules.storage.storage import Game, Storage
+from modules.utils.compact_cards import AnyCard
+from modules.utils.constants import OBSERVER_MESSAGES
+
+BenchmarkResult = TypedDict(
+    'BenchmarkResult',
+    {
+        'name': str,
+        'size': int,
+        'number': int,
+        'repeat': int,
+        'best': float,
+        'median': float,
+        'mean': float,
+    }
+)
+
+Failure = TypedDict('Failure', { 'name': str, 'size': int, 'median': float, 'limit': float })
+
+BenchmarkReport = TypedDict(
+    'BenchmarkReport',
+    {
+        'python': str,
+        'platform': str,
+        'created_at': float,
+        'results': list[BenchmarkResult],
+        'failures': list[Failure],
+    }
+)
+
+StorageFactory = Callable[[str], Storage]
+
+DEFAULT_SIZES = (10, 1_000, 100_000)
+# a million stored games takes the JSON backend most of an hour, so only --large runs it
+LARGE_SIZES = (1_000_000,)
+DEFAULT_SUBSCRIBERS = (1, 100, 10_000)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 1.5
+MIN_SAMPLE_TIME = 0.02
+# one call this slow is already a stable sample, repeating it only makes the run longer
+SLOW_CALL_TIME = 1.0
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), 'thresholds.json')
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STARTUP_MODULES = ('modules.headless', 'modules.simulation.simulation', 'modules.server.server', 'modules.controller.controller')
+
+STORAGE_BACKENDS: dict[str, StorageFactory] = {
+    'json': lambda base_path: Storage(compact_cards=True, base_path=base_path),
+    'journal': lambda base_path: JournalStorage(compact_cards=True, base_path=base_path),
+    'sqlite': lambda base_path: SqliteStorage(compact_cards=True, base_path=base_path),
+    'memory': lambda base_path: MemoryStorage(compact_cards=True),
+}
+
+BET = { 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } }
+WINNERS = { 1: 'human', -1: 'computer', 0: None }
+BET_RESULTS = { 1: 'WIN', -1: 'LOSE', 0: 'DRAW' }
+
+
+def get_result_key(name: str, size: int) -> str:
+    return f'{name}@{size}'
+
+
+def create_games(count: int, seed: int = 0) -> list[Game]:
+    rng = random.Random(seed)
+    games: list[Game] = []
+
+    for index in range(count):
+        cards: list[AnyCard] = [*rng.sample(range(52), 6)]
+        human = cards[:2 + rng.randint(0, 1)]
+        computer = cards[3:5 + rng.randint(0, 1)]
+        human_score, _ = score_cards(human, False)
+        computer_score, _ = score_cards(computer, False)
+        result = compare_totals(human_score, computer_score)
+
+        games.append({
+            'game_uuid': f'{seed:08x}{index:024x}',
+            'events': [
+                { 'gamer': 'human', 'value': 5, 'status': 'MADE' },
+                { 'gamer': 'human', 'value': 5, 'status': BET_RESULTS[result] },
+            ],
+            'state': { 'computer_cards': computer, 'human_cards': human, 'human_score': human_score, 'computer_score': computer_score },
+            'finished': True,
+            'winner': WINNERS[result], # type: ignore
+            'created_at': float(index),
+        })
+
+    return games
+
+
+def time_calls(fn: Callable[[], object], number: int) -> float:
+    started_at = time.perf_counter()
+
+    for _ in range(number):
+        fn()
+
+    return time.perf_counter() - started_at
+
+
+def measure(name: str, size: int, fn: Callable[[], object], repeat: int = DEFAULT_REPEAT) -> BenchmarkResult:
+    number = 1
+    elapsed = time_calls(fn, number)
+
+    while elapsed < MIN_SAMPLE_TIME:
+        number *= 10
+        elapsed = time_calls(fn, number)
+
+    timings = [elapsed / number]
+
+    if elapsed < SLOW_CALL_TIME:
+        timings.extend(time_calls(fn, number) / number for _ in range(repeat - 1))
+
+    return summarize(name, size, number, timings)
+
+
+def summarize(name: str, size: int, number: int, timings: list[float]) -> BenchmarkResult:
+    return {
+        'name': name,
+        'size': size,
+        'number': number,
+        'repeat': len(timings),
+        'best': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+    }
+
+
+def get_import_time(module: str) -> float:
+    # a fresh interpreter every time, otherwise everything after the first import is already cached
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT_PATH,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    # lines look like "import time:  self [us] | cumulative [us] | module", nested imports indented
+    for line in reversed(completed.stderr.splitlines()):
+        columns = line.split('|')
+
+        if len(columns) == 3 and columns[2].strip() == module:
+            return int(columns[1]) / 1_000_000
+
+    raise Exception(f'No import time reported for {module}')
+
+
+def run_history_benchmarks(backend: str, size: int, repeat: int = DEFAULT_REPEAT) -> list[BenchmarkResult]:
+    with tempfile.TemporaryDirectory() as base_path:
+        storage = STORAGE_BACKENDS[backend](base_path)
+        games = create_games(size)
+        storage.commit_changes(storage.get_default_balance(), games, rebuild_aggregates(games))
+        last_game = games[-1]
+        del games
+
+        model = Model(storage, StdlibRandom(size))
+
+        def play_round() -> None:
+            model.start(BET) # type: ignore
+            model.change_state({ 'action': 'Пас' })
+
+        results = [
+            measure(f'storage.{backend}.update_game_in_history', size, lambda: storage.update_game_in_history(last_game), repeat),
+            measure(f'storage.{backend}.get_balance', size, storage.get_balance, repeat),
+            measure(f'storage.{backend}.get_all_games', size, storage.get_all_games, repeat),
+            measure(f'model.{backend}.round', size, play_round, repeat),
+        ]
+
+        close = getattr(storage, 'close', None)
+
+        if close is not None:
+            close()
+
+        return results
+
+
+def run_observer_benchmarks(subscribers: int, repeat: int = DEFAULT_REPEAT) -> list[BenchmarkResult]:
+    observer = Observer()
+    calls: list[object] = []
+
+    for _ in range(subscribers):
+        observer.subscribe(OBSERVER_MESSAGES['change_state'], calls.append)
+
+    def notify() -> None:
+        observer.notify(OBSERVER_MESSAGES['change_state'], 1)
+        calls.clear()
+
+    return [measure('observer.notify', subscribers, notify, repeat)]
+
+
+def run_startup_benchmarks(module: str, repeat: int = DEFAULT_REPEAT) -> list[BenchmarkResult]:
+    return [summarize(f'startup.import.{module}', 0, 1, [get_import_time(module) for _ in range(repeat)])]
+
+
+def load_thresholds(path: str = THRESHOLDS_PATH) -> dict[str, float]:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def check_thresholds(results: Iterable[BenchmarkResult], thresholds: dict[str, float]) -> list[Failure]:
+    failures: list[Failure] = []
+
+    for result in results:
+        limit = thresholds.get(get_result_key(result['name'], result['size']))
+
+        if limit is not None and result['median'] > limit:
+            failures.append({ 'name': result['name'], 'size': result['size'], 'median': result['median'], 'limit': limit })
+
+    return failures
+
+
+def compare_with_baseline(
+    results: Iterable[BenchmarkResult],
+    baseline: BenchmarkReport,
+    tolerance: float = DEFAULT_TOLERANCE,
+    thresholds: Optional[dict[str, float]] = None
+) -> list[Failure]:
+    # limits are slowdowns against an earlier run on the same machine, seconds measured elsewhere say nothing here
+    limits = {
+        get_result_key(result['name'], result['size']): result['median'] * (thresholds or {}).get(result['name'], tolerance)
+        for result in baseline['results']
+    }
+
+    return check_thresholds(results, limits)
+
+
+def run_suite(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    backends: Iterable[str] = ('json', 'journal', 'sqlite', 'memory'),
+    subscribers: Iterable[int] = DEFAULT_SUBSCRIBERS,
+    repeat: int = DEFAULT_REPEAT,
+    startup_modules: Iterable[str] = STARTUP_MODULES,
+    thresholds: Optional[dict[str, float]] = None,
+    baseline: Optional[BenchmarkReport] = None,
+    tolerance: float = DEFAULT_TOLERANCE,
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None
+) -> BenchmarkReport:
+    results: list[BenchmarkResult] = []
+
+    def collect(items: list[BenchmarkResult]) -> None:
+        for item in items:
+            results.append(item)
+
+            if on_result is not None:
+                on_result(item)
+
+    for backend in backends:
+        if backend not in STORAGE_BACKENDS:
+            raise Exception(f'Unknown storage backend\n Correct backends: {list(STORAGE_BACKENDS.keys())}\n Incoming backend: {backend}')
+
+        for size in sizes:
+            collect(run_history_benchmarks(backend, size, repeat))
+
+    for count in subscribers:
+        collect(run_observer_benchmarks(count, repeat))
+
+    for module in startup_modules:
+        collect(run_startup_benchmarks(module, repeat))
+
+    failures = [] if baseline is None else compare_with_baseline(results, baseline, tolerance, thresholds)
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': time.time(),
+        'results': results,
+        'failures': failures,
+    }
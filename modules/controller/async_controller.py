@@ -0,0 +1,21 @@
+from modules.model.async_model import AsyncModel
+from modules.utils.constants import OBSERVER_MESSAGES
+from modules.view.network_view import NetworkView
+
+
+class AsyncController:
+    def __init__(self, model: AsyncModel, view: NetworkView) -> None:
+        self.model = model
+        self.view = view
+        self.bind_deps()
+
+    def bind_deps(self) -> None:
+        self.view.subscribe(OBSERVER_MESSAGES['init'], self.model.start)
+        self.view.subscribe(OBSERVER_MESSAGES['user_action'], self.model.change_state)
+        self.view.subscribe(OBSERVER_MESSAGES['restart'], self.model.reset_state)
+        self.model.subscribe(OBSERVER_MESSAGES['change_state'], self.view.render)
+        self.model.subscribe(OBSERVER_MESSAGES['finish'], self.view.render_finish_screen)
+
+    async def run(self) -> None:
+        await self.view.start_game(await self.model.get_available_bets_with_balance())
+        await self.view.serve()
@@ -0,0 +1,54 @@
+# Entry point for workers, simulations and servers: model, storage and constants only, no terminal UI
+import random
+from typing import Optional, Union
+
+from modules.model.model import BET_STATUS, Model
+from modules.model.rng import RandomSource
+from modules.model.shoe import Shoe
+from modules.model.strategy import HIT, STAND, Action
+from modules.storage.memory_storage import MemoryStorage
+from modules.storage.storage import Balance, Game, Storage
+from modules.utils.constants import OBSERVER_MESSAGES
+
+__all__ = [
+    'BET_STATUS',
+    'OBSERVER_MESSAGES',
+    'Action',
+    'Balance',
+    'Game',
+    'HIT',
+    'MemoryStorage',
+    'Model',
+    'STAND',
+    'Shoe',
+    'Storage',
+    'act',
+    'close_model',
+    'create_model',
+    'place_bet',
+]
+
+
+def create_model(
+    storage: Optional[Storage] = None,
+    rng: Optional[Union[random.Random, RandomSource]] = None,
+    soft_aces: bool = False,
+    shoe: Optional[Shoe] = None
+) -> Model:
+    return Model(storage if storage is not None else MemoryStorage(), rng, soft_aces=soft_aces, shoe=shoe)
+
+
+def place_bet(model: Model, bet: str = '5') -> Game:
+    model.start({ 'bet': { 'value': bet, 'status': BET_STATUS['made'], 'gamer_type': 'human' } })
+
+    return model.get_current_game()
+
+
+def act(model: Model, action: Action) -> Game:
+    model.change_state({ 'action': action })
+
+    return model.get_current_game()
+
+
+def close_model(model: Model) -> None:
+    model.close()
@@ -0,0 +1,172 @@
+import functools
+import os
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from modules.metrics.metrics import MetricsRegistry
+from modules.observer.async_observer import AsyncObserver
+from modules.observer.observer import Observer
+from modules.storage.archive import GameArchive
+from modules.storage.journal_storage import JournalStorage
+from modules.storage.storage import Game, Storage
+
+NOTIFY_SECONDS = 'blackjack_observer_notify_seconds'
+READ_SECONDS = 'blackjack_storage_read_seconds'
+PARSE_SECONDS = 'blackjack_storage_parse_seconds'
+WRITE_SECONDS = 'blackjack_storage_write_seconds'
+BYTES_READ = 'blackjack_storage_bytes_read_total'
+BYTES_WRITTEN = 'blackjack_storage_bytes_written_total'
+FILE_OPENS = 'blackjack_storage_file_opens_total'
+
+REGISTRY = MetricsRegistry()
+
+_patched: dict[tuple[type, str], Callable] = {}
+
+
+def instrument_notify(registry: MetricsRegistry, notify: Callable) -> Callable:
+    @functools.wraps(notify)
+    def wrapper(self: Observer, subscription_type: str, *args: Any, **kwargs: Any) -> None:
+        started_at = time.perf_counter()
+
+        try:
+            notify(self, subscription_type, *args, **kwargs)
+        finally:
+            registry.observe(NOTIFY_SECONDS, time.perf_counter() - started_at, message=subscription_type, observer='sync')
+
+    return wrapper
+
+
+def instrument_async_notify(registry: MetricsRegistry, notify: Callable) -> Callable:
+    @functools.wraps(notify)
+    async def wrapper(self: AsyncObserver, subscription_type: str, *args: Any, **kwargs: Any) -> None:
+        started_at = time.perf_counter()
+
+        try:
+            await notify(self, subscription_type, *args, **kwargs)
+        finally:
+            registry.observe(NOTIFY_SECONDS, time.perf_counter() - started_at, message=subscription_type, observer='async')
+
+    return wrapper
+
+
+def instrument_read(registry: MetricsRegistry, read: Callable) -> Callable:
+    @functools.wraps(read)
+    def wrapper(self: Storage) -> Any:
+        started_at = time.perf_counter()
+
+        try:
+            return read(self)
+        finally:
+            registry.observe(READ_SECONDS, time.perf_counter() - started_at)
+
+    return wrapper
+
+
+def instrument_load(registry: MetricsRegistry, load: Callable) -> Callable:
+    @functools.wraps(load)
+    def wrapper(self: Storage) -> tuple[Any, os.stat_result]:
+        started_at = time.perf_counter()
+        registry.increment(FILE_OPENS, mode='read')
+        body, stat = load(self)
+        registry.observe(PARSE_SECONDS, time.perf_counter() - started_at)
+        registry.increment(BYTES_READ, stat.st_size)
+
+        return body, stat
+
+    return wrapper
+
+
+def instrument_create(registry: MetricsRegistry, create: Callable) -> Callable:
+    @functools.wraps(create)
+    def wrapper(self: Storage, path: str, data: str, fsync: bool = False) -> os.stat_result:
+        started_at = time.perf_counter()
+        registry.increment(FILE_OPENS, mode='write')
+        stat = create(self, path, data, fsync)
+        registry.observe(WRITE_SECONDS, time.perf_counter() - started_at)
+        registry.increment(BYTES_WRITTEN, stat.st_size)
+
+        return stat
+
+    return wrapper
+
+
+def instrument_journal_write(registry: MetricsRegistry, write: Callable) -> Callable:
+    @functools.wraps(write)
+    def wrapper(self: JournalStorage, data: str, fsync: bool = False) -> int:
+        started_at = time.perf_counter()
+        registry.increment(FILE_OPENS, mode='write')
+        written = write(self, data, fsync)
+        registry.observe(WRITE_SECONDS, time.perf_counter() - started_at)
+        registry.increment(BYTES_WRITTEN, written)
+
+        return written
+
+    return wrapper
+
+
+def instrument_archive_append(registry: MetricsRegistry, append: Callable) -> Callable:
+    @functools.wraps(append)
+    def wrapper(self: GameArchive, games: Iterable[Game], fsync: bool = False) -> int:
+        started_at = time.perf_counter()
+        size = os.path.getsize(self._path) if os.path.isfile(self._path) else 0
+        appended = append(self, games, fsync)
+
+        # nothing is opened when every game was archived already
+        if appended > 0:
+            registry.increment(FILE_OPENS, mode='write')
+            registry.observe(WRITE_SECONDS, time.perf_counter() - started_at)
+            registry.increment(BYTES_WRITTEN, max(os.path.getsize(self._path) - size, 0))
+
+        return appended
+
+    return wrapper
+
+
+INSTRUMENTED: list[tuple[type, str, Callable[[MetricsRegistry, Callable], Callable]]] = [
+    (Observer, 'notify', instrument_notify),
+    (AsyncObserver, 'notify', instrument_async_notify),
+    (Storage, '_read_history_file', instrument_read),
+    (Storage, '_load_history_file', instrument_load),
+    (Storage, '_create_history_file', instrument_create),
+    (JournalStorage, '_write_journal_file', instrument_journal_write),
+    (GameArchive, 'append', instrument_archive_append),
+]
+
+
+def describe_metrics(registry: MetricsRegistry) -> None:
+    registry.describe(NOTIFY_SECONDS, 'Time spent delivering one observer message to all subscribers.')
+    registry.describe(READ_SECONDS, 'Time to get the history body, cache hits included.')
+    registry.describe(PARSE_SECONDS, 'Time to open, read and parse the history file on a cache miss.')
+    # SQLite writes its own pages, so the counters below cover the JSON history, the journal and the archive only
+    registry.describe(WRITE_SECONDS, 'Time to write the history file, append to the journal or append to the archive.')
+    registry.describe(BYTES_READ, 'Bytes of history parsed from disk.')
+    registry.describe(BYTES_WRITTEN, 'Bytes of history written to disk, SQLite databases excluded.')
+    registry.describe(FILE_OPENS, 'History files opened, by mode.')
+
+
+def enable_instrumentation(registry: MetricsRegistry = REGISTRY) -> MetricsRegistry:
+    # the originals are swapped back on disable, so code that never enables this runs unwrapped methods
+    disable_instrumentation()
+    describe_metrics(registry)
+
+    for owner, name, instrument in INSTRUMENTED:
+        original = owner.__dict__[name]
+        _patched[(owner, name)] = original
+        setattr(owner, name, instrument(registry, original))
+
+    return registry
+
+
+def disable_instrumentation() -> None:
+    for (owner, name), original in _patched.items():
+        setattr(owner, name, original)
+
+    _patched.clear()
+
+
+def is_instrumentation_enabled() -> bool:
+    return len(_patched) > 0
+
+
+def write_metrics(path: str, registry: Optional[MetricsRegistry] = None) -> None:
+    (registry or REGISTRY).write_prometheus(path)
@@ -0,0 +1,166 @@
+import bisect
+import os
+import threading
+from typing import Optional, TypedDict
+
+Labels = tuple[tuple[str, str], ...]
+
+HistogramSnapshot = TypedDict(
+    'HistogramSnapshot',
+    {
+        'buckets': dict[str, int],
+        'sum': float,
+        'count': int,
+    }
+)
+
+MetricsSnapshot = TypedDict(
+    'MetricsSnapshot',
+    {
+        'histograms': dict[str, dict[str, HistogramSnapshot]],
+        'counters': dict[str, dict[str, float]],
+    }
+)
+
+# 50 microseconds to 10 seconds, enough to tell a cache hit from a full history parse
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(labels: Labels, extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = [*labels, extra] if extra is not None else list(labels)
+
+    if len(pairs) == 0:
+        return ''
+
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+
+    return repr(value)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._bounds = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def get_cumulative_counts(self) -> list[tuple[str, int]]:
+        result: list[tuple[str, int]] = []
+        total = 0
+
+        for bound, count in zip((*(format_value(bound) for bound in self._bounds), '+Inf'), self._counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def get_snapshot(self) -> HistogramSnapshot:
+        return { 'buckets': dict(self.get_cumulative_counts()), 'sum': self.sum, 'count': self.count }
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._buckets = buckets
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._help: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help: str) -> None:
+        self._help[name] = help
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets)
+
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def get_histogram(self, name: str, **labels: str) -> Optional[HistogramSnapshot]:
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+
+            return histogram.get_snapshot() if histogram is not None else None
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def get_snapshot(self) -> MetricsSnapshot:
+        with self._lock:
+            return {
+                'histograms': {
+                    name: { format_labels(labels): histogram.get_snapshot() for labels, histogram in series.items() }
+                    for name, series in self._histograms.items()
+                },
+                'counters': {
+                    name: { format_labels(labels): value for labels, value in series.items() }
+                    for name, series in self._counters.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_prometheus(self) -> str:
+        lines: list[str] = []
+
+        with self._lock:
+            for name, counters in sorted(self._counters.items()):
+                self._add_header(lines, name, 'counter')
+
+                for labels, value in sorted(counters.items()):
+                    lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+
+            for name, histograms in sorted(self._histograms.items()):
+                self._add_header(lines, name, 'histogram')
+
+                for labels, histogram in sorted(histograms.items()):
+                    for bound, count in histogram.get_cumulative_counts():
+                        lines.append(f'{name}_bucket{format_labels(labels, ("le", bound))} {count}')
+
+                    lines.append(f'{name}_sum{format_labels(labels)} {format_value(histogram.sum)}')
+                    lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+        with open(tmp_path, 'w') as file:
+            file.write(self.to_prometheus())
+
+        # scrapers such as the node exporter textfile collector must never see half a file
+        os.replace(tmp_path, path)
+
+    def _add_header(self, lines: list[str], name: str, kind: str) -> None:
+        if name in self._help:
+            lines.append(f'# HELP {name} {self._help[name]}')
+
+        lines.append(f'# TYPE {name} {kind}')
@@ -0,0 +1,70 @@
+import asyncio
+import random
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from modules.model.model import AvailableBetsWithBalance, ChangeStatePayload, InitBetPayload, Model
+from modules.model.rng import RandomSource
+from modules.observer.async_observer import AsyncObserver
+from modules.storage.storage import Game, Storage
+from modules.utils.constants import OBSERVER_MESSAGES, SubscribesType
+
+T = TypeVar('T')
+
+
+class AsyncModel(AsyncObserver):
+    def __init__(
+        self,
+        storage: Storage,
+        rng: Optional[Union[random.Random, RandomSource]] = None,
+        soft_aces: bool = False,
+        offload: bool = True,
+        max_pending: int = 1000
+    ) -> None:
+        super().__init__(max_pending)
+        self._model = Model(storage, rng, soft_aces=soft_aces)
+        self._offload = offload
+        self._lock = asyncio.Lock()
+        self._events: list[tuple[SubscribesType, Any]] = []
+        self._model.subscribe(OBSERVER_MESSAGES['change_state'], self._collect_change_state)
+        self._model.subscribe(OBSERVER_MESSAGES['finish'], self._collect_finish)
+
+    async def start(self, payload: InitBetPayload) -> None:
+        await self._dispatch(self._model.start, payload)
+
+    async def change_state(self, payload: ChangeStatePayload) -> None:
+        await self._dispatch(self._model.change_state, payload)
+
+    async def reset_state(self, payload: InitBetPayload) -> None:
+        await self._dispatch(self._model.reset_state, payload)
+
+    async def get_available_bets_with_balance(self) -> AvailableBetsWithBalance:
+        async with self._lock:
+            return await self._call(self._model.get_available_bets_with_balance)
+
+    def get_current_game(self) -> Game:
+        return self._model.get_current_game()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._call(self._model.close)
+
+    async def _dispatch(self, fn: Callable[[Any], None], payload: Any) -> None:
+        async with self._lock:
+            await self._call(fn, payload)
+            events, self._events = self._events, []
+
+        for subscription_type, data in events:
+            await self.notify(subscription_type, data)
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        # blocking storages run in the default executor so one table's file I/O never stalls the loop
+        if self._offload:
+            return await asyncio.to_thread(fn, *args)
+
+        return fn(*args)
+
+    def _collect_change_state(self, game: Game) -> None:
+        self._events.append((OBSERVER_MESSAGES['change_state'], game))
+
+    def _collect_finish(self, payload: Any) -> None:
+        self._events.append((OBSERVER_MESSAGES['finish'], payload))
@@ -0,0 +1,30 @@
+from typing import Iterable
+
+from modules.utils.compact_cards import AnyCard, get_card_score
+
+BLACKJACK = 21
+ACE_SCORE = 11
+SOFT_ACE_DISCOUNT = 10
+
+
+def add_card_score(total: int, soft_aces: int, card_score: int, soft_aces_enabled: bool) -> tuple[int, int]:
+    total += card_score
+
+    if soft_aces_enabled and card_score == ACE_SCORE:
+        soft_aces += 1
+
+    while total > BLACKJACK and soft_aces > 0:
+        total -= SOFT_ACE_DISCOUNT
+        soft_aces -= 1
+
+    return total, soft_aces
+
+
+def score_cards(cards: Iterable[AnyCard], soft_aces_enabled: bool) -> tuple[int, int]:
+    total = 0
+    soft_aces = 0
+
+    for card in cards:
+        total, soft_aces = add_card_score(total, soft_aces, get_card_score(card), soft_aces_enabled)
+
+    return total, soft_aces
@@ -1,9 +1,14 @@
 import random
 from typing import Literal, Union, Optional, TypedDict
 
+from modules.model.hand import add_card_score, score_cards
+from modules.model.rng import DEFAULT_RNG, RandomSource, get_random_source, get_source_name, seeded_shuffle
+from modules.model.shoe import DEFAULT_PENETRATION, Shoe
 from modules.observer.observer import Observer
+from modules.storage.aggregates import apply_finished_game, get_winrate
 from modules.storage.storage import Balance, Game, GamerType, Storage
-from modules.utils.constants import MAP_CARDS_FOR_SCORE, OBSERVER_MESSAGES, Card, Deck
+from modules.utils.compact_cards import AnyCard, CompactDeck, get_card_score
+from modules.utils.constants import OBSERVER_MESSAGES, Deck
 
 ChangeStatePayload = TypedDict(
     'ChangeStatePayload',
@@ -35,36 +40,72 @@ InitBetPayload = TypedDict('InitBetPayload', { 'bet': BetPayload })
 
 AvailableBetsWithBalance = TypedDict('AvailableBetsWithBalance', { 'available_bets': list[str], 'balance': Balance })
 
+GameStatistics = TypedDict('GameStatistics', { 'winrate': float, 'balance': Balance })
+
+FinishPayload = TypedDict('FinishPayload', { 'game': Game, 'statistics': GameStatistics, 'available_bets': list[str] })
+
+HandScore = tuple[list[AnyCard], int, int, int]
+
+CARDS_KEYS: dict[GamerType, str] = { 'human': 'human_cards', 'computer': 'computer_cards' }
+SCORE_KEYS: dict[GamerType, str] = { 'human': 'human_score', 'computer': 'computer_score' }
+
+
+def build_seeded_deck(deck: Union[Deck, CompactDeck], seed: int, cursor: int = 0, rng: str = DEFAULT_RNG) -> Union[Deck, CompactDeck]:
+    seeded_shuffle(deck, seed, rng)
+    del deck[len(deck) - cursor:]
+
+    return deck
+
+
 class Model(Observer):
     _storage: Storage
     _current_game: Game
     _balance: Balance
-    _deck: Deck = []
-
-    def __init__(self, storage: Storage) -> None:
+    _deck: Union[Deck, CompactDeck] = []
+
+    def __init__(
+        self,
+        storage: Storage,
+        rng: Optional[Union[random.Random, RandomSource]] = None,
+        seeded_deck: bool = False,
+        soft_aces: bool = False,
+        shoe: Optional[Shoe] = None
+    ) -> None:
         super().__init__()
         self._storage = storage
+        self._random = get_random_source(rng)
+        self._seeded_deck = seeded_deck
+        self._soft_aces = soft_aces
+        self._shoe = shoe
+        self._hands: dict[GamerType, HandScore] = {}
 
 
     def start(self, payload: InitBetPayload) -> None:
-        has_last_not_ended_game = self._storage.has_last_not_ended_game()
+        with self._storage.transaction():
+            has_last_not_ended_game = self._storage.has_last_not_ended_game()
 
-        self._current_game = self._storage.get_current_game()
-        self._deck = self._current_game['state']['deck']
-        self._balance = self._storage.get_balance()
+            self._current_game = self._storage.get_current_game()
+            self._deck = self._restore_deck()
+            self._balance = self._storage.get_balance()
 
-        if not has_last_not_ended_game:
-            self._shuffle_cards()
-            self.add_event(payload['bet'])
-            self._add_card('computer', 2)
-            self._add_card('human', 2)
-            self._storage.update_game_in_history(self._current_game)
+            if not has_last_not_ended_game:
+                self._shuffle_cards()
+                self.add_event(payload['bet'])
+                self._add_card('computer', 2)
+                self._add_card('human', 2)
+                self._storage.update_game_in_history(self._current_game)
 
         self.notify(
             OBSERVER_MESSAGES['change_state'],
             self._current_game
         )
 
+    def get_current_game(self) -> Game:
+        return self._current_game
+
+    def close(self) -> None:
+        self._storage.close()
+
     def get_available_bets_with_balance(self) -> AvailableBetsWithBalance:
         balance = None
         try:
@@ -81,16 +122,19 @@ class Model(Observer):
         return { 'available_bets': available_bets, 'balance': balance } 
 
     def change_state(self, payload: ChangeStatePayload) -> None:
-        self._computer_move()
-        if payload['action'] == 'Взять карту':
-            self._add_card('human', 1)
+        with self._storage.transaction():
+            self._computer_move()
+            if payload['action'] == 'Взять карту':
+                self._add_card('human', 1)
 
-        self._storage.update_game_in_history(self._current_game)
+            self._storage.update_game_in_history(self._current_game)
 
-        if self._is_finished() or payload['action'] == 'Пас':
-            self._finish_game()
-        else:
+            finish_payload = self._finish_game() if self._is_finished() or payload['action'] == 'Пас' else None
+
+        if finish_payload is None:
             self.notify(OBSERVER_MESSAGES['change_state'], self._current_game)
+        else:
+            self.notify(OBSERVER_MESSAGES['finish'], finish_payload)
 
     def reset_state(self, payload: InitBetPayload) -> None:
         self._storage.remove_history_file()
@@ -114,7 +158,8 @@ class Model(Observer):
         if payload['status'] == BET_STATUS['draw']:
             self._storage.update_balance({ 'human': balance['human'], 'computer': balance['computer'], 'freeze_human_balance': balance['freeze_human_balance'] - bet })
 
-    def _finish_game(self) -> None:
+    def _finish_game(self) -> FinishPayload:
+        aggregates = self._storage.get_aggregates()
         finished_game: Game = {
             **self._current_game,  # type: ignore
             'finished': True,
@@ -130,22 +175,18 @@ class Model(Observer):
 
         self._current_game = finished_game
         self._storage.update_game_in_history(finished_game)
-        self.notify(
-            OBSERVER_MESSAGES['finish'], 
-            {
-                'game': self._current_game, 
-                'statistics': {
-                    'winrate': self._calculate_statistics(),
-                    'balance': self._storage.get_balance()
-                },
-                'available_bets': self.get_available_bets_with_balance()['available_bets']
-            })
-
-    def _calculate_statistics(self) -> float:
-        games = self._storage.get_all_games()
-        winGames = list(filter(lambda item: item['winner'] == 'human', games))
-        winrate = len(winGames) / len(games)
-        return winrate
+
+        aggregates = apply_finished_game(aggregates, finished_game)
+        self._storage.update_aggregates(aggregates)
+
+        return {
+            'game': self._current_game, 
+            'statistics': {
+                'winrate': get_winrate(aggregates),
+                'balance': self._storage.get_balance()
+            },
+            'available_bets': self.get_available_bets_with_balance()['available_bets']
+        }
 
     def _get_winner(self) -> Optional[GamerType]:
         user_score = self._current_game['state']['human_score']
@@ -176,19 +217,87 @@ class Model(Observer):
         if score < 17:
             self._add_card('computer', 1)
 
-    def _calculate_score(self, gamer_type: GamerType) -> None:
-        cards: List[Card] = self._current_game['state'][f'{gamer_type}_cards'] # type: ignore
-        result = 0
-        for card in cards:
-            result += MAP_CARDS_FOR_SCORE[card['type']]
-        self._current_game['state'][f'{gamer_type}_score'] = result # type: ignore
+    def _calculate_score(self, gamer_type: GamerType) -> HandScore:
+        cards: list[AnyCard] = self._current_game['state'][CARDS_KEYS[gamer_type]] # type: ignore
+        total, soft_aces = score_cards(cards, self._soft_aces)
+        self._current_game['state'][SCORE_KEYS[gamer_type]] = total # type: ignore
+
+        return (cards, len(cards), total, soft_aces)
 
     def _add_card(self, gamer_type: GamerType, count: int) -> None:
+        state = self._current_game['state']
+        hand = self._hands.get(gamer_type)
+        cards: list[AnyCard] = state[CARDS_KEYS[gamer_type]] # type: ignore
+
+        # the cached score only holds for the exact list it was computed from
+        if hand is None or hand[0] is not cards or hand[1] != len(cards):
+            hand = self._calculate_score(gamer_type)
+
+        total, soft_aces = hand[2], hand[3]
+
         for _ in range(count):
-            card = self._deck.pop()
-            self._current_game['state'][f'{gamer_type}_cards'].append(card)  # type: ignore
-            self._calculate_score(gamer_type)
+            card = self._draw_card()
+            cards.append(card)
+            total, soft_aces = add_card_score(total, soft_aces, get_card_score(card), self._soft_aces)
+
+        state[SCORE_KEYS[gamer_type]] = total # type: ignore
+        self._hands[gamer_type] = (cards, len(cards), total, soft_aces)
+
+    def _draw_card(self) -> AnyCard:
+        state = self._current_game['state']
+
+        if 'shoe_cursor' in state and self._shoe is not None:
+            card = self._shoe.draw()
+            state['shoe_cursor'] = self._shoe.cursor
+
+            return card
+
+        card = self._deck.pop()
+
+        if 'deck_cursor' in state:
+            state['deck_cursor'] += 1
+
+        return card
+
+    def _restore_deck(self) -> Union[Deck, CompactDeck]:
+        state = self._current_game['state']
+
+        if 'shoe_seed' in state:
+            if self._shoe is None or self._shoe.decks != state['shoe_decks']:
+                penetration = DEFAULT_PENETRATION if self._shoe is None else self._shoe.penetration
+                self._shoe = Shoe(self._storage.new_deck, state['shoe_decks'], penetration, self._random)
+
+            self._shoe.restore(state['shoe_seed'], state['shoe_cursor'], state.get('shoe_rng', DEFAULT_RNG))
+
+            return []
+
+        if 'deck_seed' in state:
+            return build_seeded_deck(self._storage.new_deck(), state['deck_seed'], state['deck_cursor'], state.get('deck_rng', DEFAULT_RNG))
+
+        return state['deck']
 
     def _shuffle_cards(self) -> None:
-        for _ in range(1, random.randint(10, 30)):
-            random.shuffle(self._deck)
+        if self._shoe is not None:
+            # the shoe carries over between games and is shuffled once, when the cut card comes out
+            if self._shoe.needs_shuffle():
+                self._shoe.shuffle()
+
+            state = self._current_game['state']
+            state['shoe_seed'] = self._shoe.seed # type: ignore
+            state['shoe_cursor'] = self._shoe.cursor
+            state['shoe_decks'] = self._shoe.decks
+            state['shoe_rng'] = self._shoe.source
+            state.pop('deck', None)
+            self._deck = []
+            return
+
+        if self._seeded_deck:
+            state = self._current_game['state']
+            state['deck_seed'] = self._random.getrandbits(64)
+            state['deck_cursor'] = 0
+            state['deck_rng'] = get_source_name(self._random)
+            state.pop('deck', None)
+            self._deck = self._restore_deck()
+            return
+
+        self._random.shuffle(self._deck)
@@ -0,0 +1,338 @@
+import functools
+import itertools
+import math
+import operator
+from typing import Iterable, TypedDict
+
+from modules.model.hand import BLACKJACK, add_card_score, score_cards
+from modules.model.strategy import DEALER_STANDS_AT, compare_totals
+from modules.storage.storage import Game
+from modules.utils.compact_cards import CARD_SCORES, AnyCard, get_card_score
+
+Odds = TypedDict('Odds', { 'win': float, 'lose': float, 'draw': float, 'bust': float, 'ev': float })
+
+ActionOdds = TypedDict('ActionOdds', { 'stand': Odds, 'hit': Odds })
+
+# remaining cards per score, index 0 is a score of 2 and the last index is an ace
+RankCounts = tuple[int, ...]
+Outcome = tuple[float, float, float, float]
+# final dealer totals with their probabilities
+DealerTotals = tuple[tuple[int, float], ...]
+# dealer total, number of draw orders and the hidden cards per score index for every hand the dealer may hold
+HiddenHands = tuple[tuple[int, int, tuple[tuple[int, int], ...]], ...]
+
+MIN_SCORE = min(CARD_SCORES)
+SCORES = tuple(range(MIN_SCORE, max(CARD_SCORES) + 1))
+CACHE_SIZE = 1 << 17
+
+
+def count_ranks(cards: Iterable[AnyCard]) -> RankCounts:
+    counts = [0] * len(SCORES)
+
+    for card in cards:
+        counts[get_card_score(card) - MIN_SCORE] += 1
+
+    return tuple(counts)
+
+
+def get_shoe_counts(decks: int = 1) -> RankCounts:
+    return tuple(CARD_SCORES.count(score) * decks for score in SCORES)
+
+
+def remove_cards(counts: RankCounts, cards: Iterable[AnyCard]) -> RankCounts:
+    result = list(counts)
+
+    for card in cards:
+        index = get_card_score(card) - MIN_SCORE
+
+        if result[index] == 0:
+            raise Exception(f'No card with score {SCORES[index]} left to remove')
+
+        result[index] -= 1
+
+    return tuple(result)
+
+
+def iter_draws(counts: RankCounts) -> Iterable[tuple[int, float, RankCounts]]:
+    remaining = sum(counts)
+
+    # Model cannot deal from an empty shoe either, so there are no odds for a state it never reaches
+    if remaining == 0:
+        raise Exception('The shoe is empty')
+
+    for index, count in enumerate(counts):
+        if count > 0:
+            yield SCORES[index], count / remaining, counts[:index] + (count - 1,) + counts[index + 1:]
+
+
+def settle(player_total: int, dealer_total: int) -> Outcome:
+    result = compare_totals(player_total, dealer_total)
+
+    return (float(result == 1), float(result == -1), float(result == 0), float(player_total > BLACKJACK))
+
+
+def add_outcome(total: Outcome, outcome: Outcome, probability: float) -> Outcome:
+    return (
+        total[0] + outcome[0] * probability,
+        total[1] + outcome[1] * probability,
+        total[2] + outcome[2] * probability,
+        total[3] + outcome[3] * probability,
+    )
+
+
+def get_value(outcome: Outcome) -> float:
+    return outcome[0] - outcome[1]
+
+
+def dealer_move(dealer_total: int, dealer_soft_aces: int, counts: RankCounts, soft_aces_enabled: bool) -> Iterable[tuple[float, int, int, RankCounts]]:
+    if dealer_total >= DEALER_STANDS_AT:
+        yield 1.0, dealer_total, dealer_soft_aces, counts
+        return
+
+    for score, probability, rest in iter_draws(counts):
+        yield (probability, *add_card_score(dealer_total, dealer_soft_aces, score, soft_aces_enabled), rest)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def stand_outcome(player_total: int, dealer_total: int, dealer_soft_aces: int, counts: RankCounts, soft_aces_enabled: bool) -> Outcome:
+    outcome: Outcome = (0.0, 0.0, 0.0, 0.0)
+
+    for probability, final_total, _, _ in dealer_move(dealer_total, dealer_soft_aces, counts, soft_aces_enabled):
+        outcome = add_outcome(outcome, settle(player_total, final_total), probability)
+
+    return outcome
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def hit_outcome(
+    player_total: int,
+    player_soft_aces: int,
+    dealer_total: int,
+    dealer_soft_aces: int,
+    counts: RankCounts,
+    soft_aces_enabled: bool
+) -> Outcome:
+    outcome: Outcome = (0.0, 0.0, 0.0, 0.0)
+
+    # Model moves the dealer before dealing the player's card, both from the same shoe
+    for dealer_probability, next_dealer_total, next_dealer_soft_aces, rest in dealer_move(dealer_total, dealer_soft_aces, counts, soft_aces_enabled):
+        for score, probability, shoe in iter_draws(rest):
+            next_total, next_soft_aces = add_card_score(player_total, player_soft_aces, score, soft_aces_enabled)
+
+            if next_total >= BLACKJACK:
+                result = settle(next_total, next_dealer_total)
+            else:
+                result = best_outcome(next_total, next_soft_aces, next_dealer_total, next_dealer_soft_aces, shoe, soft_aces_enabled)
+
+            outcome = add_outcome(outcome, result, dealer_probability * probability)
+
+    return outcome
+
+
+def best_outcome(
+    player_total: int,
+    player_soft_aces: int,
+    dealer_total: int,
+    dealer_soft_aces: int,
+    counts: RankCounts,
+    soft_aces_enabled: bool
+) -> Outcome:
+    stand = stand_outcome(player_total, dealer_total, dealer_soft_aces, counts, soft_aces_enabled)
+    hit = hit_outcome(player_total, player_soft_aces, dealer_total, dealer_soft_aces, counts, soft_aces_enabled)
+
+    return hit if get_value(hit) > get_value(stand) else stand
+
+
+def to_odds(outcome: Outcome) -> Odds:
+    return { 'win': outcome[0], 'lose': outcome[1], 'draw': outcome[2], 'bust': outcome[3], 'ev': get_value(outcome) }
+
+
+def get_odds(
+    player_cards: Iterable[AnyCard],
+    dealer_cards: Iterable[AnyCard],
+    counts: RankCounts,
+    soft_aces_enabled: bool = False
+) -> ActionOdds:
+    player_total, player_soft_aces = score_cards(player_cards, soft_aces_enabled)
+    dealer_total, dealer_soft_aces = score_cards(dealer_cards, soft_aces_enabled)
+
+    return {
+        'stand': to_odds(stand_outcome(player_total, dealer_total, dealer_soft_aces, counts, soft_aces_enabled)),
+        'hit': to_odds(hit_outcome(player_total, player_soft_aces, dealer_total, dealer_soft_aces, counts, soft_aces_enabled)),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def get_hidden_hands(dealer_cards_count: int, soft_aces_enabled: bool) -> HiddenHands:
+    # the first two cards are dealt blind, every later card only while the dealer is below 17
+    hands = {(0, 0, (0,) * len(SCORES)): 1}
+
+    for index in range(dealer_cards_count):
+        next_hands: dict[tuple[int, int, RankCounts], int] = {}
+
+        for (total, soft_aces, hidden), orders in hands.items():
+            if index > 1 and total >= DEALER_STANDS_AT:
+                continue
+
+            for score_index, score in enumerate(SCORES):
+                key = (
+                    *add_card_score(total, soft_aces, score, soft_aces_enabled),
+                    hidden[:score_index] + (hidden[score_index] + 1,) + hidden[score_index + 1:]
+                )
+                next_hands[key] = next_hands.get(key, 0) + orders
+
+        hands = next_hands
+
+    # every order of the same hidden cards is equally likely whatever the shoe, so only their number matters
+    return tuple(
+        (total, orders, tuple((score_index, count) for score_index, count in enumerate(hidden) if count > 0))
+        for (total, _, hidden), orders in hands.items()
+    )
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def count_dealer_hands(dealer_cards_count: int, counts: RankCounts, soft_aces_enabled: bool) -> dict[int, int]:
+    if sum(counts) < dealer_cards_count:
+        raise Exception('The shoe is empty')
+
+    # ways to draw the first k cards of every score in order, the same for every hidden hand that holds them
+    draws = [list(itertools.accumulate(range(count, count - dealer_cards_count, -1), operator.mul, initial=1)) for count in counts]
+    totals: dict[int, int] = {}
+
+    for total, orders, hidden in get_hidden_hands(dealer_cards_count, soft_aces_enabled):
+        ways = orders
+
+        for score_index, count in hidden:
+            ways *= draws[score_index][count]
+
+        if ways > 0:
+            totals[total] = totals.get(total, 0) + ways
+
+    return totals
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def get_dealer_totals(dealer_cards_count: int, dealer_stood: bool, counts: RankCounts, soft_aces_enabled: bool) -> tuple[float, DealerTotals]:
+    totals = count_dealer_hands(dealer_cards_count, counts, soft_aces_enabled)
+
+    if dealer_stood:
+        totals = {total: ways for total, ways in totals.items() if total >= DEALER_STANDS_AT}
+
+    # how likely the hidden cards are to fit what the player saw, and the dealer totals given that they do
+    fits = sum(totals.values())
+
+    if fits == 0:
+        return 0.0, ()
+
+    return fits / math.perm(sum(counts), dealer_cards_count), tuple((total, ways / fits) for total, ways in totals.items())
+
+
+def get_dealer_signals(dealer_cards_count: int, dealer_stood: bool) -> list[tuple[int, bool]]:
+    # the player only learns whether the dealer took a card, never which one
+    if dealer_stood:
+        return [(dealer_cards_count, True)]
+
+    return [(dealer_cards_count + 1, False), (dealer_cards_count, True)]
+
+
+def settle_totals(player_total: int, totals: DealerTotals) -> Outcome:
+    outcome: Outcome = (0.0, 0.0, 0.0, 0.0)
+
+    for dealer_total, probability in totals:
+        outcome = add_outcome(outcome, settle(player_total, dealer_total), probability)
+
+    return outcome
+
+
+def stand_belief_outcome(
+    player_total: int,
+    dealer_cards_count: int,
+    dealer_stood: bool,
+    counts: RankCounts,
+    soft_aces_enabled: bool
+) -> Outcome:
+    outcome: Outcome = (0.0, 0.0, 0.0, 0.0)
+    fit, _ = get_dealer_totals(dealer_cards_count, dealer_stood, counts, soft_aces_enabled)
+
+    for next_count, next_stood in get_dealer_signals(dealer_cards_count, dealer_stood):
+        next_fit, totals = get_dealer_totals(next_count, next_stood, counts, soft_aces_enabled)
+        outcome = add_outcome(outcome, settle_totals(player_total, totals), next_fit / fit)
+
+    return outcome
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def hit_belief_outcome(
+    player_total: int,
+    player_soft_aces: int,
+    dealer_cards_count: int,
+    dealer_stood: bool,
+    counts: RankCounts,
+    soft_aces_enabled: bool
+) -> Outcome:
+    outcome: Outcome = (0.0, 0.0, 0.0, 0.0)
+    fit, _ = get_dealer_totals(dealer_cards_count, dealer_stood, counts, soft_aces_enabled)
+
+    # unseen cards are exchangeable, so the player's card may be drawn first and the dealer's hand fitted to what is left
+    for score, probability, rest in iter_draws(counts):
+        next_total, next_soft_aces = add_card_score(player_total, player_soft_aces, score, soft_aces_enabled)
+
+        for next_count, next_stood in get_dealer_signals(dealer_cards_count, dealer_stood):
+            next_fit, totals = get_dealer_totals(next_count, next_stood, rest, soft_aces_enabled)
+
+            if next_fit == 0:
+                continue
+
+            if next_total >= BLACKJACK:
+                result = settle_totals(next_total, totals)
+            else:
+                result = best_belief_outcome(next_total, next_soft_aces, next_count, next_stood, rest, soft_aces_enabled)
+
+            outcome = add_outcome(outcome, result, probability * next_fit / fit)
+
+    return outcome
+
+
+def best_belief_outcome(
+    player_total: int,
+    player_soft_aces: int,
+    dealer_cards_count: int,
+    dealer_stood: bool,
+    counts: RankCounts,
+    soft_aces_enabled: bool
+) -> Outcome:
+    stand = stand_belief_outcome(player_total, dealer_cards_count, dealer_stood, counts, soft_aces_enabled)
+    hit = hit_belief_outcome(player_total, player_soft_aces, dealer_cards_count, dealer_stood, counts, soft_aces_enabled)
+
+    return hit if get_value(hit) > get_value(stand) else stand
+
+
+def get_visible_odds(
+    player_cards: Iterable[AnyCard],
+    dealer_cards_count: int,
+    counts: RankCounts,
+    soft_aces_enabled: bool = False,
+    dealer_stood: bool = False
+) -> ActionOdds:
+    player_total, player_soft_aces = score_cards(player_cards, soft_aces_enabled)
+
+    return {
+        'stand': to_odds(stand_belief_outcome(player_total, dealer_cards_count, dealer_stood, counts, soft_aces_enabled)),
+        'hit': to_odds(hit_belief_outcome(player_total, player_soft_aces, dealer_cards_count, dealer_stood, counts, soft_aces_enabled)),
+    }
+
+
+def get_game_odds(game: Game, soft_aces_enabled: bool = False, decks: int = 1) -> ActionOdds:
+    state = game['state']
+
+    # no view shows a dealer card before the round ends, so the player has seen only their own hand
+    if 'deck' in state:
+        counts = count_ranks([*state['deck'], *state['computer_cards']])
+    else:
+        # earlier rounds of a shoe and the seeded deck order are as unknown as the dealer's hand
+        counts = remove_cards(get_shoe_counts(state.get('shoe_decks', decks)), state['human_cards'])
+
+    # the dealer draws alongside every hit until 17, so holding fewer cards than the player means it has stopped
+    dealer_stood = len(state['computer_cards']) < len(state['human_cards'])
+
+    return get_visible_odds(state['human_cards'], len(state['computer_cards']), counts, soft_aces_enabled, dealer_stood)
@@ -0,0 +1,106 @@
+import random
+from array import array
+from typing import Any, MutableSequence, Optional, Protocol, Sequence, TypeVar, Union
+
+T = TypeVar('T')
+
+
+class RandomSource(Protocol):
+    def getrandbits(self, k: int) -> int: ...
+
+    def shuffle(self, items: MutableSequence) -> None: ...
+
+    def permutation(self, n: int) -> list[int]: ...
+
+    def draw(self, items: Sequence[T], k: int) -> list[T]: ...
+
+
+class StdlibRandom:
+    def __init__(self, seed: Optional[Union[int, random.Random]] = None) -> None:
+        self._random = seed if isinstance(seed, random.Random) else random.Random(seed)
+
+    def getrandbits(self, k: int) -> int:
+        return self._random.getrandbits(k)
+
+    def shuffle(self, items: MutableSequence) -> None:
+        self._random.shuffle(items)
+
+    def permutation(self, n: int) -> list[int]:
+        indexes = list(range(n))
+        self._random.shuffle(indexes)
+
+        return indexes
+
+    def draw(self, items: Sequence[T], k: int) -> list[T]:
+        return self._random.sample(items, k)
+
+
+def import_numpy() -> Any:
+    # numpy takes longer to import than the whole model, so only tables that ask for it pay for it
+    try:
+        import numpy
+    except ImportError:
+        raise Exception('NumpyRandom needs numpy installed')
+
+    return numpy
+
+
+class NumpyRandom:
+    def __init__(self, seed: Optional[Union[int, Any]] = None) -> None:
+        self._np = import_numpy()
+        self._generator = seed if isinstance(seed, self._np.random.Generator) else self._np.random.default_rng(seed)
+
+    def getrandbits(self, k: int) -> int:
+        size = (k + 7) // 8
+
+        return int.from_bytes(self._generator.bytes(size), 'little') >> (size * 8 - k)
+
+    def shuffle(self, items: MutableSequence) -> None:
+        # compact decks are byte arrays, numpy shuffles them in place through the shared buffer
+        if isinstance(items, array):
+            self._generator.shuffle(self._np.frombuffer(items, dtype=items.typecode))
+            return
+
+        items[:] = [items[index] for index in self._generator.permutation(len(items))]
+
+    def permutation(self, n: int) -> list[int]:
+        return self._generator.permutation(n).tolist()
+
+    def draw(self, items: Sequence[T], k: int) -> list[T]:
+        if not 0 <= k <= len(items):
+            raise ValueError('Sample larger than population or is negative')
+
+        return [items[index] for index in self._generator.choice(len(items), k, replace=False).tolist()]
+
+
+class RandomSourceFactory(Protocol):
+    def __call__(self, seed: Optional[int] = None) -> RandomSource: ...
+
+
+RNG_SOURCES: dict[str, RandomSourceFactory] = {
+    'stdlib': StdlibRandom,
+    'numpy': NumpyRandom,
+}
+
+# games stored before the source was recorded were all shuffled by the stdlib generator
+DEFAULT_RNG = 'stdlib'
+
+
+def get_source_name(source: RandomSource) -> str:
+    # seeded decks and shoes are replayed from the name, so only registered sources can deal them
+    for name, factory in RNG_SOURCES.items():
+        if type(source) is factory:
+            return name
+
+    raise Exception(f'Seeded dealing needs a registered random source\n Correct sources: {list(RNG_SOURCES.keys())}\n Incoming source: {type(source).__name__}')
+
+
+def seeded_shuffle(items: MutableSequence, seed: int, rng: str = DEFAULT_RNG) -> None:
+    RNG_SOURCES[rng](seed).shuffle(items)
+
+
+def get_random_source(rng: Optional[Union[random.Random, RandomSource]] = None) -> RandomSource:
+    if rng is None or isinstance(rng, random.Random):
+        return StdlibRandom(rng)
+
+    return rng
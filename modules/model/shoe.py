@@ -0,0 +1,88 @@
+import random
+from typing import Callable, Optional, Union
+
+from modules.model.rng import DEFAULT_RNG, RandomSource, get_random_source, get_source_name, seeded_shuffle
+from modules.utils.compact_cards import AnyCard, CompactDeck
+from modules.utils.constants import Deck
+
+DeckFactory = Callable[[], Union[Deck, CompactDeck]]
+
+DEFAULT_PENETRATION = 0.75
+# the most cards one round can take: a dealer and a player both crawling up on twos, threes and aces
+RESERVED_CARDS = 22
+
+
+def build_shoe_cards(new_deck: DeckFactory, decks: int, seed: int, rng: str = DEFAULT_RNG) -> list[AnyCard]:
+    cards: list[AnyCard] = []
+
+    for _ in range(decks):
+        cards.extend(new_deck())
+
+    # only the seed and the source name are persisted, replaying them with the same source deals the same order
+    seeded_shuffle(cards, seed, rng)
+
+    return cards
+
+
+class Shoe:
+    def __init__(
+        self,
+        new_deck: DeckFactory,
+        decks: int = 1,
+        penetration: float = DEFAULT_PENETRATION,
+        rng: Optional[Union[random.Random, RandomSource]] = None
+    ) -> None:
+        if decks < 1:
+            raise Exception(f'A shoe needs at least one deck\n Incoming decks: {decks}')
+
+        if not 0 < penetration <= 1:
+            raise Exception(f'Penetration must be in (0, 1]\n Incoming penetration: {penetration}')
+
+        self._new_deck = new_deck
+        self._decks = decks
+        self._penetration = penetration
+        self._random = get_random_source(rng)
+        self.source = get_source_name(self._random)
+        self._cards: list[AnyCard] = []
+        self._cut = 0
+        self.seed: Optional[int] = None
+        self.cursor = 0
+
+    def __len__(self) -> int:
+        return len(self._cards) - self.cursor
+
+    @property
+    def decks(self) -> int:
+        return self._decks
+
+    @property
+    def penetration(self) -> float:
+        return self._penetration
+
+    def shuffle(self, seed: Optional[int] = None, source: Optional[str] = None) -> None:
+        self.seed = seed if seed is not None else self._random.getrandbits(64)
+        self.source = source or get_source_name(self._random)
+        self._cards = build_shoe_cards(self._new_deck, self._decks, self.seed, self.source)
+        self._cut = max(0, min(int(len(self._cards) * self._penetration), len(self._cards) - RESERVED_CARDS))
+        self.cursor = 0
+
+    def restore(self, seed: int, cursor: int, source: str = DEFAULT_RNG) -> None:
+        if seed != self.seed or source != self.source:
+            self.shuffle(seed, source)
+
+        self.cursor = cursor
+
+    def needs_shuffle(self) -> bool:
+        return self.seed is None or self.cursor >= self._cut
+
+    def draw(self) -> AnyCard:
+        if self.cursor >= len(self._cards):
+            raise Exception('The shoe is empty')
+
+        card = self._cards[self.cursor]
+        self.cursor += 1
+
+        return card
+
+    def remaining(self) -> list[AnyCard]:
+        return self._cards[self.cursor:]
@@ -0,0 +1,256 @@
+import functools
+import json
+import os
+from fractions import Fraction
+from typing import Literal, Optional, Union
+
+from modules.model.hand import BLACKJACK, add_card_score, score_cards
+from modules.storage.storage import Game, get_default_base_path
+from modules.utils.compact_cards import CARD_SCORES
+
+Action = Union[Literal['Взять карту'], Literal['Пас']]
+
+# player total, player has a soft ace, dealer card count, dealer declined to draw at least once
+StateKey = tuple[int, bool, int, bool]
+DealerKey = tuple[int, bool]
+DealerState = tuple[int, int]
+Distribution = dict[DealerState, Fraction]
+
+TABLE_VERSION = 1
+DEALER_STANDS_AT = 17
+HIT: Action = 'Взять карту'
+STAND: Action = 'Пас'
+
+# the deck is treated as infinite, every card score keeps its share of a fresh 52 card deck
+CARD_PROBABILITIES: dict[int, Fraction] = {
+    score: Fraction(CARD_SCORES.count(score), len(CARD_SCORES)) for score in sorted(set(CARD_SCORES))
+}
+
+
+def compare_totals(player_total: int, dealer_total: int) -> int:
+    if player_total <= BLACKJACK and (player_total > dealer_total or dealer_total > BLACKJACK):
+        return 1
+
+    if dealer_total <= BLACKJACK and (dealer_total > player_total or player_total > BLACKJACK):
+        return -1
+
+    return 0
+
+
+def draw_card(distribution: Distribution, soft_aces_enabled: bool) -> Distribution:
+    result: Distribution = {}
+
+    for (total, soft_aces), probability in distribution.items():
+        for score, card_probability in CARD_PROBABILITIES.items():
+            state = add_card_score(total, soft_aces, score, soft_aces_enabled)
+            result[state] = result.get(state, Fraction(0)) + probability * card_probability
+
+    return result
+
+
+def split_distribution(distribution: Distribution) -> tuple[Fraction, Distribution, Distribution]:
+    drawing = {state: probability for state, probability in distribution.items() if state[0] < DEALER_STANDS_AT}
+    standing = {state: probability for state, probability in distribution.items() if state[0] >= DEALER_STANDS_AT}
+    draw_probability = sum(drawing.values(), Fraction(0))
+
+    return draw_probability, normalize(drawing), normalize(standing)
+
+
+def normalize(distribution: Distribution) -> Distribution:
+    total = sum(distribution.values(), Fraction(0))
+
+    if total == 0:
+        return {}
+
+    return {state: probability / total for state, probability in distribution.items()}
+
+
+def get_final_totals(distribution: Distribution) -> dict[int, Fraction]:
+    result: dict[int, Fraction] = {}
+
+    for (total, _), probability in distribution.items():
+        result[total] = result.get(total, Fraction(0)) + probability
+
+    return result
+
+
+class StrategySolver:
+    def __init__(self, soft_aces_enabled: bool) -> None:
+        self._soft_aces_enabled = soft_aces_enabled
+        self._dealer: dict[DealerKey, Distribution] = {}
+        self._values: dict[tuple[int, int, DealerKey], tuple[Fraction, Fraction]] = {}
+        self._build_dealer_posteriors()
+
+    def solve(self) -> 'StrategyTable':
+        values: dict[StateKey, tuple[float, float]] = {}
+        player_states = {(total, 0) for total in range(4, BLACKJACK + 2)}
+
+        if self._soft_aces_enabled:
+            player_states |= {(total, 1) for total in range(12, BLACKJACK + 1)}
+
+        for total, soft_aces in player_states:
+            for dealer_key in self._dealer:
+                stand, hit = self._get_values(total, soft_aces, dealer_key)
+                key: StateKey = (total, soft_aces > 0) + dealer_key
+                values[key] = (float(stand), float(hit))
+
+        dealer = {
+            dealer_key: {total: float(probability) for total, probability in get_final_totals(self._get_stand_outcome(dealer_key)).items()}
+            for dealer_key in self._dealer
+        }
+
+        return StrategyTable(values, dealer)
+
+    def _build_dealer_posteriors(self) -> None:
+        distribution = draw_card(draw_card({(0, 0): Fraction(1)}, self._soft_aces_enabled), self._soft_aces_enabled)
+        cards = 2
+
+        while len(distribution) > 0:
+            self._dealer[(cards, False)] = distribution
+            draw_probability, drawing, standing = split_distribution(distribution)
+
+            if len(standing) > 0:
+                self._dealer[(cards, True)] = standing
+
+            distribution = draw_card(drawing, self._soft_aces_enabled) if draw_probability > 0 else {}
+            cards += 1
+
+    def _get_dealer_moves(self, dealer_key: DealerKey) -> list[tuple[Fraction, DealerKey]]:
+        cards, stopped = dealer_key
+
+        if stopped:
+            return [(Fraction(1), dealer_key)]
+
+        draw_probability, _, _ = split_distribution(self._dealer[dealer_key])
+        moves: list[tuple[Fraction, DealerKey]] = []
+
+        if draw_probability > 0:
+            moves.append((draw_probability, (cards + 1, False)))
+
+        if draw_probability < 1:
+            moves.append((1 - draw_probability, (cards, True)))
+
+        return moves
+
+    def _get_stand_outcome(self, dealer_key: DealerKey) -> Distribution:
+        result: Distribution = {}
+
+        for probability, next_key in self._get_dealer_moves(dealer_key):
+            for state, state_probability in self._dealer[next_key].items():
+                result[state] = result.get(state, Fraction(0)) + probability * state_probability
+
+        return result
+
+    def _get_expected_result(self, player_total: int, dealer_key: DealerKey) -> Fraction:
+        return sum(
+            (probability * compare_totals(player_total, total) for total, probability in get_final_totals(self._dealer[dealer_key]).items()),
+            Fraction(0)
+        )
+
+    def _get_values(self, total: int, soft_aces: int, dealer_key: DealerKey) -> tuple[Fraction, Fraction]:
+        key = (total, soft_aces, dealer_key)
+
+        if key in self._values:
+            return self._values[key]
+
+        stand = sum(
+            (
+                probability * compare_totals(total, dealer_total)
+                for dealer_total, probability in get_final_totals(self._get_stand_outcome(dealer_key)).items()
+            ),
+            Fraction(0)
+        )
+        hit = Fraction(0)
+
+        # the dealer moves before the player's card lands, and the round ends as soon as the player reaches 21
+        for move_probability, next_key in self._get_dealer_moves(dealer_key):
+            for score, card_probability in CARD_PROBABILITIES.items():
+                next_total, next_soft_aces = add_card_score(total, soft_aces, score, self._soft_aces_enabled)
+
+                if next_total >= BLACKJACK:
+                    value = self._get_expected_result(next_total, next_key)
+                else:
+                    value = max(self._get_values(next_total, next_soft_aces, next_key))
+
+                hit += move_probability * card_probability * value
+
+        self._values[key] = (stand, hit)
+
+        return stand, hit
+
+
+class StrategyTable:
+    def __init__(self, values: dict[StateKey, tuple[float, float]], dealer: dict[DealerKey, dict[int, float]]) -> None:
+        self._values = values
+        self._dealer = dealer
+        self._actions: dict[StateKey, Action] = {key: HIT if hit > stand else STAND for key, (stand, hit) in values.items()}
+
+    def get_action(self, player_total: int, soft: bool, dealer_cards: int, dealer_stopped: bool) -> Action:
+        return self._actions[(player_total, soft, dealer_cards, dealer_stopped)]
+
+    def get_values(self, player_total: int, soft: bool, dealer_cards: int, dealer_stopped: bool) -> tuple[float, float]:
+        return self._values[(player_total, soft, dealer_cards, dealer_stopped)]
+
+    def get_dealer_outcomes(self, dealer_cards: int, dealer_stopped: bool) -> dict[int, float]:
+        return self._dealer[(dealer_cards, dealer_stopped)]
+
+    def get_game_action(self, game: Game, soft_aces_enabled: bool) -> Action:
+        return self._actions[get_state_key(game, soft_aces_enabled)]
+
+    def to_json(self) -> dict:
+        return {
+            'version': TABLE_VERSION,
+            'states': [[*key, stand, hit] for key, (stand, hit) in self._values.items()],
+            'dealer': [[*key, {str(total): probability for total, probability in outcomes.items()}] for key, outcomes in self._dealer.items()],
+        }
+
+    @staticmethod
+    def from_json(data: dict) -> 'StrategyTable':
+        if data.get('version') != TABLE_VERSION:
+            raise Exception(f"Strategy table version {data.get('version')} is not {TABLE_VERSION}")
+
+        return StrategyTable(
+            {(total, soft, cards, stopped): (stand, hit) for total, soft, cards, stopped, stand, hit in data['states']},
+            {(cards, stopped): {int(total): probability for total, probability in outcomes.items()} for cards, stopped, outcomes in data['dealer']},
+        )
+
+
+def get_state_key(game: Game, soft_aces_enabled: bool) -> StateKey:
+    state = game['state']
+    total, soft_aces = score_cards(state['human_cards'], soft_aces_enabled)
+    dealer_cards = len(state['computer_cards'])
+    actions = len(state['human_cards']) - 2
+
+    # the dealer's cards are hidden, but a draw skipped on some action means it already stands on 17 or more
+    return (total, soft_aces > 0, dealer_cards, dealer_cards - 2 < actions)
+
+
+def get_table_path(soft_aces_enabled: bool) -> str:
+    rules = 'soft' if soft_aces_enabled else 'hard'
+
+    return os.path.join(get_default_base_path(), 'strategy', f'strategy-{rules}-v{TABLE_VERSION}.json')
+
+
+@functools.lru_cache(maxsize=4)
+def load_strategy_table(soft_aces_enabled: bool = False, path: Optional[str] = None) -> StrategyTable:
+    path = path or get_table_path(soft_aces_enabled)
+
+    if os.path.isfile(path):
+        with open(path, 'r') as file:
+            return StrategyTable.from_json(json.load(file))
+
+    table = StrategySolver(soft_aces_enabled).solve()
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+
+        with open(tmp_path, 'w') as file:
+            json.dump(table.to_json(), file)
+
+        os.replace(tmp_path, path)
+    except OSError:
+        # a read-only checkout still gets the table, it is just solved again next process
+        pass
+
+    return table
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from modules.observer.observer import validate_subscription_type
+from modules.utils.constants import SubscribesType
+
+AsyncSubscriberFunction = Callable[..., Awaitable[None]]
+QueuedEvent = tuple[SubscribesType, Any]
+
+
+class AsyncObserver:
+    _async_observers: dict[SubscribesType, list[AsyncSubscriberFunction]]
+    _queue: Optional['asyncio.Queue[QueuedEvent]']
+    _worker: Optional['asyncio.Task[None]']
+
+    def __init__(self, max_pending: int = 1000) -> None:
+        self._async_observers = {}
+        self._max_pending = max_pending
+        self._queue = None
+        self._worker = None
+
+    def subscribe(self, subscription_type: SubscribesType, fn: AsyncSubscriberFunction) -> None:
+        validate_subscription_type(subscription_type)
+        self._async_observers.setdefault(subscription_type, []).append(fn)
+
+    def unsubscribe(self, subscription_type: SubscribesType, fn: AsyncSubscriberFunction) -> None:
+        validate_subscription_type(subscription_type)
+        subscribers = self._async_observers.get(subscription_type, [])
+
+        if fn in subscribers:
+            subscribers.remove(fn)
+
+    async def notify(self, subscription_type: SubscribesType, data: Any = None) -> None:
+        subscribers = self._async_observers.get(subscription_type)
+
+        if subscribers is None:
+            validate_subscription_type(subscription_type)
+            return
+
+        if data is None:
+            await asyncio.gather(*(subscriber() for subscriber in tuple(subscribers)))
+        else:
+            await asyncio.gather(*(subscriber(data) for subscriber in tuple(subscribers)))
+
+    async def notify_later(self, subscription_type: SubscribesType, data: Any = None) -> None:
+        validate_subscription_type(subscription_type)
+
+        if self._queue is None or self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(self._max_pending)
+            self._worker = asyncio.get_running_loop().create_task(self._deliver(self._queue))
+
+        # waits only while max_pending events are already queued, which throttles fast producers
+        await self._queue.put((subscription_type, data))
+
+    async def drain(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        await self.drain()
+
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+            self._queue = None
+
+    async def _deliver(self, queue: 'asyncio.Queue[QueuedEvent]') -> None:
+        while True:
+            subscription_type, data = await queue.get()
+
+            try:
+                await self.notify(subscription_type, data)
+            except Exception as error:
+                # a fire-and-forget event has no caller left to raise into
+                asyncio.get_running_loop().call_exception_handler({
+                    'message': f'{subscription_type} subscriber failed',
+                    'exception': error,
+                })
+            finally:
+                queue.task_done()
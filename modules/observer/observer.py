@@ -1,66 +1,71 @@
-from typing import Callable, Optional, TypeVar, TypedDict, List
+import inspect
+import weakref
+from typing import Callable, Iterable, Optional, TypeVar, Union, cast
 from modules.utils.constants import OBSERVER_MESSAGES, SubscribesType
 
 SubscriberFunction = Callable[..., None]
-Subscriber = TypedDict(
-    'Subscriber',
-    {
-        'type': SubscribesType,
-        'subscribers': List[SubscriberFunction]
-    }
-)
+SubscriberReference = Union[SubscriberFunction, 'weakref.ref[SubscriberFunction]']
 T = TypeVar('T')
 
+SUBSCRIPTION_TYPES: frozenset[str] = frozenset(cast(Iterable[str], OBSERVER_MESSAGES.values()))
 
-def get_subscribers_by_type(subscription_type: SubscribesType) -> Callable[[Subscriber], bool]:
-    def filter_fn(item: Subscriber) -> bool:
-        return item['type'] == subscription_type
 
-    return filter_fn
+def validate_subscription_type(subscription_type: SubscribesType) -> None:
+    if subscription_type not in SUBSCRIPTION_TYPES:
+        raise Exception(
+            f'Not valid subscription_type\n Correct types: {list(OBSERVER_MESSAGES.values())}\n Incoming type: {subscription_type}'
+        )
+
+
+def dereference(subscriber: SubscriberReference) -> Optional[SubscriberFunction]:
+    if isinstance(subscriber, weakref.ref):
+        return subscriber()
+
+    return subscriber
 
 
 class Observer:
-    _observers: List[Subscriber] = []
+    _observers: dict[SubscribesType, list[SubscriberReference]]
 
-    def subscribe(self, subscription_type: SubscribesType, fn: SubscriberFunction) -> None:
-        observers = self._find_subs(subscription_type)
+    def __init__(self) -> None:
+        self._observers = {}
 
-        if len(observers) == 0:
-            item: Subscriber = {'type': subscription_type, 'subscribers': [fn]}
-            self._observers.append(item)
-        else:
-            subject = observers[0]
-            subscribers = subject['subscribers']
-            subscribers.append(fn)
+    def subscribe(self, subscription_type: SubscribesType, fn: SubscriberFunction, weak: bool = False) -> None:
+        validate_subscription_type(subscription_type)
+        subscriber: SubscriberReference = fn
+
+        if weak:
+            subscriber = weakref.WeakMethod(fn) if inspect.ismethod(fn) else weakref.ref(fn)  # type: ignore
+
+        self._observers.setdefault(subscription_type, []).append(subscriber)
 
     def unsubscribe(self, subscription_type: SubscribesType, fn: SubscriberFunction) -> None:
-        observers = self._find_subs(subscription_type)
-        if len(observers) > 0:
-            subject = observers[0]
-            subscribers = subject['subscribers']
-            subscribers.remove(fn)
+        validate_subscription_type(subscription_type)
+        subscribers = self._observers.get(subscription_type, [])
+
+        for index, subscriber in enumerate(subscribers):
+            if dereference(subscriber) == fn:
+                del subscribers[index]
+                return
 
     def notify(self, subscription_type: SubscribesType, data: Optional[T] = None) -> None:
-        observers = self._find_subs(subscription_type)
-
-        if len(observers) > 0:
-            subject = observers[0]
-            subscribers = subject['subscribers']
-
-            for subscriber in subscribers:
-                if data is None:
-                    subscriber()
-                else:
-                    subscriber(data)
-
-    def _find_subs(self, subscription_type: SubscribesType) -> list[Subscriber]:
-        subs_types = list(OBSERVER_MESSAGES.values())
-
-        if subscription_type in subs_types:
-            matches = filter(get_subscribers_by_type(
-                subscription_type), self._observers)
-            return list(matches)
-        else:
-            raise Exception(
-                f'Not valid subscription_type\n Correct types: {subs_types}\n Incoming type: {subscription_type}'
-            )
+        subscribers = self._observers.get(subscription_type)
+
+        if subscribers is None:
+            validate_subscription_type(subscription_type)
+            return
+
+        has_dead_subscribers = False
+
+        for subscriber in tuple(subscribers):
+            fn = dereference(subscriber)
+
+            if fn is None:
+                has_dead_subscribers = True
+            elif data is None:
+                fn()
+            else:
+                fn(data)
+
+        if has_dead_subscribers:
+            subscribers[:] = [subscriber for subscriber in subscribers if dereference(subscriber) is not None]
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Callable, Optional
+from uuid import uuid4
+
+from modules.controller.async_controller import AsyncController
+from modules.model.async_model import AsyncModel
+from modules.model.rng import RandomSourceFactory, StdlibRandom
+from modules.server.tokens import PlayerTokens
+from modules.storage.memory_storage import MemoryStorage
+from modules.storage.storage import Storage
+from modules.view.network_view import NetworkView
+
+StorageFactory = Callable[[str], Storage]
+
+
+def memory_storage_factory(player_id: str) -> Storage:
+    return MemoryStorage()
+
+
+def file_storage_factory(base_path: str) -> StorageFactory:
+    def create_storage(player_id: str) -> Storage:
+        return Storage(player_id=player_id, base_path=base_path)
+
+    return create_storage
+
+
+class GameServer:
+    _server: Optional[asyncio.Server]
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        storage_factory: StorageFactory = memory_storage_factory,
+        offload: bool = False,
+        idle_timeout: Optional[float] = None,
+        soft_aces: bool = False,
+        backlog: int = 1024,
+        rng_factory: RandomSourceFactory = StdlibRandom,
+        tokens: Optional[PlayerTokens] = None
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._storage_factory = storage_factory
+        self._offload = offload
+        self._idle_timeout = idle_timeout
+        self._soft_aces = soft_aces
+        self._backlog = backlog
+        self._rng_factory = rng_factory
+        self._server = None
+        self._tokens = tokens or PlayerTokens()
+        self._sessions: dict[str, NetworkView] = {}
+        self._players: dict[str, NetworkView] = {}
+
+    @property
+    def port(self) -> int:
+        if self._server is None:
+            raise Exception('Server is not started yet')
+
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def sessions(self) -> int:
+        return len(self._sessions)
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self._host, self._port, backlog=self._backlog)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+
+        async with self._server: # type: ignore
+            await self._server.serve_forever() # type: ignore
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        await asyncio.gather(*(view.close() for view in tuple(self._sessions.values())))
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session_id = str(uuid4())
+        view = NetworkView(reader, writer, self._idle_timeout)
+        self._sessions[session_id] = view
+        model: Optional[AsyncModel] = None
+        player_id: Optional[str] = None
+
+        try:
+            identity = await view.identify()
+            player_id = identity['player_id']
+
+            if player_id is not None:
+                try:
+                    token = self._tokens.authenticate(player_id, identity['token'])
+                except Exception as error:
+                    await view.reject(str(error))
+                    return
+
+                # two tables on one history would deal the same cards and overwrite each other's writes
+                if player_id in self._players:
+                    await view.reject('Player is already connected')
+                    return
+
+                self._players[player_id] = view
+
+                if token is not None:
+                    await view.send_identity(player_id, token)
+
+            # a returning player gets their own shard back, anonymous sessions get a throwaway one
+            model = AsyncModel(self._storage_factory(player_id or session_id), self._rng_factory(), soft_aces=self._soft_aces, offload=self._offload)
+            controller = AsyncController(model, view)
+            await controller.run()
+        except ConnectionError:
+            pass
+        finally:
+            del self._sessions[session_id]
+
+            if player_id is not None and self._players.get(player_id) is view:
+                del self._players[player_id]
+
+            await view.close()
+
+            if model is not None:
+                await model.close()
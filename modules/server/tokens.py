@@ -0,0 +1,51 @@
+import hashlib
+import hmac
+import json
+import os
+import secrets
+from typing import Optional
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class PlayerTokens:
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._path = path
+        self._hashes: dict[str, str] = {}
+
+        if path is not None and os.path.isfile(path):
+            with open(path, 'r') as file:
+                self._hashes = json.load(file)
+
+    def authenticate(self, player_id: str, token: Optional[str]) -> Optional[str]:
+        # the first client to name a player id owns it, later ones must bring back the token it was issued
+        stored = self._hashes.get(player_id)
+
+        if stored is None:
+            issued = secrets.token_urlsafe(32)
+            self._hashes[player_id] = hash_token(issued)
+            self._save()
+            return issued
+
+        if token is None or not hmac.compare_digest(stored, hash_token(token)):
+            raise Exception('Player token is invalid')
+
+        return None
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+
+        directory = os.path.dirname(self._path)
+
+        if directory != '' and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        tmp_path = f'{self._path}.tmp'
+
+        with open(tmp_path, 'w') as file:
+            json.dump(self._hashes, file)
+
+        os.replace(tmp_path, self._path)
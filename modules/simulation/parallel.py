@@ -0,0 +1,96 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from modules.model.rng import RNG_SOURCES, RandomSource
+from modules.model.shoe import DEFAULT_PENETRATION
+from modules.simulation.simulation import POLICIES, SimulationReport, Simulator, get_default_report
+
+Shard = tuple[str, int, int, str, bool, Optional[int], float, str]
+
+
+def derive_seed(seed: int, shard: int) -> int:
+    digest = hashlib.sha256(f'{seed}:{shard}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def run_shard(shard: Shard) -> SimulationReport:
+    policy_name, rounds, seed, bet, soft_aces, decks, penetration, rng = shard
+    source: RandomSource = RNG_SOURCES[rng](seed)
+    simulator = Simulator(POLICIES[policy_name], bet, rng=source, soft_aces=soft_aces, decks=decks, penetration=penetration)
+
+    return simulator.run(rounds)
+
+
+def merge_reports(reports: Iterable[SimulationReport]) -> SimulationReport:
+    merged = get_default_report()
+
+    for report in reports:
+        merged['rounds'] += report['rounds']
+        merged['elapsed'] += report['elapsed']
+        merged['total_wagered'] += report['total_wagered']
+        merged['net'] += report['net']
+        merged['refills'] += report['refills']
+
+        for winner in merged['outcomes']:
+            merged['outcomes'][winner] += report['outcomes'][winner]  # type: ignore
+
+        for gamer in merged['busts']:
+            merged['busts'][gamer] += report['busts'][gamer]  # type: ignore
+
+    if merged['elapsed'] > 0:
+        merged['hands_per_second'] = merged['rounds'] / merged['elapsed']
+
+    return merged
+
+
+def split_rounds(
+    rounds: int,
+    policy_name: str,
+    seed: int,
+    bet: str,
+    shard_size: int,
+    soft_aces: bool = False,
+    decks: Optional[int] = None,
+    penetration: float = DEFAULT_PENETRATION,
+    rng: str = 'stdlib'
+) -> list[Shard]:
+    shards: list[Shard] = []
+
+    for index, start in enumerate(range(0, rounds, shard_size)):
+        shards.append((policy_name, min(shard_size, rounds - start), derive_seed(seed, index), bet, soft_aces, decks, penetration, rng))
+
+    return shards
+
+
+def run_parallel(
+    rounds: int,
+    policy_name: str,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    bet: str = '5',
+    shard_size: int = 10_000,
+    soft_aces: bool = False,
+    decks: Optional[int] = None,
+    penetration: float = DEFAULT_PENETRATION,
+    rng: str = 'stdlib'
+) -> SimulationReport:
+    if policy_name not in POLICIES:
+        raise Exception(f'Unknown policy\n Correct policies: {list(POLICIES.keys())}\n Incoming policy: {policy_name}')
+
+    if rng not in RNG_SOURCES:
+        raise Exception(f'Unknown random source\n Correct sources: {list(RNG_SOURCES.keys())}\n Incoming source: {rng}')
+
+    shards = split_rounds(rounds, policy_name, seed, bet, shard_size, soft_aces, decks, penetration, rng)
+    started_at = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        report = merge_reports(pool.map(run_shard, shards))
+
+    # shards run concurrently, so throughput is measured against wall-clock time
+    report['elapsed'] = time.perf_counter() - started_at
+    report['hands_per_second'] = rounds / report['elapsed'] if report['elapsed'] > 0 else 0.0
+
+    return report
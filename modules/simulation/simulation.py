@@ -0,0 +1,147 @@
+import random
+import time
+from typing import Callable, Literal, Optional, TypedDict, Union
+
+from modules.model.model import BET_STATUS, Model
+from modules.model.rng import RandomSource
+from modules.model.shoe import DEFAULT_PENETRATION, Shoe
+from modules.model.strategy import load_strategy_table
+from modules.storage.aggregates import Aggregates, get_default_aggregates
+from modules.storage.memory_storage import MemoryStorage
+from modules.storage.storage import Game, Storage
+
+Action = Literal['Взять карту'] | Literal['Пас']
+
+Policy = Callable[[Game], Action]
+
+Outcomes = TypedDict('Outcomes', { 'human': int, 'computer': int, 'draw': int })
+
+Busts = TypedDict('Busts', { 'human': int, 'computer': int })
+
+SimulationReport = TypedDict(
+    'SimulationReport',
+    {
+        'rounds': int,
+        'elapsed': float,
+        'hands_per_second': float,
+        'outcomes': Outcomes,
+        'busts': Busts,
+        'total_wagered': int,
+        'net': int,
+        'refills': int,
+    }
+)
+
+
+def stand_policy(game: Game) -> Action:
+    return 'Пас'
+
+
+def hit_below_17_policy(game: Game) -> Action:
+    return 'Взять карту' if game['state']['human_score'] < 17 else 'Пас'
+
+
+def hit_below_12_policy(game: Game) -> Action:
+    return 'Взять карту' if game['state']['human_score'] < 12 else 'Пас'
+
+
+def basic_strategy_policy(game: Game) -> Action:
+    return load_strategy_table(False).get_game_action(game, False)
+
+
+def basic_strategy_soft_aces_policy(game: Game) -> Action:
+    return load_strategy_table(True).get_game_action(game, True)
+
+
+POLICIES: dict[str, Policy] = {
+    'stand': stand_policy,
+    'hit_below_17': hit_below_17_policy,
+    'hit_below_12': hit_below_12_policy,
+    'basic_strategy': basic_strategy_policy,
+    'basic_strategy_soft_aces': basic_strategy_soft_aces_policy,
+}
+
+
+def get_default_report() -> SimulationReport:
+    return {
+        'rounds': 0,
+        'elapsed': 0.0,
+        'hands_per_second': 0.0,
+        'outcomes': { 'human': 0, 'computer': 0, 'draw': 0 },
+        'busts': { 'human': 0, 'computer': 0 },
+        'total_wagered': 0,
+        'net': 0,
+        'refills': 0,
+    }
+
+
+class Simulator:
+    def __init__(
+        self,
+        policy: Policy,
+        bet: str = '5',
+        storage: Optional[Storage] = None,
+        rng: Optional[Union[random.Random, RandomSource]] = None,
+        soft_aces: bool = False,
+        decks: Optional[int] = None,
+        penetration: float = DEFAULT_PENETRATION
+    ) -> None:
+        self._storage = storage or MemoryStorage(keep_finished=False, compact_cards=True)
+        shoe = Shoe(self._storage.new_deck, decks, penetration, rng) if decks is not None else None
+        self._model = Model(self._storage, rng, soft_aces=soft_aces, shoe=shoe)
+        self._policy = policy
+        self._bet = bet
+
+    def run(self, rounds: int) -> SimulationReport:
+        report = get_default_report()
+        initial_aggregates = self._get_aggregates()
+        started_at = time.perf_counter()
+
+        for _ in range(rounds):
+            if not self._can_afford_bet():
+                self._storage.update_balance(self._storage.get_default_balance())
+                report['refills'] += 1
+
+            game = self.play_round()
+
+            report['outcomes'][game['winner'] or 'draw'] += 1  # type: ignore
+
+            if game['state']['human_score'] > 21:
+                report['busts']['human'] += 1
+
+            if game['state']['computer_score'] > 21:
+                report['busts']['computer'] += 1
+
+        report['elapsed'] = time.perf_counter() - started_at
+        report['rounds'] = rounds
+        report['hands_per_second'] = rounds / report['elapsed'] if report['elapsed'] > 0 else 0.0
+
+        aggregates = self._get_aggregates()
+        report['total_wagered'] = aggregates['total_wagered'] - initial_aggregates['total_wagered']
+        report['net'] = aggregates['net'] - initial_aggregates['net']
+
+        return report
+
+    def play_round(self) -> Game:
+        self._model.start({ 'bet': { 'value': self._bet, 'status': BET_STATUS['made'], 'gamer_type': 'human' } })
+        game = self._model.get_current_game()
+
+        while not game['finished']:
+            self._model.change_state({ 'action': self._policy(game) })
+            game = self._model.get_current_game()
+
+        return game
+
+    def _get_aggregates(self) -> Aggregates:
+        try:
+            return self._storage.get_aggregates()
+        except Exception:
+            return get_default_aggregates()
+
+    def _can_afford_bet(self) -> bool:
+        try:
+            balance = self._storage.get_balance()
+        except Exception:
+            return True
+
+        return balance['human'] - balance['freeze_human_balance'] >= int(self._bet)
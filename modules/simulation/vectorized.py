@@ -0,0 +1,146 @@
+from typing import Iterable, Optional, TypedDict
+
+import numpy as np
+
+from modules.model.hand import ACE_SCORE, BLACKJACK, SOFT_ACE_DISCOUNT
+from modules.utils.compact_cards import CARD_SCORES, AnyCard, get_card_score
+
+DEALER_STANDS_AT = 17
+
+HUMAN_WINS = 1
+COMPUTER_WINS = -1
+DRAW = 0
+
+DECK_SCORES = np.frombuffer(CARD_SCORES, dtype=np.uint8).astype(np.int8)
+
+BatchResult = TypedDict(
+    'BatchResult',
+    {
+        'winners': np.ndarray,
+        'human_scores': np.ndarray,
+        'computer_scores': np.ndarray,
+    }
+)
+
+BatchReport = TypedDict(
+    'BatchReport',
+    {
+        'rounds': int,
+        'human': int,
+        'computer': int,
+        'draw': int,
+        'human_busts': int,
+        'computer_busts': int,
+        'expected_value': float,
+    }
+)
+
+
+def encode_decks(decks: Iterable[Iterable[AnyCard]]) -> np.ndarray:
+    return np.array([[get_card_score(card) for card in deck] for deck in decks], dtype=np.int8)
+
+
+def shuffled_decks(batch: int, rng: np.random.Generator) -> np.ndarray:
+    return rng.permuted(np.tile(DECK_SCORES, (batch, 1)), axis=1)
+
+
+def add_cards(total: np.ndarray, soft_aces: np.ndarray, cards: np.ndarray, mask: np.ndarray, soft_aces_enabled: bool) -> None:
+    total += np.where(mask, cards, 0)
+
+    if not soft_aces_enabled:
+        return
+
+    soft_aces += mask & (cards == ACE_SCORE)
+
+    # one card can push a soft hand over twice (soft 21 plus an ace), so discount up to two aces
+    for _ in range(2):
+        discount = (total > BLACKJACK) & (soft_aces > 0)
+        total -= discount * SOFT_ACE_DISCOUNT
+        soft_aces -= discount
+
+
+def play_batch(decks: np.ndarray, threshold: int, soft_aces: bool = False) -> BatchResult:
+    # Model pops cards from the end of the deck, so the last column is dealt first
+    cards = decks[:, ::-1].astype(np.int16)
+    rows = np.arange(len(cards))
+    dealt = np.ones(len(cards), dtype=bool)
+
+    computer = np.zeros(len(cards), dtype=np.int16)
+    computer_soft = np.zeros(len(cards), dtype=np.int16)
+    human = np.zeros(len(cards), dtype=np.int16)
+    human_soft = np.zeros(len(cards), dtype=np.int16)
+
+    for column in range(2):
+        add_cards(computer, computer_soft, cards[:, column], dealt, soft_aces)
+
+    for column in range(2, 4):
+        add_cards(human, human_soft, cards[:, column], dealt, soft_aces)
+
+    cursor = np.full(len(cards), 4)
+    active = np.ones(len(cards), dtype=bool)
+
+    while active.any():
+        hits = active & (human < threshold)
+
+        computer_draws = active & (computer < DEALER_STANDS_AT)
+        add_cards(computer, computer_soft, cards[rows, cursor], computer_draws, soft_aces)
+        cursor += computer_draws
+
+        add_cards(human, human_soft, cards[rows, cursor], hits, soft_aces)
+        cursor += hits
+
+        active &= hits & (human < BLACKJACK)
+
+    return {
+        'winners': get_winners(human, computer),
+        'human_scores': human,
+        'computer_scores': computer,
+    }
+
+
+def get_winners(human: np.ndarray, computer: np.ndarray) -> np.ndarray:
+    human_in = human <= BLACKJACK
+    computer_in = computer <= BLACKJACK
+
+    is_human_winner = (human_in & (human > computer)) | (human_in & ~computer_in)
+    is_computer_winner = (computer_in & (computer > human)) | (computer_in & ~human_in)
+
+    return np.where(is_human_winner, HUMAN_WINS, np.where(is_computer_winner, COMPUTER_WINS, DRAW)).astype(np.int8)
+
+
+def simulate(
+    rounds: int,
+    threshold: int,
+    seed: Optional[int] = None,
+    batch_size: int = 1_000_000,
+    soft_aces: bool = False
+) -> BatchReport:
+    rng = np.random.default_rng(seed)
+    report: BatchReport = {
+        'rounds': rounds,
+        'human': 0,
+        'computer': 0,
+        'draw': 0,
+        'human_busts': 0,
+        'computer_busts': 0,
+        'expected_value': 0.0,
+    }
+
+    remaining = rounds
+
+    while remaining > 0:
+        batch = min(batch_size, remaining)
+        result = play_batch(shuffled_decks(batch, rng), threshold, soft_aces)
+        winners = result['winners']
+
+        report['human'] += int(np.count_nonzero(winners == HUMAN_WINS))
+        report['computer'] += int(np.count_nonzero(winners == COMPUTER_WINS))
+        report['draw'] += int(np.count_nonzero(winners == DRAW))
+        report['human_busts'] += int(np.count_nonzero(result['human_scores'] > BLACKJACK))
+        report['computer_busts'] += int(np.count_nonzero(result['computer_scores'] > BLACKJACK))
+        remaining -= batch
+
+    if rounds > 0:
+        report['expected_value'] = (report['human'] - report['computer']) / rounds
+
+    return report
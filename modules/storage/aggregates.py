@@ -0,0 +1,81 @@
+from typing import TYPE_CHECKING, Iterable, TypedDict
+
+if TYPE_CHECKING:
+    from modules.storage.storage import Game
+
+Aggregates = TypedDict(
+    'Aggregates',
+    {
+        'wins': int,
+        'losses': int,
+        'draws': int,
+        'total_wagered': int,
+        'net': int,
+        'current_streak': int,
+        'longest_win_streak': int,
+        'longest_loss_streak': int,
+    }
+)
+
+
+def get_default_aggregates() -> Aggregates:
+    return {
+        'wins': 0,
+        'losses': 0,
+        'draws': 0,
+        'total_wagered': 0,
+        'net': 0,
+        'current_streak': 0,
+        'longest_win_streak': 0,
+        'longest_loss_streak': 0,
+    }
+
+
+def apply_finished_game(aggregates: Aggregates, game: 'Game') -> Aggregates:
+    result: Aggregates = {**aggregates}  # type: ignore
+    streak = aggregates['current_streak']
+
+    for event in game['events']:
+        if event['gamer'] != 'human':
+            continue
+
+        if event['status'] == 'MADE':
+            result['total_wagered'] += event['value']
+        elif event['status'] == 'WIN':
+            result['net'] += event['value']
+        elif event['status'] == 'LOSE':
+            result['net'] -= event['value']
+
+    if game['winner'] == 'human':
+        result['wins'] += 1
+        streak = streak + 1 if streak > 0 else 1
+        result['longest_win_streak'] = max(result['longest_win_streak'], streak)
+    elif game['winner'] == 'computer':
+        result['losses'] += 1
+        streak = streak - 1 if streak < 0 else -1
+        result['longest_loss_streak'] = max(result['longest_loss_streak'], -streak)
+    else:
+        result['draws'] += 1
+        streak = 0
+
+    result['current_streak'] = streak
+    return result
+
+
+def rebuild_aggregates(games: Iterable['Game']) -> Aggregates:
+    aggregates = get_default_aggregates()
+
+    for game in games:
+        if game['finished']:
+            aggregates = apply_finished_game(aggregates, game)
+
+    return aggregates
+
+
+def get_winrate(aggregates: Aggregates) -> float:
+    played = aggregates['wins'] + aggregates['losses'] + aggregates['draws']
+
+    if played == 0:
+        return 0.0
+
+    return aggregates['wins'] / played
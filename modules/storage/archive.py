@@ -0,0 +1,196 @@
+import math
+import mmap
+import os
+import struct
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+
+from modules.utils.compact_cards import decode_card, to_compact_card
+
+if TYPE_CHECKING:
+    from modules.storage.storage import Game, GamerType
+
+MAGIC = b'BJAR'
+FORMAT_VERSION = 1
+MAX_HAND_CARDS = 12
+MAX_EVENTS = 4
+NO_CARD = 0xFF
+
+WINNERS: tuple[Optional['GamerType'], ...] = (None, 'human', 'computer')
+GAMERS: tuple['GamerType', ...] = ('human', 'computer')
+STATUSES = ('MADE', 'LOSE', 'WIN', 'DRAW')
+
+HEADER = struct.Struct('<4sHH')
+# uuid, created_at, winner, human/computer score, human/computer card count, cards, event count, events
+RECORD = struct.Struct(f'<16sdBBBBB{MAX_HAND_CARDS}s{MAX_HAND_CARDS}sB' + 'BBH' * MAX_EVENTS)
+
+Record = tuple[Any, ...]
+
+
+def encode_hand(cards: list) -> bytes:
+    if len(cards) > MAX_HAND_CARDS:
+        raise Exception(f'Hand of {len(cards)} cards does not fit an archive record')
+
+    return bytes(to_compact_card(card) for card in cards).ljust(MAX_HAND_CARDS, bytes([NO_CARD]))
+
+
+def encode_game(game: 'Game') -> bytes:
+    if not game['finished']:
+        raise Exception(f"Game {game['game_uuid']} is not finished and cannot be archived")
+
+    events = game['events']
+
+    if len(events) > MAX_EVENTS:
+        raise Exception(f"Game {game['game_uuid']} has more than {MAX_EVENTS} events")
+
+    state = game['state']
+    packed_events: list[int] = []
+
+    for index in range(MAX_EVENTS):
+        if index < len(events):
+            event = events[index]
+            packed_events += [STATUSES.index(event['status']), GAMERS.index(event['gamer']), event['value']]
+        else:
+            packed_events += [0, 0, 0]
+
+    return RECORD.pack(
+        bytes.fromhex(game['game_uuid']),
+        game.get('created_at', math.nan),
+        WINNERS.index(game['winner']),
+        state['human_score'],
+        state['computer_score'],
+        len(state['human_cards']),
+        len(state['computer_cards']),
+        encode_hand(state['human_cards']),
+        encode_hand(state['computer_cards']),
+        len(events),
+        *packed_events
+    )
+
+
+def decode_record(record: Record, compact_cards: bool = False) -> 'Game':
+    (
+        game_uuid, created_at, winner, human_score, computer_score,
+        human_count, computer_count, human_cards, computer_cards, events_count,
+        *packed_events
+    ) = record
+
+    decode = int if compact_cards else decode_card
+    game: Game = {
+        'game_uuid': game_uuid.hex(),
+        'events': [
+            {
+                'gamer': GAMERS[packed_events[index * 3 + 1]],
+                'value': packed_events[index * 3 + 2],
+                'status': STATUSES[packed_events[index * 3]],
+            }
+            for index in range(events_count)
+        ],
+        'state': {
+            'human_cards': [decode(card) for card in human_cards[:human_count]],
+            'computer_cards': [decode(card) for card in computer_cards[:computer_count]],
+            'human_score': human_score,
+            'computer_score': computer_score,
+        },
+        'finished': True,
+        'winner': WINNERS[winner],
+    }
+
+    if not math.isnan(created_at):
+        game['created_at'] = created_at
+
+    return game
+
+
+class GameArchive:
+    _map: Optional[mmap.mmap]
+
+    def __init__(self, path: str, compact_cards: bool = False) -> None:
+        self._path = path
+        self._compact_cards = compact_cards
+        self._map = None
+
+    def __enter__(self) -> 'GameArchive':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        if not os.path.isfile(self._path):
+            return 0
+
+        return (os.path.getsize(self._path) - HEADER.size) // RECORD.size
+
+    def __getitem__(self, index: int) -> 'Game':
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError(index)
+
+        return decode_record(RECORD.unpack_from(self._get_map(), HEADER.size + index * RECORD.size), self._compact_cards)
+
+    def __iter__(self) -> Iterator['Game']:
+        for record in self.iter_records():
+            yield decode_record(record, self._compact_cards)
+
+    def iter_records(self) -> Iterator[Record]:
+        if len(self) == 0:
+            return
+
+        with memoryview(self._get_map()) as view, view[HEADER.size:HEADER.size + len(self) * RECORD.size] as records:
+            # unpacks straight out of the page cache, nothing is read into Python buffers first
+            yield from RECORD.iter_unpack(records)
+
+    def append(self, games: Iterable['Game'], fsync: bool = False) -> int:
+        records = b''.join(encode_game(game) for game in games)
+
+        if len(records) == 0:
+            return 0
+
+        self.close()
+        is_new = not os.path.isfile(self._path) or os.path.getsize(self._path) < HEADER.size
+
+        if not is_new and (os.path.getsize(self._path) - HEADER.size) % RECORD.size != 0:
+            # drop a record torn by a crash mid-append so new records stay aligned
+            os.truncate(self._path, HEADER.size + len(self) * RECORD.size)
+
+        with open(self._path, 'wb' if is_new else 'ab') as file:
+            if is_new:
+                file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size))
+
+            file.write(records)
+
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+
+        return len(records) // RECORD.size
+
+    def get_last_uuids(self, count: int) -> set[str]:
+        total = len(self)
+
+        return {self[index]['game_uuid'] for index in range(max(0, total - count), total)}
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _get_map(self) -> mmap.mmap:
+        size = os.path.getsize(self._path)
+
+        if self._map is not None and self._map.size() != size:
+            self.close()
+
+        if self._map is None:
+            with open(self._path, 'rb') as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            magic, version, record_size = HEADER.unpack_from(self._map)
+
+            if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+                self.close()
+                raise Exception(f'{self._path} is not a game archive of format version {FORMAT_VERSION}')
+
+        return self._map
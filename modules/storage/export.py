@@ -0,0 +1,75 @@
+import csv
+import json
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional, TextIO
+
+from modules.storage.storage import Game
+
+Exporter = Callable[[Iterable[Game], TextIO], int]
+
+CSV_COLUMNS = (
+    'game_uuid',
+    'created_at',
+    'finished',
+    'winner',
+    'bet',
+    'human_score',
+    'computer_score',
+    'human_card_count',
+    'computer_card_count',
+)
+
+
+def get_bet(game: Game) -> Optional[int]:
+    for event in game['events']:
+        if event['status'] == 'MADE':
+            return event['value']
+
+    return None
+
+
+def format_timestamp(timestamp: Optional[float]) -> str:
+    if timestamp is None:
+        return ''
+
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def export_ndjson(games: Iterable[Game], file: TextIO) -> int:
+    count = 0
+
+    for game in games:
+        file.write(json.dumps(game, ensure_ascii=False))
+        file.write('\n')
+        count += 1
+
+    return count
+
+
+def export_csv(games: Iterable[Game], file: TextIO) -> int:
+    writer = csv.writer(file)
+    writer.writerow(CSV_COLUMNS)
+    count = 0
+
+    for game in games:
+        state = game['state']
+        writer.writerow((
+            game['game_uuid'],
+            format_timestamp(game.get('created_at')),
+            game['finished'],
+            game['winner'] or ('draw' if game['finished'] else ''),
+            get_bet(game),
+            state['human_score'],
+            state['computer_score'],
+            len(state['human_cards']),
+            len(state['computer_cards']),
+        ))
+        count += 1
+
+    return count
+
+
+EXPORTERS: dict[str, Exporter] = {
+    'ndjson': export_ndjson,
+    'csv': export_csv,
+}
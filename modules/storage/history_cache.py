@@ -0,0 +1,71 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+Signature = tuple[int, int, int]
+
+
+def get_signature(stat: os.stat_result) -> Signature:
+    # atomic replace gives every write a new inode, so a same-size rewrite within one mtime tick still misses
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class HistoryCache:
+    _entries: 'OrderedDict[str, tuple[Signature, Any, int]]'
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str, signature: Signature) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(path)
+
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(path)
+            self.hits += 1
+
+            return entry[1]
+
+    def put(self, path: str, signature: Signature, body: Any, size: int) -> None:
+        with self._lock:
+            self._remove(path)
+
+            if size > self._max_bytes:
+                return
+
+            self._entries[path] = (signature, body, size)
+            self._bytes += size
+
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._remove(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+
+        if entry is not None:
+            self._bytes -= entry[2]
+
+
+HISTORY_CACHE = HistoryCache()
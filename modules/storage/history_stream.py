@@ -0,0 +1,142 @@
+import json
+from typing import TYPE_CHECKING, Any, Iterator, Literal, Optional, TextIO, Union
+
+if TYPE_CHECKING:
+    from modules.storage.storage import Game, GamerType
+
+WinnerFilter = Union['GamerType', Literal['draw']]
+
+WHITESPACE = ' \t\n\r'
+
+
+def game_matches(
+    game: 'Game',
+    finished_only: bool = False,
+    winner: Optional[WinnerFilter] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None
+) -> bool:
+    if finished_only and not game['finished']:
+        return False
+
+    if winner is not None:
+        if not game['finished']:
+            return False
+
+        if (game['winner'] or 'draw') != winner:
+            return False
+
+    if since is not None or until is not None:
+        created_at = game.get('created_at')
+
+        if created_at is None:
+            return False
+
+        if since is not None and created_at < since:
+            return False
+
+        if until is not None and created_at >= until:
+            return False
+
+    return True
+
+
+class JsonStream:
+    def __init__(self, file: TextIO, chunk_size: int) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+
+    def peek(self) -> str:
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in WHITESPACE:
+                self._position += 1
+
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+
+            if not self._read_more():
+                raise Exception('Unexpected end of history file')
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+
+        if char not in chars:
+            raise Exception(f'Expected one of {chars!r} in history file, got {char!r}')
+
+        self._position += 1
+        return char
+
+    def decode_value(self) -> Any:
+        self.peek()
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+
+                continue
+
+            # a number cut by the chunk boundary still decodes, so only trust values followed by more input
+            if end == len(self._buffer) and self._read_more():
+                continue
+
+            self._position = end
+            self._discard_consumed()
+
+            return value
+
+    def _read_more(self) -> bool:
+        if self._eof:
+            return False
+
+        chunk = self._file.read(self._chunk_size)
+
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer += chunk
+        return True
+
+    def _discard_consumed(self) -> None:
+        if self._position > self._chunk_size:
+            self._buffer = self._buffer[self._position:]
+            self._position = 0
+
+
+def iter_history_games(path: str, chunk_size: int = 1 << 16) -> Iterator['Game']:
+    with open(path, 'r') as file:
+        stream = JsonStream(file, chunk_size)
+        stream.expect('{')
+
+        if stream.peek() == '}':
+            return
+
+        while True:
+            key = stream.decode_value()
+            stream.expect(':')
+
+            if key != 'games':
+                stream.decode_value()
+
+                if stream.expect(',}') == '}':
+                    return
+
+                continue
+
+            stream.expect('[')
+
+            if stream.peek() == ']':
+                return
+
+            while True:
+                yield stream.decode_value()
+
+                if stream.expect(',]') == ']':
+                    return
@@ -0,0 +1,275 @@
+import copy
+import json
+import os
+from typing import Iterator, Literal, Optional, TypedDict, Union
+
+from modules.storage.aggregates import Aggregates, rebuild_aggregates
+from modules.storage.history_stream import WinnerFilter, game_matches
+from modules.storage.storage import Balance, Game, History, Storage
+
+JournalOperation = Union[Literal['game'], Literal['balance'], Literal['aggregates']]
+
+JournalEntry = TypedDict(
+    'JournalEntry',
+    {
+        'op': JournalOperation,
+        'index': int,
+        'game': Game,
+        'balance': Balance,
+        'aggregates': Aggregates,
+    },
+    total=False
+)
+
+
+class JournalStorage(Storage):
+    _history: Optional[History]
+
+    def __init__(
+        self,
+        compact_every: int = 1000,
+        compact_cards: bool = False,
+        player_id: Optional[str] = None,
+        base_path: Optional[str] = None
+    ) -> None:
+        super().__init__(compact_cards, player_id, base_path)
+        self._journal_file_path = os.path.join(self._media_path, 'history.journal')
+        self._compact_every = compact_every
+        self._journal_entries = 0
+        self._history = None
+
+    def get_current_game(self) -> Game:
+        history = self._load_history()
+
+        if history is None:
+            current_game = self._create_new_game()
+            self._history = {'balance': self.get_default_balance(), 'games': [copy.deepcopy(current_game)]}
+            self.compact()
+            return current_game
+
+        last_game = history['games'][len(history['games']) - 1]
+
+        if last_game['finished']:
+            current_game = self._create_new_game()
+            self.add_game_in_history(current_game)
+            return current_game
+
+        return copy.deepcopy(last_game)
+
+    def has_last_not_ended_game(self) -> bool:
+        history = self._load_history()
+
+        if history is None or len(history['games']) == 0:
+            return False
+
+        return not history['games'][len(history['games']) - 1]['finished']
+
+    def update_game_in_history(self, updated_game: Game) -> None:
+        games = self._require_history()['games']
+        self._append([{'op': 'game', 'index': len(games) - 1, 'game': updated_game}])
+
+    def add_game_in_history(self, updated_game: Game) -> None:
+        games = self._require_history()['games']
+        self._append([{'op': 'game', 'index': len(games), 'game': updated_game}])
+
+    def remove_history_file(self) -> None:
+        super().remove_history_file()
+
+        if os.path.isfile(self._journal_file_path):
+            os.remove(self._journal_file_path)
+
+        self._history = None
+        self._journal_entries = 0
+
+    def update_balance(self, payload: Balance) -> None:
+        self._require_history()
+        self._append([{'op': 'balance', 'balance': payload}])
+
+    def get_balance(self) -> Balance:
+        return {**self._require_history()['balance']}
+
+    def get_all_games(self) -> list[Game]:
+        return [*self._iter_archived_games(), *copy.deepcopy(self._require_history()['games'])]
+
+    def iter_games(
+        self,
+        finished_only: bool = False,
+        winner: Optional[WinnerFilter] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Iterator[Game]:
+        for game in self._iter_archived_games():
+            if game_matches(game, finished_only, winner, since, until):
+                yield game
+
+        history = self._load_history()
+
+        if history is None:
+            return
+
+        for game in history['games']:
+            if game_matches(game, finished_only, winner, since, until):
+                yield copy.deepcopy(game)
+
+    def archive_finished_games(self, fsync: bool = True) -> int:
+        if self._load_history() is None:
+            return 0
+
+        self.compact()
+        archived = super().archive_finished_games(fsync)
+        self._history = None
+
+        return archived
+
+    def get_aggregates(self) -> Aggregates:
+        history = self._require_history()
+
+        if 'aggregates' not in history:
+            history['aggregates'] = rebuild_aggregates(history['games'])
+
+        return {**history['aggregates']}  # type: ignore
+
+    def update_aggregates(self, payload: Aggregates) -> None:
+        self._require_history()
+        self._append([{'op': 'aggregates', 'aggregates': payload}])
+
+    def get_version(self) -> Optional[int]:
+        return None
+
+    def commit_changes(
+        self,
+        balance: Optional[Balance],
+        games: list[Game],
+        aggregates: Optional[Aggregates] = None,
+        fsync: bool = False,
+        expected_version: Optional[int] = None
+    ) -> None:
+        if expected_version is not None:
+            raise Exception('Journal storage does not track history versions')
+
+        history = self._load_history()
+
+        if history is None:
+            self._history = {'balance': self.get_default_balance(), 'games': []}
+            history = self._history
+
+        entries: list[JournalEntry] = []
+        games_count = len(history['games'])
+        last_uuid = history['games'][games_count - 1]['game_uuid'] if games_count > 0 else None
+
+        if balance is not None:
+            entries.append({'op': 'balance', 'balance': balance})
+
+        if aggregates is not None:
+            entries.append({'op': 'aggregates', 'aggregates': aggregates})
+
+        for game in games:
+            if games_count > 0 and last_uuid == game['game_uuid']:
+                entries.append({'op': 'game', 'index': games_count - 1, 'game': game})
+            else:
+                entries.append({'op': 'game', 'index': games_count, 'game': game})
+                games_count += 1
+
+            last_uuid = game['game_uuid']
+
+        self._append(entries, fsync)
+
+    def compact(self) -> None:
+        history = self._require_history()
+
+        self._create_history_file(self._history_file_path, json.dumps(history))
+
+        with open(self._journal_file_path, 'w'):
+            pass
+
+        self._journal_entries = 0
+
+    def _get_last_game(self) -> Game:
+        games = self._require_history()['games']
+
+        return copy.deepcopy(games[len(games) - 1])
+
+    def _append(self, entries: list[JournalEntry], fsync: bool = False) -> None:
+        self._write_journal_file(''.join(json.dumps(entry) + '\n' for entry in entries), fsync)
+
+        history = self._require_history()
+
+        for entry in entries:
+            self._apply(history, copy.deepcopy(entry))
+
+        self._journal_entries += len(entries)
+
+        if self._journal_entries >= self._compact_every:
+            self.compact()
+
+    def _write_journal_file(self, data: str, fsync: bool = False) -> int:
+        with open(self._journal_file_path, 'a') as file:
+            # json.dumps escapes everything outside ascii, so characters written are bytes written
+            written = file.write(data)
+
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+
+        return written
+
+    def _apply(self, history: History, entry: JournalEntry) -> None:
+        if entry['op'] == 'balance':
+            history['balance'] = entry['balance']
+            return
+
+        if entry['op'] == 'aggregates':
+            history['aggregates'] = entry['aggregates']
+            return
+
+        games = history['games']
+        index = entry['index']
+
+        if index < len(games):
+            games[index] = entry['game']
+        else:
+            games.append(entry['game'])
+
+    def _require_history(self) -> History:
+        history = self._load_history()
+
+        if history is None:
+            raise FileNotFoundError(self._history_file_path)
+
+        return history
+
+    def _load_history(self) -> Optional[History]:
+        if self._history is not None:
+            return self._history
+
+        if not os.path.isdir(self._media_path):
+            os.makedirs(self._media_path)
+
+        history: Optional[History] = None
+        torn = False
+
+        if os.path.isfile(self._history_file_path):
+            history = copy.deepcopy(self._read_history_file())
+
+        if os.path.isfile(self._journal_file_path):
+            with open(self._journal_file_path, 'r') as file:
+                for line in file:
+                    try:
+                        entry: JournalEntry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # a torn tail left by a crash mid-append, everything before it is intact
+                        torn = True
+                        break
+
+                    if history is None:
+                        history = {'balance': self.get_default_balance(), 'games': []}
+
+                    self._apply(history, entry)
+                    self._journal_entries += 1
+
+        self._history = history
+
+        if torn and history is not None:
+            self.compact()
+
+        return history
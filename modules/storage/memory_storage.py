@@ -0,0 +1,144 @@
+import threading
+from typing import Iterator, Optional, Union
+
+from modules.storage.aggregates import Aggregates, rebuild_aggregates
+from modules.storage.history_stream import WinnerFilter, game_matches
+from modules.storage.storage import Balance, Game, History, Storage
+from modules.utils.compact_cards import CompactDeck, generate_compact_deck
+from modules.utils.constants import Deck, generate_deck
+
+
+class MemoryStorage(Storage):
+    _history: Optional[History]
+
+    def __init__(self, balance: Optional[Balance] = None, keep_finished: bool = True, compact_cards: bool = False) -> None:
+        super().__init__(compact_cards)
+        # nothing is on disk, so the shard lock of the default media path would only make unrelated tables wait on each other
+        self._lock = threading.RLock()
+        self._default_balance = balance or super().get_default_balance()
+        self._keep_finished = keep_finished
+        self._history = None
+
+    def get_current_game(self) -> Game:
+        if self._history is None:
+            current_game = self._create_new_game()
+            self._history = {'balance': self.get_default_balance(), 'games': [current_game]}
+            return current_game
+
+        last_game = self._get_last_game()
+
+        if last_game['finished']:
+            current_game = self._create_new_game()
+            self.add_game_in_history(current_game)
+            return current_game
+
+        return last_game
+
+    def has_last_not_ended_game(self) -> bool:
+        if self._history is None or len(self._history['games']) == 0:
+            return False
+
+        return not self._get_last_game()['finished']
+
+    def update_game_in_history(self, updated_game: Game) -> None:
+        games = self._require_history()['games']
+        games[len(games) - 1] = updated_game
+
+    def add_game_in_history(self, updated_game: Game) -> None:
+        history = self._require_history()
+
+        if not self._keep_finished:
+            history['games'] = [game for game in history['games'] if not game['finished']]
+
+        history['games'].append(updated_game)
+
+    def remove_history_file(self) -> None:
+        self._history = None
+
+    def new_deck(self) -> Union[Deck, CompactDeck]:
+        if self._compact_cards:
+            return generate_compact_deck()
+
+        return generate_deck()
+
+    def get_default_balance(self) -> Balance:
+        return {**self._default_balance}
+
+    def update_balance(self, payload: Balance) -> None:
+        self._require_history()['balance'] = payload
+
+    def get_balance(self) -> Balance:
+        return self._require_history()['balance']
+
+    def get_all_games(self) -> list[Game]:
+        return self._require_history()['games']
+
+    def iter_games(
+        self,
+        finished_only: bool = False,
+        winner: Optional[WinnerFilter] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Iterator[Game]:
+        if self._history is None:
+            return
+
+        for game in self._history['games']:
+            if game_matches(game, finished_only, winner, since, until):
+                yield game
+
+    def get_aggregates(self) -> Aggregates:
+        history = self._require_history()
+
+        if 'aggregates' not in history:
+            history['aggregates'] = rebuild_aggregates(history['games'])
+
+        return history['aggregates']
+
+    def update_aggregates(self, payload: Aggregates) -> None:
+        self._require_history()['aggregates'] = payload
+
+    def archive_finished_games(self, fsync: bool = True) -> int:
+        raise Exception('In-memory storage does not support archiving')
+
+    def get_version(self) -> Optional[int]:
+        return None
+
+    def commit_changes(
+        self,
+        balance: Optional[Balance],
+        games: list[Game],
+        aggregates: Optional[Aggregates] = None,
+        fsync: bool = False,
+        expected_version: Optional[int] = None
+    ) -> None:
+        if expected_version is not None:
+            raise Exception('In-memory storage does not track history versions')
+
+        if self._history is None:
+            self._history = {'balance': self.get_default_balance(), 'games': []}
+
+        if balance is not None:
+            self.update_balance(balance)
+
+        if aggregates is not None:
+            self.update_aggregates(aggregates)
+
+        for game in games:
+            stored_games = self._history['games']
+
+            if len(stored_games) > 0 and stored_games[len(stored_games) - 1]['game_uuid'] == game['game_uuid']:
+                self.update_game_in_history(game)
+            else:
+                self.add_game_in_history(game)
+
+    def _get_last_game(self) -> Game:
+        games = self._require_history()['games']
+
+        return games[len(games) - 1]
+
+    def _require_history(self) -> History:
+        if self._history is None:
+            raise Exception('History is not created yet')
+
+        return self._history
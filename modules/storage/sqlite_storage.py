@@ -0,0 +1,344 @@
+import json
+import os
+import sqlite3
+from typing import Any, Iterator, Optional
+
+from modules.storage.aggregates import Aggregates, rebuild_aggregates
+from modules.storage.archive import GameArchive
+from modules.storage.history_stream import WinnerFilter
+from modules.storage.storage import Balance, Game, History, Storage
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_uuid TEXT NOT NULL UNIQUE,
+    finished INTEGER NOT NULL,
+    winner TEXT,
+    state TEXT NOT NULL,
+    created_at REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    game_uuid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    gamer TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (game_uuid, position)
+);
+CREATE TABLE IF NOT EXISTS balance (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    human INTEGER NOT NULL,
+    computer INTEGER NOT NULL,
+    freeze_human_balance INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    total_wagered INTEGER NOT NULL,
+    net INTEGER NOT NULL,
+    current_streak INTEGER NOT NULL,
+    longest_win_streak INTEGER NOT NULL,
+    longest_loss_streak INTEGER NOT NULL
+);
+'''
+
+AGGREGATE_COLUMNS = (
+    'wins',
+    'losses',
+    'draws',
+    'total_wagered',
+    'net',
+    'current_streak',
+    'longest_win_streak',
+    'longest_loss_streak',
+)
+
+
+class SqliteStorage(Storage):
+    def __init__(self, compact_cards: bool = False, player_id: Optional[str] = None, base_path: Optional[str] = None) -> None:
+        super().__init__(compact_cards, player_id, base_path)
+        self._db_file_path = os.path.join(self._media_path, 'history.sqlite3')
+
+        if not os.path.isdir(self._media_path):
+            os.makedirs(self._media_path)
+
+        # AsyncModel calls in from worker threads, the shard lock keeps them off the connection at the same time
+        self._connection = sqlite3.connect(self._db_file_path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._migrate()
+        # switching an existing player to SQLite keeps their JSON history, it is only read while the database is empty
+        self.import_history_file()
+
+    def get_current_game(self) -> Game:
+        with self._lock:
+            if not self._has_history():
+                current_game = self._create_new_game()
+
+                with self._connection:
+                    self._write_balance(self.get_default_balance())
+                    self._insert_game(current_game)
+
+                return current_game
+
+            last_game = self._get_last_game()
+
+            if last_game['finished']:
+                current_game = self._create_new_game()
+                self.add_game_in_history(current_game)
+                return current_game
+
+            return last_game
+
+    def has_last_not_ended_game(self) -> bool:
+        with self._lock:
+            row = self._connection.execute('SELECT finished FROM games ORDER BY id DESC LIMIT 1').fetchone()
+
+            return row is not None and not row[0]
+
+    def update_game_in_history(self, updated_game: Game) -> None:
+        with self._lock:
+            row = self._connection.execute('SELECT id, game_uuid FROM games ORDER BY id DESC LIMIT 1').fetchone()
+
+            if row is None:
+                raise Exception('History is not created yet')
+
+            with self._connection:
+                self._replace_game(row[0], row[1], updated_game)
+
+    def add_game_in_history(self, updated_game: Game) -> None:
+        with self._lock:
+            with self._connection:
+                self._insert_game(updated_game)
+
+    def remove_history_file(self) -> None:
+        with self._lock:
+            with self._connection:
+                self._connection.execute('DELETE FROM events')
+                self._connection.execute('DELETE FROM games')
+                self._connection.execute('DELETE FROM balance')
+                self._connection.execute('DELETE FROM aggregates')
+
+    def update_balance(self, payload: Balance) -> None:
+        with self._lock:
+            with self._connection:
+                self._write_balance(payload)
+
+    def get_balance(self) -> Balance:
+        with self._lock:
+            row = self._connection.execute('SELECT human, computer, freeze_human_balance FROM balance WHERE id = 1').fetchone()
+
+            if row is None:
+                raise Exception('History is not created yet')
+
+            return {'human': row[0], 'computer': row[1], 'freeze_human_balance': row[2]}
+
+    def get_all_games(self) -> list[Game]:
+        with self._lock:
+            events: dict[str, list] = {}
+
+            for game_uuid, gamer, value, status in self._connection.execute(
+                'SELECT game_uuid, gamer, value, status FROM events ORDER BY game_uuid, position'
+            ):
+                events.setdefault(game_uuid, []).append({'gamer': gamer, 'value': value, 'status': status})
+
+            rows = self._connection.execute('SELECT game_uuid, finished, winner, state, created_at FROM games ORDER BY id')
+
+            return [self._to_game(row, events.get(row[0], [])) for row in rows]
+
+    def iter_games(
+        self,
+        finished_only: bool = False,
+        winner: Optional[WinnerFilter] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Iterator[Game]:
+        conditions = []
+        parameters: list[Any] = []
+
+        if finished_only or winner is not None:
+            conditions.append('finished = 1')
+
+        if winner == 'draw':
+            conditions.append('winner IS NULL')
+        elif winner is not None:
+            conditions.append('winner = ?')
+            parameters.append(winner)
+
+        if since is not None:
+            conditions.append('created_at >= ?')
+            parameters.append(since)
+
+        if until is not None:
+            conditions.append('created_at < ?')
+            parameters.append(until)
+
+        where = f' WHERE {" AND ".join(conditions)}' if len(conditions) > 0 else ''
+
+        with self._lock:
+            rows = self._connection.execute(f'SELECT game_uuid, finished, winner, state, created_at FROM games{where} ORDER BY id', parameters).fetchall()
+
+        for row in rows:
+            with self._lock:
+                game = self._to_game(row, self._get_events(row[0]))
+
+            yield game
+
+    def get_aggregates(self) -> Aggregates:
+        with self._lock:
+            row = self._connection.execute(f'SELECT {", ".join(AGGREGATE_COLUMNS)} FROM aggregates WHERE id = 1').fetchone()
+
+            if row is None:
+                return rebuild_aggregates(self.get_all_games())
+
+            return dict(zip(AGGREGATE_COLUMNS, row))  # type: ignore
+
+    def update_aggregates(self, payload: Aggregates) -> None:
+        with self._lock:
+            with self._connection:
+                self._write_aggregates(payload)
+
+    def archive_finished_games(self, fsync: bool = True) -> int:
+        raise Exception('SQLite storage does not support archiving')
+
+    def get_version(self) -> Optional[int]:
+        return None
+
+    def commit_changes(
+        self,
+        balance: Optional[Balance],
+        games: list[Game],
+        aggregates: Optional[Aggregates] = None,
+        fsync: bool = False,
+        expected_version: Optional[int] = None
+    ) -> None:
+        with self._lock:
+            if expected_version is not None:
+                raise Exception('SQLite storage does not track history versions')
+
+            with self._connection:
+                if balance is not None:
+                    self._write_balance(balance)
+                elif not self._has_history():
+                    self._write_balance(self.get_default_balance())
+
+                if aggregates is not None:
+                    self._write_aggregates(aggregates)
+
+                for game in games:
+                    row = self._connection.execute('SELECT id, game_uuid FROM games ORDER BY id DESC LIMIT 1').fetchone()
+
+                    if row is not None and row[1] == game['game_uuid']:
+                        self._replace_game(row[0], row[1], game)
+                    else:
+                        self._insert_game(game)
+
+    def import_history_file(self, path: Optional[str] = None) -> bool:
+        with self._lock:
+            path = path or self._history_file_path
+
+            if self._has_history() or not os.path.isfile(path):
+                return False
+
+            with open(path, 'r') as file:
+                history: History = json.load(file)
+
+            archive_path = os.path.join(os.path.dirname(path), 'history.archive')
+            games: list[Game] = []
+
+            if os.path.isfile(archive_path):
+                with GameArchive(archive_path, self._compact_cards) as archive:
+                    games.extend(archive)
+
+            games.extend(history['games'])
+
+            with self._connection:
+                self._write_balance(history['balance'])
+
+                for game in games:
+                    self._insert_game(game)
+
+                self._write_aggregates(history['aggregates'] if 'aggregates' in history else rebuild_aggregates(games))
+
+            return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _get_last_game(self) -> Game:
+        row = self._connection.execute('SELECT game_uuid, finished, winner, state, created_at FROM games ORDER BY id DESC LIMIT 1').fetchone()
+
+        if row is None:
+            raise Exception('History is not created yet')
+
+        return self._to_game(row, self._get_events(row[0]))
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._connection.execute('PRAGMA table_info(games)')}
+
+        if 'created_at' not in columns:
+            with self._connection:
+                self._connection.execute('ALTER TABLE games ADD COLUMN created_at REAL')
+
+    def _has_history(self) -> bool:
+        return self._connection.execute('SELECT 1 FROM balance WHERE id = 1').fetchone() is not None
+
+    def _get_events(self, game_uuid: str) -> list:
+        rows = self._connection.execute(
+            'SELECT gamer, value, status FROM events WHERE game_uuid = ? ORDER BY position', (game_uuid,)
+        )
+
+        return [{'gamer': gamer, 'value': value, 'status': status} for gamer, value, status in rows]
+
+    def _to_game(self, row: Any, events: list) -> Game:
+        game_uuid, finished, winner, state, created_at = row
+        game: Game = {
+            'game_uuid': game_uuid,
+            'events': events,
+            'state': json.loads(state),
+            'finished': bool(finished),
+            'winner': winner,
+        }
+
+        if created_at is not None:
+            game['created_at'] = created_at
+
+        return game
+
+    def _insert_game(self, game: Game) -> None:
+        self._connection.execute(
+            'INSERT INTO games (game_uuid, finished, winner, state, created_at) VALUES (?, ?, ?, ?, ?)',
+            (game['game_uuid'], game['finished'], game['winner'], json.dumps(game['state']), game.get('created_at'))
+        )
+        self._insert_events(game)
+
+    def _replace_game(self, game_id: int, game_uuid: str, game: Game) -> None:
+        self._connection.execute('DELETE FROM events WHERE game_uuid = ?', (game_uuid,))
+        self._connection.execute(
+            'UPDATE games SET game_uuid = ?, finished = ?, winner = ?, state = ?, created_at = ? WHERE id = ?',
+            (game['game_uuid'], game['finished'], game['winner'], json.dumps(game['state']), game.get('created_at'), game_id)
+        )
+        self._insert_events(game)
+
+    def _insert_events(self, game: Game) -> None:
+        self._connection.executemany(
+            'INSERT INTO events (game_uuid, position, gamer, value, status) VALUES (?, ?, ?, ?, ?)',
+            [
+                (game['game_uuid'], position, event['gamer'], event['value'], event['status'])
+                for position, event in enumerate(game['events'])
+            ]
+        )
+
+    def _write_balance(self, payload: Balance) -> None:
+        self._connection.execute(
+            'INSERT OR REPLACE INTO balance (id, human, computer, freeze_human_balance) VALUES (1, ?, ?, ?)',
+            (payload['human'], payload['computer'], payload['freeze_human_balance'])
+        )
+
+    def _write_aggregates(self, payload: Aggregates) -> None:
+        self._connection.execute(
+            f'INSERT OR REPLACE INTO aggregates (id, {", ".join(AGGREGATE_COLUMNS)}) VALUES (1, {", ".join("?" for _ in AGGREGATE_COLUMNS)})',
+            tuple(payload[column] for column in AGGREGATE_COLUMNS)  # type: ignore
+        )
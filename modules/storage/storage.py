@@ -1,21 +1,48 @@
-from io import StringIO
+from contextlib import contextmanager
+import copy
+import hashlib
 import json
 import os
-from typing import Any, Literal, Optional, TypedDict, Union
+import threading
+import time
+from types import ModuleType
+from typing import Any, Iterator, Literal, Optional, TypedDict, Union
 from uuid import uuid4
+import weakref
 
-from modules.utils.constants import Card, Deck, generate_deck
+from typing_extensions import NotRequired
+
+from modules.storage.aggregates import Aggregates, rebuild_aggregates
+from modules.storage.archive import GameArchive
+from modules.storage.history_cache import HISTORY_CACHE, HistoryCache, get_signature
+from modules.storage.history_stream import WinnerFilter, game_matches, iter_history_games
+from modules.utils.compact_cards import AnyCard, CompactDeck, generate_compact_deck
+from modules.utils.constants import Deck, generate_deck
+
+fcntl: Optional[ModuleType]
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 GamerType = Union[Literal['human'], Literal['computer']]
 
 State = TypedDict(
     'State',
     {
-        'computer_cards': list[Card],
-        'human_cards': list[Card],
+        'computer_cards': list[AnyCard],
+        'human_cards': list[AnyCard],
         'human_score': int,
         'computer_score': int,
-        'deck': Deck,
+        'deck': NotRequired[Union[Deck, CompactDeck]],
+        'deck_seed': NotRequired[int],
+        'deck_cursor': NotRequired[int],
+        'deck_rng': NotRequired[str],
+        'shoe_seed': NotRequired[int],
+        'shoe_cursor': NotRequired[int],
+        'shoe_decks': NotRequired[int],
+        'shoe_rng': NotRequired[str],
     }
 )
 
@@ -27,6 +54,7 @@ Game = TypedDict(
         'state': State,
         'finished': bool,
         'winner': Optional[GamerType],
+        'created_at': NotRequired[float],
     }
 )
 
@@ -36,84 +64,321 @@ Balance = TypedDict('Balance', {
     'freeze_human_balance': int,
 })
 
+History = TypedDict('History', {
+    'balance': Balance,
+    'games': list[Game],
+    'aggregates': NotRequired[Aggregates],
+    'version': NotRequired[int],
+})
+
+class VersionConflictError(Exception):
+    pass
+
+
+_shard_locks: 'weakref.WeakValueDictionary[str, threading.RLock]' = weakref.WeakValueDictionary()
+_shard_locks_guard = threading.Lock()
+
+
+def get_default_base_path() -> str:
+    return os.path.join(os.path.dirname(os.path.realpath('__file__')), 'media')
+
+
+def get_shard_path(base_path: str, player_id: str) -> str:
+    digest = hashlib.sha256(player_id.encode('utf-8')).hexdigest()
+
+    return os.path.join(base_path, 'players', digest[:2], digest)
+
+
+def get_shard_lock(path: str) -> threading.RLock:
+    key = os.path.realpath(path)
+
+    with _shard_locks_guard:
+        lock = _shard_locks.get(key)
+
+        if lock is None:
+            lock = threading.RLock()
+            _shard_locks[key] = lock
+
+        return lock
+
+
 class Storage:
-    def __init__(self) -> None:
-        fileDir = os.path.dirname(os.path.realpath('__file__'))
-        path = 'media/history.json'
-        self._media_path = os.path.join(fileDir, 'media')
-        self._history_file_path = os.path.join(fileDir, path)
+    def __init__(
+        self,
+        compact_cards: bool = False,
+        player_id: Optional[str] = None,
+        base_path: Optional[str] = None,
+        file_lock: bool = False,
+        history_cache: Optional[HistoryCache] = HISTORY_CACHE
+    ) -> None:
+        self._compact_cards = compact_cards
+        self._history_cache = history_cache
+        base_path = base_path or get_default_base_path()
+        self._media_path = base_path if player_id is None else get_shard_path(base_path, player_id)
+        self._history_file_path = os.path.join(self._media_path, 'history.json')
+        self._lock_file_path = os.path.join(self._media_path, 'history.lock')
+        self._archive_file_path = os.path.join(self._media_path, 'history.archive')
+        self._lock = get_shard_lock(self._media_path)
+        self._file_lock = file_lock and fcntl is not None
+        self._file_lock_depth = 0
 
     def get_current_game(self) -> Game:
-        if not os.path.isdir(self._media_path):
-            os.makedirs(self._media_path)
+        with self._exclusive():
+            if not os.path.isdir(self._media_path):
+                os.makedirs(self._media_path)
 
-        if os.path.isfile(self._history_file_path):
-            last_game = self._get_last_game()
-            current_game = last_game
+            if os.path.isfile(self._history_file_path):
+                last_game = self._get_last_game()
+                current_game = last_game
 
-            if last_game['finished']:
-                current_game = self._create_new_game()
-                self.add_game_in_history(current_game)
+                if last_game['finished']:
+                    current_game = self._create_new_game()
+                    self.add_game_in_history(current_game)
 
-            return current_game
-        else:
-            current_game = self._create_new_game()
-            init_data = json.dumps({'balance': self.get_default_balance(), 'games': [current_game]})
+                return current_game
+            else:
+                current_game = self._create_new_game()
 
-            self._create_history_file(self._history_file_path, init_data)
-            return current_game
+                self._write_history({'balance': self.get_default_balance(), 'games': [copy.deepcopy(current_game)]})
+                return current_game
 
     def has_last_not_ended_game(self) -> bool:
         if not os.path.isdir(self._media_path):
             os.makedirs(self._media_path)
 
         if os.path.isfile(self._history_file_path):
-            last_game = self._get_last_game()
+            games = self._read_history_file()['games']
 
-            return last_game and not last_game['finished']
+            return len(games) > 0 and not games[len(games) - 1]['finished']
         else:
             return False
 
     def update_game_in_history(self, updated_game: Game) -> None:
-        body = self._read_history_file()
-        games = body['games']
-        games[len(games) - 1] = updated_game
+        with self._exclusive():
+            body: History = copy.copy(self._read_history_file())
+            games = body['games']
+            body['games'] = [*games[:len(games) - 1], copy.deepcopy(updated_game)]
 
-        self._create_history_file(self._history_file_path, json.dumps(body))
+            self._write_history(body)
 
     def add_game_in_history(self, updated_game: Game) -> None:
-        body = self._read_history_file()
-        games = body['games']
-        games.append(updated_game)
+        with self._exclusive():
+            body: History = copy.copy(self._read_history_file())
+            body['games'] = [*body['games'], copy.deepcopy(updated_game)]
 
-        self._create_history_file(self._history_file_path, json.dumps(body))
+            self._write_history(body)
 
     def remove_history_file(self) -> None:
-        if os.path.isfile(self._history_file_path):
-            os.remove(self._history_file_path)
+        with self._exclusive():
+            if os.path.isfile(self._history_file_path):
+                os.remove(self._history_file_path)
+
+            if self._history_cache is not None:
+                self._history_cache.invalidate(self._history_file_path)
+
+            if os.path.isfile(self._archive_file_path):
+                os.remove(self._archive_file_path)
+
+    def new_deck(self) -> Union[Deck, CompactDeck]:
+        if self._compact_cards:
+            return list(generate_compact_deck())
+
+        return generate_deck()
 
     def get_default_balance(self) -> Balance: 
         return { 'human': 100, 'computer': 500, 'freeze_human_balance': 0, }
 
     def update_balance(self, payload: Balance) -> None: 
-        data = self._read_history_file()
-
-        updated_data = { **data, 'balance': payload }
+        with self._exclusive():
+            body: History = copy.copy(self._read_history_file())
+            body['balance'] = copy.copy(payload)
 
-        self._create_history_file(self._history_file_path, json.dumps(updated_data))
+            self._write_history(body)
 
     def get_balance(self) -> Balance:
         body = self._read_history_file()
-        return body['balance']
+        return copy.copy(body['balance'])
 
     def get_all_games(self) -> list[Game]:
-        return self._read_history_file()['games']
+        return [*self._iter_archived_games(), *copy.deepcopy(self._read_history_file()['games'])]
+
+    def iter_games(
+        self,
+        finished_only: bool = False,
+        winner: Optional[WinnerFilter] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Iterator[Game]:
+        for game in self._iter_archived_games():
+            if game_matches(game, finished_only, winner, since, until):
+                yield game
+
+        if not os.path.isfile(self._history_file_path):
+            return
+
+        for game in iter_history_games(self._history_file_path):
+            if game_matches(game, finished_only, winner, since, until):
+                yield game
+
+    def get_archive(self) -> GameArchive:
+        return GameArchive(self._archive_file_path, self._compact_cards)
+
+    def archive_finished_games(self, fsync: bool = True) -> int:
+        with self._exclusive():
+            if not os.path.isfile(self._history_file_path):
+                return 0
+
+            body: History = copy.copy(self._read_history_file())
+            games = body['games']
+            # the last game stays hot even when finished, get_current_game starts the next one from it
+            finished = [game for game in games[:len(games) - 1] if game['finished']]
+
+            if len(finished) == 0:
+                return 0
+
+            if 'aggregates' not in body:
+                body['aggregates'] = rebuild_aggregates([*self._iter_archived_games(), *games])
+
+            with self.get_archive() as archive:
+                # a crash between the append and the rewrite below leaves these games in both files
+                archived = archive.get_last_uuids(len(finished))
+                archive.append([game for game in finished if game['game_uuid'] not in archived], fsync)
+
+            body['games'] = [game for game in games[:len(games) - 1] if not game['finished']] + games[len(games) - 1:]
+            self._write_history(body, fsync)
+
+            return len(finished)
+
+    def get_aggregates(self) -> Aggregates:
+        body = self._read_history_file()
+
+        if 'aggregates' not in body:
+            return rebuild_aggregates(body['games'])
+
+        return copy.copy(body['aggregates'])
+
+    def update_aggregates(self, payload: Aggregates) -> None:
+        with self._exclusive():
+            body: History = copy.copy(self._read_history_file())
+            body['aggregates'] = copy.copy(payload)
+
+            self._write_history(body)
+
+    def rebuild_aggregates(self) -> Aggregates:
+        aggregates = rebuild_aggregates(self.get_all_games())
+        self.update_aggregates(aggregates)
+
+        return aggregates
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # tables on other shards never wait on this lock
+        with self._exclusive():
+            yield
+
+    def commit_changes(
+        self,
+        balance: Optional[Balance],
+        games: list[Game],
+        aggregates: Optional[Aggregates] = None,
+        fsync: bool = False,
+        expected_version: Optional[int] = None
+    ) -> None:
+        with self._exclusive():
+            if not os.path.isdir(self._media_path):
+                os.makedirs(self._media_path)
+
+            body: History
+
+            if os.path.isfile(self._history_file_path):
+                body = copy.copy(self._read_history_file())
+            else:
+                body = {'balance': self.get_default_balance(), 'games': []}
+
+            if expected_version is not None and body.get('version', 0) != expected_version:
+                raise VersionConflictError(
+                    f"History was changed by another writer: expected version {expected_version}, found {body.get('version', 0)}"
+                )
+
+            if balance is not None:
+                body['balance'] = copy.copy(balance)
+
+            if aggregates is not None:
+                body['aggregates'] = copy.copy(aggregates)
+
+            stored_games = body['games'] = list(body['games'])
+
+            for game in copy.deepcopy(games):
+                if len(stored_games) > 0 and stored_games[len(stored_games) - 1]['game_uuid'] == game['game_uuid']:
+                    stored_games[len(stored_games) - 1] = game
+                else:
+                    stored_games.append(game)
+
+            self._write_history(body, fsync)
+
+    def get_version(self) -> Optional[int]:
+        if not os.path.isfile(self._history_file_path):
+            return 0
+
+        return self._read_history_file().get('version', 0)
+
+    def close(self) -> None:
+        # every write here is already on disk, storages that buffer or hold a connection release it here
+        pass
+
+    def __enter__(self) -> 'Storage':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        with self._lock:
+            if not self._file_lock or self._file_lock_depth > 0:
+                self._file_lock_depth += 1
+
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth -= 1
+
+                return
+
+            if not os.path.isdir(self._media_path):
+                os.makedirs(self._media_path)
+
+            # other processes serialise writers on the lock file; readers rely on atomic replace instead
+            with open(self._lock_file_path, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX) # type: ignore
+                self._file_lock_depth += 1
+
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth -= 1
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN) # type: ignore
+
+    def _write_history(self, body: History, fsync: bool = False) -> None:
+        body['version'] = body.get('version', 0) + 1
+        stat = self._create_history_file(self._history_file_path, json.dumps(body), fsync)
+
+        if self._history_cache is not None:
+            # body owns every object in it, callers only ever get copies, so it can be served as written
+            self._history_cache.put(self._history_file_path, get_signature(stat), body, stat.st_size)
+
+    def _iter_archived_games(self) -> Iterator[Game]:
+        if not os.path.isfile(self._archive_file_path):
+            return
+
+        with self.get_archive() as archive:
+            yield from archive
 
     def _get_last_game(self) -> Game:
         body = self._read_history_file()
         last_game = body['games'][len(body['games']) - 1]
 
-        return last_game
+        return copy.deepcopy(last_game)
 
     def _create_new_game(self) -> Game:
         return {
@@ -124,18 +389,46 @@ class Storage:
                 'human_cards': [],
                 'human_score': 0,
                 'computer_score': 0,
-                'deck': generate_deck()
+                'deck': self.new_deck()
             },
             'winner': None,
             'finished': False,
+            'created_at': time.time(),
         }
 
     def _read_history_file(self) -> Any:
+        if self._history_cache is None:
+            return self._load_history_file()[0]
+
+        body = self._history_cache.get(self._history_file_path, get_signature(os.stat(self._history_file_path)))
+
+        if body is not None:
+            return body
+
+        body, stat = self._load_history_file()
+        self._history_cache.put(self._history_file_path, get_signature(stat), body, stat.st_size)
+
+        return body
+
+    def _load_history_file(self) -> tuple[Any, os.stat_result]:
         with open(self._history_file_path, 'r') as file:
-            jsonData = StringIO(file.read())
-            data = json.load(jsonData)
-            return data
+            # the signature of the opened file, not of the path, so a replace in between cannot pin stale data
+            stat = os.fstat(file.fileno())
+
+            return json.load(file), stat
 
-    def _create_history_file(self, path: str, data: str) -> None:
-        with open(path, 'w') as file:
+    def _create_history_file(self, path: str, data: str, fsync: bool = False) -> os.stat_result:
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+        with open(tmp_path, 'w') as file:
             file.write(data)
+            file.flush()
+
+            if fsync:
+                os.fsync(file.fileno())
+
+            stat = os.fstat(file.fileno())
+
+        os.replace(tmp_path, path)
+
+        return stat
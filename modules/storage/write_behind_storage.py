@@ -0,0 +1,271 @@
+import copy
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Literal, Optional, Union
+
+from modules.storage.aggregates import Aggregates, rebuild_aggregates
+from modules.storage.history_stream import WinnerFilter, game_matches
+from modules.storage.storage import Balance, Game, Storage, VersionConflictError
+from modules.utils.compact_cards import CompactDeck
+from modules.utils.constants import Deck
+
+Durability = Union[Literal['action'], Literal['game'], Literal['interval']]
+
+DURABILITY: dict[str, Durability] = {
+    'action': 'action',
+    'game': 'game',
+    'interval': 'interval',
+}
+
+
+class WriteBehindStorage(Storage):
+    _balance: Optional[Balance]
+    _last_game: Optional[Game]
+    _aggregates: Optional[Aggregates]
+    _version: Optional[int]
+
+    def __init__(self, storage: Storage, durability: Durability = 'action', interval: float = 1.0) -> None:
+        super().__init__()
+        # the wrapped storage locks its own shard, this buffer has no file to share a lock over
+        self._lock = threading.RLock()
+        self._storage = storage
+        self._durability = durability
+        self._interval = interval
+        self._depth = 0
+        self._loaded = False
+        self._balance = None
+        self._last_game = None
+        self._aggregates = None
+        self._version = None
+        self._dirty_balance = False
+        self._dirty_aggregates = False
+        self._dirty_games: dict[str, Game] = {}
+        self._last_flush = time.monotonic()
+
+    def get_current_game(self) -> Game:
+        self._load()
+
+        if self._last_game is None or self._balance is None:
+            self._balance = self.get_default_balance()
+            self._dirty_balance = True
+            current_game = self._create_new_game()
+            self.add_game_in_history(current_game)
+            return current_game
+
+        if self._last_game['finished']:
+            current_game = self._create_new_game()
+            self.add_game_in_history(current_game)
+            return current_game
+
+        return copy.deepcopy(self._last_game)
+
+    def has_last_not_ended_game(self) -> bool:
+        self._load()
+
+        return self._last_game is not None and not self._last_game['finished']
+
+    def update_game_in_history(self, updated_game: Game) -> None:
+        self._load()
+        self._last_game = copy.deepcopy(updated_game)
+        self._dirty_games[updated_game['game_uuid']] = self._last_game
+        self._after_mutation()
+
+    def add_game_in_history(self, updated_game: Game) -> None:
+        self.update_game_in_history(updated_game)
+
+    def remove_history_file(self) -> None:
+        self._discard()
+        self._storage.remove_history_file()
+
+    def new_deck(self) -> Union[Deck, CompactDeck]:
+        return self._storage.new_deck()
+
+    def update_balance(self, payload: Balance) -> None:
+        self._load()
+        self._balance = {**payload}
+        self._dirty_balance = True
+        self._after_mutation()
+
+    def get_balance(self) -> Balance:
+        self._load()
+
+        if self._balance is None:
+            return self._storage.get_balance()
+
+        return {**self._balance}
+
+    def get_aggregates(self) -> Aggregates:
+        if self._aggregates is None:
+            try:
+                self._aggregates = self._storage.get_aggregates()
+            except Exception:
+                self._aggregates = rebuild_aggregates(self.get_all_games())
+
+        return {**self._aggregates}  # type: ignore
+
+    def update_aggregates(self, payload: Aggregates) -> None:
+        self._load()
+        self._aggregates = {**payload}  # type: ignore
+        self._dirty_aggregates = True
+        self._after_mutation()
+
+    def get_all_games(self) -> list[Game]:
+        try:
+            games = self._storage.get_all_games()
+        except FileNotFoundError:
+            games = []
+
+        for game in self._dirty_games.values():
+            if len(games) > 0 and games[len(games) - 1]['game_uuid'] == game['game_uuid']:
+                games[len(games) - 1] = copy.deepcopy(game)
+            else:
+                games.append(copy.deepcopy(game))
+
+        return games
+
+    def iter_games(
+        self,
+        finished_only: bool = False,
+        winner: Optional[WinnerFilter] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Iterator[Game]:
+        pending = copy.deepcopy(self._dirty_games)
+
+        for game in self._storage.iter_games():
+            game = pending.pop(game['game_uuid'], game)
+
+            if game_matches(game, finished_only, winner, since, until):
+                yield game
+
+        for game in pending.values():
+            if game_matches(game, finished_only, winner, since, until):
+                yield game
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        if self._depth == 0:
+            savepoint = copy.deepcopy((
+                self._loaded,
+                self._balance,
+                self._last_game,
+                self._aggregates,
+                self._dirty_balance,
+                self._dirty_aggregates,
+                self._dirty_games,
+            ))
+
+        self._depth += 1
+
+        try:
+            yield
+        except BaseException:
+            self._depth -= 1
+
+            if self._depth == 0:
+                (
+                    self._loaded,
+                    self._balance,
+                    self._last_game,
+                    self._aggregates,
+                    self._dirty_balance,
+                    self._dirty_aggregates,
+                    self._dirty_games,
+                ) = savepoint
+
+            raise
+
+        self._depth -= 1
+        self._after_mutation()
+
+    def commit(self) -> None:
+        self.flush(fsync=True)
+
+    def flush(self, fsync: bool = False) -> None:
+        if self._dirty_balance or self._dirty_aggregates or len(self._dirty_games) > 0:
+            try:
+                self._storage.commit_changes(
+                    self._balance if self._dirty_balance else None,
+                    list(self._dirty_games.values()),
+                    aggregates=self._aggregates if self._dirty_aggregates else None,
+                    fsync=fsync,
+                    expected_version=self._version
+                )
+            except VersionConflictError:
+                # the other writer won, the next access reloads its history instead of retrying a stale one forever
+                self._discard()
+                raise
+
+            if self._version is not None:
+                self._version += 1
+
+        self._dirty_balance = False
+        self._dirty_aggregates = False
+        self._dirty_games = {}
+        self._last_flush = time.monotonic()
+
+    def get_version(self) -> Optional[int]:
+        return self._storage.get_version()
+
+    def close(self) -> None:
+        # interval durability only flushes on the next mutation, so the last interval would be lost at shutdown
+        self.flush(fsync=True)
+        self._storage.close()
+
+    def archive_finished_games(self, fsync: bool = True) -> int:
+        self.flush(fsync)
+        archived = self._storage.archive_finished_games(fsync)
+        self._discard()
+
+        return archived
+
+    def _get_last_game(self) -> Game:
+        self._load()
+
+        if self._last_game is None:
+            return self._storage._get_last_game()
+
+        return copy.deepcopy(self._last_game)
+
+    def _after_mutation(self) -> None:
+        if self._depth > 0:
+            return
+
+        if self._durability == DURABILITY['action']:
+            self.flush(fsync=True)
+        elif self._durability == DURABILITY['game']:
+            if self._last_game is not None and self._last_game['finished']:
+                self.flush(fsync=True)
+        elif time.monotonic() - self._last_flush >= self._interval:
+            self.flush()
+
+    def _discard(self) -> None:
+        self._loaded = False
+        self._balance = None
+        self._last_game = None
+        self._aggregates = None
+        self._version = None
+        self._dirty_balance = False
+        self._dirty_aggregates = False
+        self._dirty_games = {}
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+
+        # read before the data so a concurrent writer shows up as a conflict on flush, never as a lost update
+        self._version = self._storage.get_version()
+
+        try:
+            self._balance = self._storage.get_balance()
+        except Exception:
+            # no history yet, get_current_game starts one with the default balance
+            self._balance = None
+            self._last_game = None
+            self._loaded = True
+            return
+
+        # a history with a balance but no readable last game is broken, resetting the balance would hide that
+        self._last_game = self._storage._get_last_game()
+        self._loaded = True
@@ -0,0 +1,62 @@
+from typing import Optional
+from uuid import uuid4
+
+from modules.storage.aggregates import apply_finished_game, get_default_aggregates, get_winrate, rebuild_aggregates
+from modules.storage.storage import Game, GamerType
+
+
+def finished_game(winner: Optional[GamerType], bet: int = 10) -> Game:
+    status = 'DRAW' if winner is None else ('WIN' if winner == 'human' else 'LOSE')
+
+    return {
+        'game_uuid': uuid4().hex,
+        'events': [
+            { 'gamer': 'human', 'value': bet, 'status': 'MADE' },
+            { 'gamer': 'human', 'value': bet, 'status': status },
+        ],
+        'state': {
+            'computer_cards': [],
+            'human_cards': [],
+            'human_score': 0,
+            'computer_score': 0,
+            'deck': [],
+        },
+        'winner': winner,
+        'finished': True,
+    }
+
+
+def test_apply_finished_game() -> None:
+    aggregates = get_default_aggregates()
+
+    for game in [finished_game('human', 5), finished_game('human', 25), finished_game(None), finished_game('computer', 50)]:
+        aggregates = apply_finished_game(aggregates, game)
+
+    assert aggregates == {
+        'wins': 2,
+        'losses': 1,
+        'draws': 1,
+        'total_wagered': 90,
+        'net': -20,
+        'current_streak': -1,
+        'longest_win_streak': 2,
+        'longest_loss_streak': 1,
+    }
+    assert get_winrate(aggregates) == 0.5
+
+def test_streaks() -> None:
+    winners: list[Optional[GamerType]] = ['computer', 'computer', 'computer', 'human', 'human', 'computer']
+    aggregates = rebuild_aggregates([finished_game(winner) for winner in winners])
+
+    assert aggregates['longest_loss_streak'] == 3
+    assert aggregates['longest_win_streak'] == 2
+    assert aggregates['current_streak'] == -1
+
+def test_rebuild_skips_unfinished_games() -> None:
+    live_game = { **finished_game('human'), 'finished': False, 'winner': None }
+
+    aggregates = rebuild_aggregates([finished_game('human'), live_game]) # type: ignore
+
+    assert aggregates['wins'] == 1
+    assert aggregates['draws'] == 0
+    assert get_winrate(get_default_aggregates()) == 0.0
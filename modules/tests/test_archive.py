@@ -0,0 +1,116 @@
+import json
+import os
+import pytest
+from uuid import uuid4
+
+from modules.storage.archive import HEADER, RECORD, GameArchive, decode_record, encode_game
+from modules.storage.journal_storage import JournalStorage
+from modules.storage.storage import Game, Storage
+from modules.utils.compact_cards import AnyCard, decode_card
+
+
+def create_game(finished: bool = True, winner: object = 'human', compact: bool = False) -> Game:
+    cards: list[AnyCard] = [0, 13, 26] if compact else [decode_card(0), decode_card(13), decode_card(26)]
+
+    return {
+        'game_uuid': uuid4().hex,
+        'events': [
+            { 'gamer': 'human', 'value': 25, 'status': 'MADE' },
+            { 'gamer': 'human', 'value': 25, 'status': 'WIN' },
+        ] if finished else [{ 'gamer': 'human', 'value': 25, 'status': 'MADE' }],
+        'state': { 'computer_cards': cards[:2], 'human_cards': cards, 'human_score': 17, 'computer_score': 22 },
+        'finished': finished,
+        'winner': winner, # type: ignore
+        'created_at': 1700000000.5,
+    }
+
+
+def test_record_round_trip() -> None:
+    game = create_game(winner=None)
+    record = encode_game(game)
+
+    assert len(record) == RECORD.size
+    assert decode_record(RECORD.unpack(record)) == game
+
+def test_compact_cards_round_trip() -> None:
+    game = create_game(winner='computer', compact=True)
+
+    assert decode_record(RECORD.unpack(encode_game(game)), compact_cards=True) == game
+
+def test_rejects_games_that_do_not_fit() -> None:
+    with pytest.raises(Exception):
+        encode_game(create_game(finished=False, winner=None))
+
+    game = create_game()
+    game['state']['human_cards'] = [0] * 13
+
+    with pytest.raises(Exception):
+        encode_game(game)
+
+def test_archive_append_and_read(tmp_path: str) -> None:
+    games = [create_game() for _ in range(10)]
+
+    with GameArchive(os.path.join(tmp_path, 'history.archive')) as archive:
+        assert len(archive) == 0
+        assert list(archive) == []
+        assert archive.append(games[:4]) == 4
+        assert list(archive) == games[:4]
+        assert archive.append(games[4:]) == 6
+        assert len(archive) == 10
+        assert archive[-1] == games[9]
+        assert [record[0].hex() for record in archive.iter_records()] == [game['game_uuid'] for game in games]
+
+def test_archive_drops_torn_record(tmp_path: str) -> None:
+    path = os.path.join(tmp_path, 'history.archive')
+    games = [create_game() for _ in range(3)]
+    GameArchive(path).append(games[:2])
+
+    with open(path, 'ab') as file:
+        file.write(b'\x01' * 10)
+
+    archive = GameArchive(path)
+    assert len(archive) == 2
+
+    archive.append(games[2:])
+
+    assert list(archive) == games
+    assert os.path.getsize(path) == HEADER.size + 3 * RECORD.size
+
+def test_storage_moves_finished_games_to_archive(tmp_path: str) -> None:
+    storage = Storage(base_path=str(tmp_path))
+    finished = [create_game(winner='computer'), create_game()]
+    live = create_game(finished=False, winner=None)
+    storage.commit_changes(None, [*finished, live])
+
+    assert storage.archive_finished_games() == 2
+    assert storage.archive_finished_games() == 0
+
+    with open(os.path.join(tmp_path, 'history.json')) as file:
+        assert [game['game_uuid'] for game in json.load(file)['games']] == [live['game_uuid']]
+
+    assert storage.get_all_games() == [*finished, live]
+    assert [game['game_uuid'] for game in storage.iter_games(winner='computer')] == [finished[0]['game_uuid']]
+    assert storage.get_aggregates()['wins'] == 1
+    assert storage.rebuild_aggregates()['losses'] == 1
+
+    storage.remove_history_file()
+
+    assert not os.path.isfile(os.path.join(tmp_path, 'history.archive'))
+
+def test_archive_keeps_last_finished_game_hot(tmp_path: str) -> None:
+    storage = Storage(base_path=str(tmp_path))
+    games = [create_game(), create_game()]
+    storage.commit_changes(None, games)
+
+    assert storage.archive_finished_games() == 1
+    assert storage.has_last_not_ended_game() is False
+    assert storage.get_current_game()['game_uuid'] not in {game['game_uuid'] for game in games}
+
+def test_journal_storage_archives_after_compaction(tmp_path: str) -> None:
+    storage = JournalStorage(base_path=str(tmp_path))
+    games = [create_game(), create_game(), create_game(finished=False, winner=None)]
+    storage.commit_changes(None, games)
+
+    assert storage.archive_finished_games() == 2
+    assert storage.get_all_games() == games
+    assert len(storage.get_archive()) == 2
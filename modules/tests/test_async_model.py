@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+
+from modules.model.async_model import AsyncModel
+from modules.model.model import AvailableBetsWithBalance
+from modules.observer.async_observer import AsyncObserver
+from modules.storage.memory_storage import MemoryStorage
+from modules.storage.sqlite_storage import SqliteStorage
+from modules.storage.storage import Storage
+from modules.utils.constants import OBSERVER_MESSAGES
+
+
+def bet_payload() -> dict:
+    return { 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } }
+
+
+def test_async_observer_notify_awaits_subscribers() -> None:
+    calls: list = []
+
+    async def subscriber(data: object) -> None:
+        await asyncio.sleep(0)
+        calls.append(data)
+
+    async def scenario() -> None:
+        observer = AsyncObserver()
+        observer.subscribe(OBSERVER_MESSAGES['finish'], subscriber)
+        observer.subscribe(OBSERVER_MESSAGES['finish'], subscriber)
+
+        await observer.notify(OBSERVER_MESSAGES['finish'], 1)
+        await observer.notify(OBSERVER_MESSAGES['init'])
+
+        with pytest.raises(Exception):
+            await observer.notify('UNKNOWN') # type: ignore
+
+    asyncio.run(scenario())
+
+    assert calls == [1, 1]
+
+def test_notify_later_applies_backpressure() -> None:
+    delivered: list = []
+
+    async def scenario() -> None:
+        gate = asyncio.Event()
+
+        async def slow_subscriber(data: int) -> None:
+            await gate.wait()
+            delivered.append(data)
+
+        observer = AsyncObserver(max_pending=1)
+        observer.subscribe(OBSERVER_MESSAGES['change_state'], slow_subscriber)
+
+        await observer.notify_later(OBSERVER_MESSAGES['change_state'], 1)
+        await observer.notify_later(OBSERVER_MESSAGES['change_state'], 2)
+        blocked = asyncio.ensure_future(observer.notify_later(OBSERVER_MESSAGES['change_state'], 3))
+        await asyncio.sleep(0.01)
+
+        assert not blocked.done()
+
+        gate.set()
+        await blocked
+        await observer.close()
+
+    asyncio.run(scenario())
+
+    assert delivered == [1, 2, 3]
+
+def test_async_model_plays_round() -> None:
+    events: list = []
+
+    async def on_change_state(game: dict) -> None:
+        events.append(('change_state', len(game['state']['human_cards'])))
+
+    async def on_finish(payload: dict) -> None:
+        events.append(('finish', payload['game']['finished']))
+
+    async def scenario() -> None:
+        model = AsyncModel(MemoryStorage(), offload=False)
+        model.subscribe(OBSERVER_MESSAGES['change_state'], on_change_state)
+        model.subscribe(OBSERVER_MESSAGES['finish'], on_finish)
+
+        await model.start(bet_payload()) # type: ignore
+        await model.change_state({ 'action': 'Пас' })
+
+    asyncio.run(scenario())
+
+    assert events == [('change_state', 2), ('finish', True)]
+
+def test_async_model_offloads_file_storage(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario() -> AvailableBetsWithBalance:
+        model = AsyncModel(Storage())
+        await model.start(bet_payload()) # type: ignore
+        return await model.get_available_bets_with_balance()
+
+    result = asyncio.run(scenario())
+
+    assert result['balance']['freeze_human_balance'] == 5
+
+def test_async_model_offloads_sqlite_storage(tmp_path: str) -> None:
+    storage = SqliteStorage(base_path=str(tmp_path))
+
+    async def scenario() -> AvailableBetsWithBalance:
+        model = AsyncModel(storage)
+        await model.start(bet_payload()) # type: ignore
+        await model.change_state({ 'action': 'Пас' })
+        return await model.get_available_bets_with_balance()
+
+    result = asyncio.run(scenario())
+    storage.close()
+
+    assert result['balance']['freeze_human_balance'] == 0
+
+def test_many_tables_share_one_loop() -> None:
+    finished: list = []
+
+    async def play(table: int) -> None:
+        model = AsyncModel(MemoryStorage(), offload=False)
+
+        async def on_finish(payload: dict) -> None:
+            finished.append(table)
+
+        model.subscribe(OBSERVER_MESSAGES['finish'], on_finish)
+        await model.start(bet_payload()) # type: ignore
+        await asyncio.sleep(0)
+        await model.change_state({ 'action': 'Пас' })
+
+    async def scenario() -> None:
+        await asyncio.gather(*(play(table) for table in range(2000)))
+
+    asyncio.run(scenario())
+
+    assert sorted(finished) == list(range(2000))
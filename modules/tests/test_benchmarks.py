@@ -0,0 +1,72 @@
+import json
+import pytest
+import subprocess
+import sys
+
+from modules.benchmarks.suite import (
+    DEFAULT_SIZES, LARGE_SIZES, STORAGE_BACKENDS, check_thresholds, compare_with_baseline, create_games, get_result_key, load_thresholds, measure, run_startup_benchmarks,
+    run_suite
+)
+
+
+def test_measure_reports_time_per_call() -> None:
+    calls = []
+    result = measure('noop', 3, lambda: calls.append(1), repeat=3)
+
+    assert result['name'] == 'noop'
+    assert result['size'] == 3
+    assert result['repeat'] == 3
+    assert len(calls) >= result['number'] * 3
+    assert 0 < result['best'] <= result['median']
+
+def test_create_games_are_finished_and_unique() -> None:
+    games = create_games(50)
+
+    assert len({ game['game_uuid'] for game in games }) == 50
+    assert all(game['finished'] for game in games)
+    assert create_games(5, seed=1) == create_games(5, seed=1)
+
+def test_suite_covers_every_backend() -> None:
+    report = run_suite(sizes=[5], subscribers=[10], repeat=1, startup_modules=[])
+    keys = { get_result_key(result['name'], result['size']) for result in report['results'] }
+
+    for backend in STORAGE_BACKENDS:
+        for operation in ('storage.{}.update_game_in_history', 'storage.{}.get_balance', 'storage.{}.get_all_games', 'model.{}.round'):
+            assert get_result_key(operation.format(backend), 5) in keys
+
+    assert 'observer.notify@10' in keys
+    assert report['failures'] == []
+    json.dumps(report)
+
+def test_startup_benchmark_times_a_cold_import() -> None:
+    result = run_startup_benchmarks('modules.headless', repeat=2)[0]
+
+    assert result['name'] == 'startup.import.modules.headless'
+    assert result['repeat'] == 2
+    assert 0 < result['best'] <= result['median']
+
+    with pytest.raises(Exception):
+        run_startup_benchmarks('modules.missing', repeat=1)
+
+def test_thresholds_and_baseline_flag_regressions() -> None:
+    report = run_suite(sizes=[5], backends=['memory'], subscribers=[], repeat=1, startup_modules=[])
+    results = report['results']
+    slow = [{ **result, 'median': result['median'] * 10 } for result in results]
+
+    assert check_thresholds(results, { 'model.memory.round@5': 0.0 })[0]['name'] == 'model.memory.round'
+    assert check_thresholds(results, { 'model.memory.round@6': 0.0 }) == []
+    assert len(compare_with_baseline(slow, report, tolerance=2)) == len(results) # type: ignore
+    assert len(compare_with_baseline(slow, report, tolerance=2, thresholds={ 'model.memory.round': 20 })) == len(results) - 1 # type: ignore
+    assert compare_with_baseline(results, report) == []
+    assert all(ratio > 1 for ratio in load_thresholds().values())
+    assert max(DEFAULT_SIZES) < min(LARGE_SIZES)
+
+def test_cli_exits_with_failure_on_regression(tmp_path: str) -> None:
+    baseline = tmp_path / 'baseline.json' # type: ignore
+    baseline.write_text(json.dumps({ 'results': [{ 'name': 'observer.notify', 'size': 1, 'median': 0.0 }] }))
+    output = tmp_path / 'report.json' # type: ignore
+    command = [sys.executable, 'benchmark.py', '--sizes', '2', '--backends', 'memory', '--subscribers', '1', '--repeat', '1', '--imports', '--output', str(output)]
+
+    assert subprocess.run(command, capture_output=True).returncode == 0
+    assert subprocess.run([*command, '--baseline', str(baseline)], capture_output=True).returncode == 1
+    assert json.loads(output.read_text())['failures'][0]['name'] == 'observer.notify'
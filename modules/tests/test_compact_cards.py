@@ -0,0 +1,36 @@
+import json
+import pytest
+
+from modules.storage.storage import Storage
+from modules.utils.compact_cards import (
+    decode_card, decode_deck, encode_card, encode_deck, generate_compact_deck, get_card_score, get_card_type, to_card
+)
+from modules.utils.constants import MAP_CARDS_FOR_SCORE, generate_deck
+
+
+def test_encoding_round_trip() -> None:
+    deck = generate_deck()
+
+    assert list(encode_deck(deck)) == list(generate_compact_deck())
+    assert decode_deck(generate_compact_deck()) == deck
+
+    for index, card in enumerate(deck):
+        assert encode_card(card) == index
+        assert decode_card(index) == card
+        assert to_card(index) == card
+        assert to_card(card) is card
+        assert get_card_type(index) == card['type']
+        assert get_card_score(index) == get_card_score(card) == MAP_CARDS_FOR_SCORE[card['type']]
+
+def test_compact_deck_is_small() -> None:
+    assert len(generate_compact_deck().tobytes()) == 52
+    assert len(json.dumps(list(generate_compact_deck()))) * 8 < len(json.dumps(generate_deck()))
+
+def test_storage_persists_compact_deck(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    storage = Storage(compact_cards=True)
+
+    current_game = storage.get_current_game()
+
+    assert sorted(current_game['state']['deck']) == list(range(52)) # type: ignore
+    assert Storage()._get_last_game()['state']['deck'] == current_game['state']['deck']
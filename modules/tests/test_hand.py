@@ -0,0 +1,13 @@
+from modules.model.hand import add_card_score, score_cards
+
+
+def test_hard_scoring_counts_ace_as_eleven() -> None:
+    assert score_cards([{ 'suit': 'hearts', 'type': 'ace' }, { 'suit': 'clubs', 'type': 'ace' }], False) == (22, 0)
+    assert score_cards([0, 1, 4], False) == (31, 0)
+
+def test_soft_aces_fall_back_to_one() -> None:
+    assert score_cards([0, 13], True) == (12, 1)
+    assert score_cards([0, 1], True) == (21, 1)
+    assert score_cards([0, 1, 4], True) == (21, 0)
+    assert add_card_score(21, 1, 11, True) == (12, 0)
+    assert add_card_score(20, 0, 5, True) == (25, 0)
@@ -0,0 +1,39 @@
+import json
+import subprocess
+import sys
+
+from modules.headless import HIT, STAND, create_model, place_bet, act
+from modules.storage.memory_storage import MemoryStorage
+
+UI_MODULES = ('inquirer', 'blessed', 'readchar', 'modules.view.view')
+
+
+def get_loaded_modules(module: str) -> set[str]:
+    code = f'import json, sys, {module}; print(json.dumps(list(sys.modules)))'
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+    return set(json.loads(completed.stdout))
+
+
+def test_headless_imports_skip_terminal_and_numpy() -> None:
+    for module in ('modules.headless', 'modules.simulation.simulation', 'modules.server.server'):
+        loaded = get_loaded_modules(module)
+
+        assert loaded.isdisjoint(UI_MODULES), module
+        assert 'numpy' not in loaded, module
+
+def test_terminal_ui_loads_inquirer_only_when_prompting() -> None:
+    assert get_loaded_modules('modules.controller.controller').isdisjoint(UI_MODULES[:3])
+
+def test_headless_round() -> None:
+    storage = MemoryStorage()
+    model = create_model(storage)
+    game = place_bet(model, '25')
+
+    assert len(game['state']['human_cards']) == 2
+    assert storage.get_balance()['freeze_human_balance'] == 25
+
+    while not game['finished']:
+        game = act(model, HIT if game['state']['human_score'] < 12 else STAND)
+
+    assert storage.get_balance()['freeze_human_balance'] == 0
@@ -0,0 +1,97 @@
+import json
+import os
+
+from modules.storage.history_cache import HistoryCache
+from modules.storage.storage import Storage
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = HistoryCache(max_entries=2, max_bytes=100)
+    cache.put('a', (1, 1, 1), 'A', 10)
+    cache.put('b', (1, 1, 1), 'B', 10)
+    cache.get('a', (1, 1, 1))
+    cache.put('c', (1, 1, 1), 'C', 10)
+
+    assert cache.get('a', (1, 1, 1)) == 'A'
+    assert cache.get('b', (1, 1, 1)) is None
+    assert cache.get('c', (1, 1, 1)) == 'C'
+
+def test_cache_is_bounded_by_bytes() -> None:
+    cache = HistoryCache(max_entries=10, max_bytes=100)
+    cache.put('a', (1, 1, 1), 'A', 60)
+    cache.put('b', (1, 1, 1), 'B', 60)
+    cache.put('huge', (1, 1, 1), 'H', 101)
+
+    assert len(cache) == 1
+    assert cache.get('b', (1, 1, 1)) == 'B'
+    assert cache.get('huge', (1, 1, 1)) is None
+
+def test_cache_misses_on_new_signature() -> None:
+    cache = HistoryCache()
+    cache.put('a', (1, 10, 1), 'A', 10)
+
+    assert cache.get('a', (2, 10, 1)) is None
+    assert cache.get('a', (1, 10, 2)) is None
+    assert cache.get('a', (1, 10, 1)) == 'A'
+
+def test_storage_serves_repeated_reads_from_cache(tmp_path: str) -> None:
+    cache = HistoryCache()
+    storage = Storage(base_path=str(tmp_path), history_cache=cache)
+    storage.get_current_game()
+    storage.update_balance({ 'human': 95, 'computer': 500, 'freeze_human_balance': 5 })
+    misses = cache.misses
+
+    for _ in range(10):
+        storage.get_balance()
+        storage.has_last_not_ended_game()
+        storage.get_aggregates()
+
+    assert cache.misses == misses
+    assert cache.hits >= 30
+    assert storage.get_balance()['human'] == 95
+
+def test_storage_returns_copies(tmp_path: str) -> None:
+    storage = Storage(base_path=str(tmp_path), history_cache=HistoryCache())
+    game = storage.get_current_game()
+    game['events'].append({ 'gamer': 'human', 'value': 5, 'status': 'MADE' })
+    storage.get_balance()['human'] = 0
+    storage.get_all_games()[0]['finished'] = True
+
+    assert storage.get_balance()['human'] == 100
+    assert storage._get_last_game()['events'] == []
+    assert storage.has_last_not_ended_game()
+
+    storage.update_game_in_history(game)
+    game['events'].clear()
+
+    assert len(storage._get_last_game()['events']) == 1
+
+def test_storage_sees_writes_from_other_writers(tmp_path: str) -> None:
+    cache = HistoryCache()
+    storage = Storage(base_path=str(tmp_path), history_cache=cache)
+    storage.get_current_game()
+    path = os.path.join(tmp_path, 'history.json')
+
+    with open(path) as file:
+        body = json.load(file)
+
+    body['balance']['human'] = 42
+
+    # rewritten in place, the way the old truncating writer did
+    with open(path, 'w') as file:
+        json.dump(body, file)
+
+    assert storage.get_balance()['human'] == 42
+
+    Storage(base_path=str(tmp_path), history_cache=None).update_balance({ 'human': 7, 'computer': 500, 'freeze_human_balance': 0 })
+
+    assert storage.get_balance()['human'] == 7
+
+def test_remove_history_file_invalidates_cache(tmp_path: str) -> None:
+    cache = HistoryCache()
+    storage = Storage(base_path=str(tmp_path), history_cache=cache)
+    storage.get_current_game()
+    storage.remove_history_file()
+
+    assert len(cache) == 0
+    assert storage.has_last_not_ended_game() is False
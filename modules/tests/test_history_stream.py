@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+import os
+import pytest
+
+from modules.storage.export import export_csv, export_ndjson
+from modules.storage.history_stream import game_matches, iter_history_games
+from modules.storage.sqlite_storage import SqliteStorage
+from modules.storage.storage import Game, Storage
+from modules.storage.write_behind_storage import WriteBehindStorage
+
+
+def create_game(index: int, finished: bool = True, winner: object = 'human') -> Game:
+    return {
+        'game_uuid': f'game-{index}',
+        'events': [{ 'gamer': 'human', 'value': 5, 'status': 'MADE' }],
+        'state': { 'computer_cards': [], 'human_cards': [], 'human_score': index, 'computer_score': 0 },
+        'finished': finished,
+        'winner': winner, # type: ignore
+        'created_at': 1000.0 + index,
+    }
+
+def write_history(path: str, body: dict) -> str:
+    file_path = os.path.join(path, 'history.json')
+
+    with open(file_path, 'w') as file:
+        json.dump(body, file)
+
+    return file_path
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1 << 16])
+def test_iter_history_games_matches_json_load(tmp_path: str, chunk_size: int) -> None:
+    games = [create_game(index) for index in range(20)]
+    path = write_history(str(tmp_path), {
+        'version': 123456789,
+        'balance': { 'human': 100, 'computer': 500, 'freeze_human_balance': 0 },
+        'games': games,
+        'aggregates': { 'wins': 20 },
+    })
+
+    assert list(iter_history_games(path, chunk_size)) == games
+
+@pytest.mark.parametrize('body', [{}, { 'balance': {} }, { 'games': [] }])
+def test_iter_history_games_without_games(tmp_path: str, body: dict) -> None:
+    assert list(iter_history_games(write_history(str(tmp_path), body), 3)) == []
+
+def test_iter_history_games_rejects_truncated_file(tmp_path: str) -> None:
+    path = os.path.join(tmp_path, 'history.json')
+
+    with open(path, 'w') as file:
+        file.write(json.dumps({ 'games': [create_game(1), create_game(2)] })[:-40])
+
+    with pytest.raises(Exception):
+        list(iter_history_games(path, 16))
+
+def test_game_matches_filters() -> None:
+    human = create_game(1)
+    draw = create_game(2, winner=None)
+    running = create_game(3, finished=False, winner=None)
+
+    assert [game_matches(game, finished_only=True) for game in (human, draw, running)] == [True, True, False]
+    assert [game_matches(game, winner='draw') for game in (human, draw, running)] == [False, True, False]
+    assert [game_matches(game, winner='human') for game in (human, draw, running)] == [True, False, False]
+    assert [game_matches(game, since=1002, until=1003) for game in (human, draw, running)] == [False, True, False]
+
+def test_storage_iter_games(tmp_path: str) -> None:
+    storage = Storage(base_path=str(tmp_path))
+
+    assert list(storage.iter_games()) == []
+
+    for index in range(5):
+        storage.commit_changes(None, [create_game(index, winner='computer' if index % 2 else 'human')])
+
+    assert [game['game_uuid'] for game in storage.iter_games(winner='computer')] == ['game-1', 'game-3']
+    assert [game['game_uuid'] for game in storage.iter_games(since=1003)] == ['game-3', 'game-4']
+
+def test_new_games_record_creation_time(tmp_path: str) -> None:
+    game = Storage(base_path=str(tmp_path)).get_current_game()
+
+    assert isinstance(game['created_at'], float)
+
+def test_sqlite_iter_games_filters_in_query(tmp_path: str) -> None:
+    storage = SqliteStorage(base_path=str(tmp_path))
+    storage.commit_changes(None, [create_game(index, winner=None if index % 2 else 'human') for index in range(4)])
+
+    assert [game['game_uuid'] for game in storage.iter_games(winner='draw')] == ['game-1', 'game-3']
+    assert [game['created_at'] for game in storage.iter_games(until=1001)] == [1000.0]
+    assert list(storage.iter_games())[0]['events'] == create_game(0)['events']
+
+    storage.close()
+
+def test_write_behind_iter_games_includes_pending(tmp_path: str) -> None:
+    inner = Storage(base_path=str(tmp_path))
+    inner.commit_changes(None, [create_game(0), create_game(1, finished=False, winner=None)])
+    storage = WriteBehindStorage(inner, durability='interval', interval=60)
+
+    storage.update_game_in_history(create_game(1))
+    storage.add_game_in_history(create_game(2, finished=False, winner=None))
+
+    assert [game['game_uuid'] for game in storage.iter_games(finished_only=True)] == ['game-0', 'game-1']
+    assert len(list(storage.iter_games())) == 3
+
+def test_export_ndjson_and_csv() -> None:
+    games = [create_game(1), create_game(2, winner=None)]
+    ndjson = io.StringIO()
+    table = io.StringIO()
+
+    assert export_ndjson(iter(games), ndjson) == 2
+    assert export_csv(iter(games), table) == 2
+    assert [json.loads(line) for line in ndjson.getvalue().splitlines()] == games
+
+    rows = list(csv.DictReader(io.StringIO(table.getvalue())))
+
+    assert rows[0]['winner'] == 'human'
+    assert rows[1]['winner'] == 'draw'
+    assert rows[0]['bet'] == '5'
+    assert rows[0]['created_at'] == '1970-01-01T00:16:41+00:00'
+    assert rows[0]['human_card_count'] == '0'
@@ -0,0 +1,91 @@
+import os
+import pytest
+
+from modules.storage.journal_storage import JournalStorage
+
+
+@pytest.fixture
+def storage(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> JournalStorage:
+    monkeypatch.chdir(tmp_path)
+    return JournalStorage(compact_every=5)
+
+
+def test_get_current_game_creates_history(storage: JournalStorage) -> None:
+    assert storage.has_last_not_ended_game() == False
+
+    current_game = storage.get_current_game()
+
+    assert os.path.isfile(storage._history_file_path)
+    assert storage.has_last_not_ended_game() == True
+    assert storage.get_balance() == storage.get_default_balance()
+    assert storage.get_all_games() == [current_game]
+
+def test_writes_append_to_journal_without_rewriting_snapshot(storage: JournalStorage) -> None:
+    current_game = storage.get_current_game()
+    snapshot_size = os.path.getsize(storage._history_file_path)
+
+    current_game['events'].append({ 'gamer': 'human', 'value': 5, 'status': 'MADE' })
+    storage.update_game_in_history(current_game)
+    storage.update_balance({ 'human': 100, 'computer': 500, 'freeze_human_balance': 5 })
+
+    assert os.path.getsize(storage._history_file_path) == snapshot_size
+    with open(storage._journal_file_path) as file:
+        assert len(file.readlines()) == 2
+
+    restored = JournalStorage(compact_every=5)
+
+    assert restored.get_all_games() == [current_game]
+    assert restored.get_balance()['freeze_human_balance'] == 5
+
+def test_new_game_is_added_after_finished_one(storage: JournalStorage) -> None:
+    first_game = storage.get_current_game()
+    storage.update_game_in_history({ **first_game, 'finished': True, 'winner': 'human' }) # type: ignore
+
+    second_game = storage.get_current_game()
+
+    assert second_game['game_uuid'] != first_game['game_uuid']
+    assert [game['game_uuid'] for game in JournalStorage().get_all_games()] == [first_game['game_uuid'], second_game['game_uuid']]
+
+def test_compaction_folds_journal_into_snapshot(storage: JournalStorage) -> None:
+    storage.get_current_game()
+
+    for human in range(5):
+        storage.update_balance({ 'human': human, 'computer': 500, 'freeze_human_balance': 0 })
+
+    assert os.path.getsize(storage._journal_file_path) == 0
+    assert storage._read_history_file()['balance']['human'] == 4
+    assert JournalStorage().get_balance()['human'] == 4
+
+def test_torn_journal_tail_is_ignored(storage: JournalStorage) -> None:
+    storage.get_current_game()
+    storage.update_balance({ 'human': 90, 'computer': 510, 'freeze_human_balance': 0 })
+
+    with open(storage._journal_file_path, 'a') as file:
+        file.write('{"op": "balance", "bal')
+
+    restored = JournalStorage()
+
+    assert restored.get_balance()['human'] == 90
+    assert os.path.getsize(restored._journal_file_path) == 0
+
+def test_remove_history_file(storage: JournalStorage) -> None:
+    storage.get_current_game()
+    storage.update_balance({ 'human': 90, 'computer': 510, 'freeze_human_balance': 0 })
+
+    storage.remove_history_file()
+
+    assert not os.path.isfile(storage._history_file_path)
+    assert not os.path.isfile(storage._journal_file_path)
+    assert storage.has_last_not_ended_game() == False
+
+def test_commit_changes_appends_batch(storage: JournalStorage) -> None:
+    first_game = storage.get_current_game()
+    finished_game = { **first_game, 'finished': True, 'winner': 'human' }
+    next_game = storage._create_new_game()
+
+    storage.commit_changes({ 'human': 105, 'computer': 495, 'freeze_human_balance': 0 }, [finished_game, next_game]) # type: ignore
+
+    restored = JournalStorage()
+
+    assert restored.get_all_games() == [finished_game, next_game]
+    assert restored.get_balance()['human'] == 105
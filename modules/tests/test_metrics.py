@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+from typing import Iterator
+
+from modules.metrics.instrumentation import (
+    BYTES_READ, BYTES_WRITTEN, FILE_OPENS, NOTIFY_SECONDS, PARSE_SECONDS, READ_SECONDS, WRITE_SECONDS,
+    disable_instrumentation, enable_instrumentation, is_instrumentation_enabled
+)
+from modules.metrics.metrics import Histogram, MetricsRegistry
+from modules.model.model import Model
+from modules.observer.async_observer import AsyncObserver
+from modules.observer.observer import Observer
+from modules.storage.history_cache import HistoryCache
+from modules.storage.journal_storage import JournalStorage
+from modules.storage.storage import Storage
+
+
+@pytest.fixture
+def registry() -> Iterator[MetricsRegistry]:
+    yield enable_instrumentation(MetricsRegistry())
+    disable_instrumentation()
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = Histogram((0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.get_snapshot() == { 'buckets': { '0.1': 2, '1': 3, '+Inf': 4 }, 'sum': 3.65, 'count': 4 }
+
+def test_prometheus_text() -> None:
+    registry = MetricsRegistry((0.5,))
+    registry.describe('requests_total', 'Requests.')
+    registry.increment('requests_total', 2, mode='read')
+    registry.observe('latency_seconds', 0.25, message='a"b')
+
+    assert registry.to_prometheus() == '\n'.join([
+        '# HELP requests_total Requests.',
+        '# TYPE requests_total counter',
+        'requests_total{mode="read"} 2',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{message="a\\"b",le="0.5"} 1',
+        'latency_seconds_bucket{message="a\\"b",le="+Inf"} 1',
+        'latency_seconds_sum{message="a\\"b"} 0.25',
+        'latency_seconds_count{message="a\\"b"} 1',
+    ]) + '\n'
+
+def test_disabled_instrumentation_leaves_methods_untouched() -> None:
+    originals = (Observer.notify, AsyncObserver.notify, Storage._read_history_file, Storage._create_history_file)
+
+    enable_instrumentation(MetricsRegistry())
+    assert is_instrumentation_enabled()
+    assert Observer.notify is not originals[0]
+
+    enable_instrumentation(MetricsRegistry())
+    disable_instrumentation()
+
+    assert not is_instrumentation_enabled()
+    assert (Observer.notify, AsyncObserver.notify, Storage._read_history_file, Storage._create_history_file) == originals
+
+def test_records_notify_latency_per_message(registry: MetricsRegistry) -> None:
+    observer = Observer()
+    observer.subscribe('CHANGE_STATE', lambda data: None)
+    observer.notify('CHANGE_STATE', 1)
+    observer.notify('CHANGE_STATE', 2)
+    observer.notify('FINISH')
+
+    async_observer = AsyncObserver()
+
+    async def subscriber(data: int) -> None:
+        pass
+
+    async_observer.subscribe('USER_ACTION', subscriber)
+    asyncio.run(async_observer.notify('USER_ACTION', 1))
+
+    assert registry.get_histogram(NOTIFY_SECONDS, message='CHANGE_STATE', observer='sync')['count'] == 2 # type: ignore
+    assert registry.get_histogram(NOTIFY_SECONDS, message='FINISH', observer='sync')['count'] == 1 # type: ignore
+    assert registry.get_histogram(NOTIFY_SECONDS, message='USER_ACTION', observer='async')['count'] == 1 # type: ignore
+
+def test_records_storage_io(registry: MetricsRegistry, tmp_path: str) -> None:
+    storage = Storage(base_path=str(tmp_path), history_cache=HistoryCache())
+    model = Model(storage)
+    model.start({ 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } })
+    model.change_state({ 'action': 'Пас' })
+
+    writes = registry.get_counter(FILE_OPENS, mode='write')
+    assert writes > 0
+    assert registry.get_histogram(WRITE_SECONDS)['count'] == writes # type: ignore
+    assert registry.get_counter(BYTES_WRITTEN) > 0
+    assert registry.get_histogram(READ_SECONDS)['count'] > 0 # type: ignore
+    # every write goes through the cache, so nothing had to be parsed back
+    assert registry.get_counter(FILE_OPENS, mode='read') == 0
+
+    uncached = Storage(base_path=str(tmp_path), history_cache=None)
+    uncached.get_balance()
+    uncached.get_balance()
+
+    assert registry.get_counter(FILE_OPENS, mode='read') == 2
+    assert registry.get_histogram(PARSE_SECONDS)['count'] == 2 # type: ignore
+    assert registry.get_counter(BYTES_READ) == 2 * (tmp_path / 'history.json').stat().st_size # type: ignore
+
+def test_records_journal_and_archive_writes(registry: MetricsRegistry, tmp_path: str) -> None:
+    storage = JournalStorage(base_path=str(tmp_path))
+    model = Model(storage)
+
+    # the last game is never archived, so a second round is needed for the first one to move
+    for _ in range(2):
+        model.start({ 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } })
+        model.change_state({ 'action': 'Пас' })
+
+    journal = (tmp_path / 'history.journal').stat().st_size # type: ignore
+    written = registry.get_counter(BYTES_WRITTEN)
+    assert journal > 0
+    assert written >= journal
+
+    storage.archive_finished_games(fsync=False)
+
+    assert registry.get_counter(BYTES_WRITTEN) - written >= (tmp_path / 'history.archive').stat().st_size # type: ignore
+    assert registry.get_histogram(WRITE_SECONDS)['count'] == registry.get_counter(FILE_OPENS, mode='write') # type: ignore
+
+def test_write_prometheus_file(registry: MetricsRegistry, tmp_path: str) -> None:
+    Observer().notify('INIT')
+    path = tmp_path / 'blackjack.prom' # type: ignore
+    registry.write_prometheus(str(path))
+
+    assert f'{NOTIFY_SECONDS}_count{{message="INIT",observer="sync"}} 1' in path.read_text()
+    assert '# HELP ' + NOTIFY_SECONDS in path.read_text()
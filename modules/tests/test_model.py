@@ -3,7 +3,8 @@ from uuid import uuid4
 
 from pytest_mock import MockerFixture
 from modules.model.model import Model
-from modules.utils.constants import OBSERVER_MESSAGES, generate_deck
+from modules.storage.aggregates import get_default_aggregates
+from modules.utils.constants import OBSERVER_MESSAGES, Card, generate_deck
 from modules.storage.storage import Balance, Game, Storage
 
 @pytest.fixture
@@ -44,6 +45,9 @@ class MockStorage:
         self.mocked_update_balance = mocker.patch.object(Storage, 'update_balance')
         self.mocked_get_all_games = mocker.patch.object(Storage, 'get_all_games')
         self.mocked_get_all_games.return_value = [current_game]
+        self.mocked_get_aggregates = mocker.patch.object(Storage, 'get_aggregates')
+        self.mocked_get_aggregates.return_value = get_default_aggregates()
+        self.mocked_update_aggregates = mocker.patch.object(Storage, 'update_aggregates')
 
 
 def test_start_if_previous_game_ended(mocker: MockerFixture, current_game: Game, balance: Balance) -> None:
@@ -201,4 +205,68 @@ def test_add_event(mocker: MockerFixture, current_game: Game, balance: Balance)
 
     model.add_event({ 'value': '10', 'status': 'DRAW', 'gamer_type': 'human' })
 
-    fake_storage.mocked_update_balance.assert_called_with({'computer': 500, 'freeze_human_balance': 0, 'human': 100})
\ No newline at end of file
+    fake_storage.mocked_update_balance.assert_called_with({'computer': 500, 'freeze_human_balance': 0, 'human': 100})
+
+def test_finish_game_updates_aggregates(mocker: MockerFixture, current_game: Game, balance: Balance) -> None:
+    finish_stub = mocker.stub('test_finish')
+    model = Model(Storage())
+    model.subscribe(OBSERVER_MESSAGES['finish'], finish_stub)
+    fake_storage = MockStorage(mocker, current_game, balance)
+    fake_storage.mocked_has_last_not_ended_game.return_value = False
+    model.start({ 'bet': { 'value': '10', 'status': 'MADE', 'gamer_type': 'human' } })
+
+    model.change_state({ 'action': 'Пас' })
+
+    fake_storage.mocked_get_all_games.assert_not_called()
+    fake_storage.mocked_update_aggregates.assert_called_once()
+    aggregates = fake_storage.mocked_update_aggregates.call_args[0][0]
+    assert aggregates['wins'] + aggregates['losses'] + aggregates['draws'] == 1
+    winrate = finish_stub.call_args[0][0]['statistics']['winrate']
+    assert winrate == (1.0 if model._current_game['winner'] == 'human' else 0.0)
+
+def test_seeded_deck_is_persisted_as_seed_and_cursor(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    model = Model(Storage(), seeded_deck=True)
+
+    model.start({ 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } })
+
+    stored_state = Storage()._get_last_game()['state']
+    assert 'deck' not in stored_state
+    assert stored_state['deck_cursor'] == 4
+    assert stored_state['human_cards'] == model._current_game['state']['human_cards']
+
+    resumed = Model(Storage(), seeded_deck=True)
+    resumed.start({ 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } })
+
+    assert resumed._deck == model._deck
+
+    model.change_state({ 'action': 'Взять карту' })
+    resumed.change_state({ 'action': 'Взять карту' })
+
+    assert resumed._current_game['state'] == model._current_game['state']
+    dealt = len(model._current_game['state']['human_cards']) + len(model._current_game['state']['computer_cards'])
+    assert Storage()._get_last_game()['state']['deck_cursor'] == dealt
+
+def test_soft_aces_scoring(mocker: MockerFixture, current_game: Game, balance: Balance) -> None:
+    model = Model(Storage(), soft_aces=True)
+    fake_storage = MockStorage(mocker, current_game, balance)
+    fake_storage.mocked_has_last_not_ended_game.return_value = False
+    mocker.patch.object(Model, '_shuffle_cards')
+    deck: list[Card] = [
+        { 'suit': 'hearts', 'type': 'king' },
+        { 'suit': 'hearts', 'type': 'ace' },
+        { 'suit': 'clubs', 'type': 'ace' },
+        { 'suit': 'hearts', 'type': '9' },
+        { 'suit': 'clubs', 'type': '7' },
+    ]
+    current_game['state']['deck'] = deck
+
+    model.start({ 'bet': { 'value': '10', 'status': 'MADE', 'gamer_type': 'human' } })
+
+    assert model._current_game['state']['computer_score'] == 16
+    assert model._current_game['state']['human_score'] == 12
+
+    model.change_state({ 'action': 'Пас' })
+
+    assert model._current_game['state']['computer_score'] == 26
+    assert model._current_game['winner'] == 'human'
@@ -0,0 +1,75 @@
+import gc
+import pytest
+from pytest_mock import MockerFixture
+
+from modules.observer.observer import Observer
+from modules.utils.constants import OBSERVER_MESSAGES
+
+
+class Listener:
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def on_event(self, data: object) -> None:
+        self.calls.append(data)
+
+
+def test_notify_calls_subscribers_of_type(mocker: MockerFixture) -> None:
+    observer = Observer()
+    stub = mocker.stub('test_stub')
+    other_stub = mocker.stub('other_stub')
+    observer.subscribe(OBSERVER_MESSAGES['finish'], stub)
+    observer.subscribe(OBSERVER_MESSAGES['init'], other_stub)
+
+    observer.notify(OBSERVER_MESSAGES['finish'], { 'value': 1 })
+    observer.notify(OBSERVER_MESSAGES['restart'])
+
+    stub.assert_called_once_with({ 'value': 1 })
+    other_stub.assert_not_called()
+
+def test_instances_do_not_share_subscribers(mocker: MockerFixture) -> None:
+    first = Observer()
+    second = Observer()
+    stub = mocker.stub('test_stub')
+    first.subscribe(OBSERVER_MESSAGES['change_state'], stub)
+
+    second.notify(OBSERVER_MESSAGES['change_state'], {})
+
+    stub.assert_not_called()
+
+def test_invalid_subscription_type() -> None:
+    observer = Observer()
+
+    with pytest.raises(Exception):
+        observer.subscribe('UNKNOWN', print) # type: ignore
+
+    with pytest.raises(Exception):
+        observer.notify('UNKNOWN') # type: ignore
+
+def test_unsubscribe(mocker: MockerFixture) -> None:
+    observer = Observer()
+    stub = mocker.stub('test_stub')
+    listener = Listener()
+    observer.subscribe(OBSERVER_MESSAGES['init'], stub)
+    observer.subscribe(OBSERVER_MESSAGES['init'], listener.on_event, weak=True)
+
+    observer.unsubscribe(OBSERVER_MESSAGES['init'], stub)
+    observer.unsubscribe(OBSERVER_MESSAGES['init'], listener.on_event)
+    observer.notify(OBSERVER_MESSAGES['init'], {})
+
+    stub.assert_not_called()
+    assert listener.calls == []
+
+def test_weak_subscribers_are_dropped() -> None:
+    observer = Observer()
+    listener = Listener()
+    observer.subscribe(OBSERVER_MESSAGES['finish'], listener.on_event, weak=True)
+
+    observer.notify(OBSERVER_MESSAGES['finish'], 1)
+    assert listener.calls == [1]
+
+    del listener
+    gc.collect()
+    observer.notify(OBSERVER_MESSAGES['finish'], 2)
+
+    assert observer._observers[OBSERVER_MESSAGES['finish']] == []
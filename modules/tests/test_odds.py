@@ -0,0 +1,144 @@
+import itertools
+import pytest
+from typing import Sequence
+
+from modules.model.hand import score_cards
+from modules.model.odds import (
+    count_ranks,
+    get_game_odds,
+    get_odds,
+    get_shoe_counts,
+    get_visible_odds,
+    hit_belief_outcome,
+    hit_outcome,
+    remove_cards,
+    stand_outcome,
+)
+from modules.model.strategy import DEALER_STANDS_AT, compare_totals
+from modules.storage.storage import Game
+from modules.utils.compact_cards import AnyCard, encode_card, get_card_score
+from modules.utils.constants import Card, generate_deck
+
+
+def card(type: str, suit: str = 'hearts') -> Card:
+    return { 'suit': suit, 'type': type } # type: ignore
+
+
+def enumerate_round(player: list[Card], dealer: list[Card], shoe: list[Card], hit: bool) -> dict[str, float]:
+    results = { 'win': 0, 'lose': 0, 'draw': 0, 'bust': 0 }
+    orders = list(itertools.permutations(shoe))
+
+    for order in orders:
+        deck = list(order)
+        dealer_total, _ = score_cards(dealer, False)
+
+        if dealer_total < DEALER_STANDS_AT:
+            dealer_total += get_card_score(deck.pop())
+
+        player_total, _ = score_cards(player, False)
+
+        if hit:
+            player_total += get_card_score(deck.pop())
+
+        result = compare_totals(player_total, dealer_total)
+        results['win'] += result == 1
+        results['lose'] += result == -1
+        results['draw'] += result == 0
+        results['bust'] += player_total > 21
+
+    return { key: value / len(orders) for key, value in results.items() }
+
+
+def create_game(human: Sequence[AnyCard], computer: Sequence[AnyCard], deck: list) -> Game:
+    return {
+        'game_uuid': 'game',
+        'events': [],
+        'state': { 'human_cards': list(human), 'computer_cards': list(computer), 'human_score': 0, 'computer_score': 0, 'deck': deck },
+        'finished': False,
+        'winner': None,
+    }
+
+
+def test_shoe_counts() -> None:
+    assert sum(get_shoe_counts()) == 52
+    assert get_shoe_counts() == count_ranks(generate_deck())
+    assert get_shoe_counts(6) == (24, 24, 24, 24, 24, 24, 24, 24, 96, 24)
+
+    with pytest.raises(Exception):
+        remove_cards((0,) * 10, [card('ace')])
+
+@pytest.mark.parametrize('hit', [False, True])
+def test_matches_enumeration_of_every_deck_order(hit: bool) -> None:
+    player = [card('king'), card('queen')]
+    dealer = [card('9'), card('5')]
+    shoe = [card('2'), card('3'), card('4'), card('jack'), card('ace'), card('7')]
+    odds = get_odds(player, dealer, count_ranks(shoe))['hit' if hit else 'stand']
+    expected = enumerate_round(player, dealer, shoe, hit)
+
+    assert dict(odds) == pytest.approx({ **expected, 'ev': expected['win'] - expected['lose'] })
+
+def test_dealer_standing_and_single_score_shoe() -> None:
+    odds = get_odds([card('king'), card('queen')], [card('king'), card('queen')], get_shoe_counts())
+
+    assert odds['stand']['draw'] == 1
+    assert odds['hit']['bust'] == pytest.approx(1)
+
+    tens = count_ranks([card('king')] * 8)
+    odds = get_odds([card('10'), card('8')], [card('10'), card('6')], tens)
+
+    assert odds['stand']['win'] == 1
+
+def test_probabilities_add_up_for_multi_deck_shoe() -> None:
+    player = [card('6'), card('5')]
+    dealer = [card('9'), card('4')]
+    counts = remove_cards(get_shoe_counts(8), [*player, *dealer])
+
+    for soft_aces_enabled in (False, True):
+        odds = get_odds(player, dealer, counts, soft_aces_enabled)
+
+        for action in ('stand', 'hit'):
+            assert odds[action]['win'] + odds[action]['lose'] + odds[action]['draw'] == pytest.approx(1)
+
+        assert odds['hit']['ev'] > odds['stand']['ev']
+
+    assert stand_outcome.cache_info().maxsize is not None
+    assert hit_outcome.cache_info().maxsize is not None
+    assert hit_belief_outcome.cache_info().maxsize is not None
+
+    with pytest.raises(Exception):
+        get_odds([card('10'), card('8')], [card('10'), card('6')], (0,) * 10)
+
+@pytest.mark.parametrize('dealer_stood', [False, True])
+def test_visible_odds_average_over_the_dealer_hand(dealer_stood: bool) -> None:
+    player = [card('king'), card('queen')]
+    pool = [card('2'), card('6'), card('7'), card('7', 'spades'), card('jack'), card('ace'), card('10')]
+    hands = [list(hand) for hand in itertools.permutations(pool, 2) if not dealer_stood or score_cards(hand, False)[0] >= DEALER_STANDS_AT]
+    odds = get_visible_odds(player, 2, count_ranks(pool), dealer_stood=dealer_stood)
+
+    for action in ('stand', 'hit'):
+        for key in ('win', 'lose', 'draw', 'bust', 'ev'):
+            expected = [get_odds(player, hand, remove_cards(count_ranks(pool), hand))[action] for hand in hands]
+            assert odds[action][key] == pytest.approx(sum(item[key] for item in expected) / len(hands)) # type: ignore
+
+def test_game_odds_accept_compact_and_seeded_decks() -> None:
+    human = [card('9'), card('7')]
+    computer = [card('8'), card('8', 'spades')]
+    deck = [item for item in generate_deck() if item not in human and item not in computer]
+    odds = get_game_odds(create_game(human, computer, deck))
+
+    compact = create_game([encode_card(item) for item in human], [encode_card(item) for item in computer], [encode_card(item) for item in deck])
+    assert get_game_odds(compact) == odds
+
+    seeded = create_game(human, computer, [])
+    del seeded['state']['deck'] # type: ignore
+    assert get_game_odds(seeded) == odds
+
+def test_game_odds_do_not_depend_on_the_dealer_cards() -> None:
+    human = [card('9'), card('7')]
+    low = [card('8'), card('2')]
+    high = [card('king'), card('queen', 'spades')]
+
+    low_odds = get_game_odds(create_game(human, low, [item for item in generate_deck() if item not in human and item not in low]))
+    high_odds = get_game_odds(create_game(human, high, [item for item in generate_deck() if item not in human and item not in high]))
+
+    assert low_odds == high_odds
@@ -0,0 +1,44 @@
+import pytest
+
+from modules.simulation.parallel import derive_seed, merge_reports, run_parallel, run_shard, split_rounds
+
+
+def test_split_rounds() -> None:
+    shards = split_rounds(25, 'stand', 1, '5', 10)
+
+    assert [shard[1] for shard in shards] == [10, 10, 5]
+    assert len({ shard[2] for shard in shards }) == 3
+    assert shards[0][2] == derive_seed(1, 0)
+
+def test_run_shard_is_reproducible() -> None:
+    first = run_shard(('hit_below_17', 200, 42, '5', False, None, 0.75, 'stdlib'))
+    second = run_shard(('hit_below_17', 200, 42, '5', False, None, 0.75, 'stdlib'))
+
+    assert first['outcomes'] == second['outcomes']
+    assert first['net'] == second['net']
+
+def test_run_shard_with_numpy_source() -> None:
+    pytest.importorskip('numpy')
+
+    soft = run_shard(('hit_below_17', 200, 42, '5', True, None, 0.75, 'numpy'))
+
+    assert soft['rounds'] == 200
+
+def test_merge_reports() -> None:
+    reports = [run_shard(('stand', 50, seed, '5', False, 6, 0.75, 'stdlib')) for seed in range(3)]
+
+    merged = merge_reports(reports)
+
+    assert merged['rounds'] == 150
+    outcomes = merged['outcomes']
+    assert outcomes['human'] + outcomes['computer'] + outcomes['draw'] == 150
+    assert merged['net'] == sum(report['net'] for report in reports)
+
+def test_run_parallel_does_not_depend_on_worker_count() -> None:
+    single = run_parallel(400, 'hit_below_17', workers=1, seed=3, shard_size=100)
+    double = run_parallel(400, 'hit_below_17', workers=2, seed=3, shard_size=100)
+
+    assert single['rounds'] == 400
+    assert single['outcomes'] == double['outcomes']
+    assert single['busts'] == double['busts']
+    assert single['net'] == double['net']
@@ -0,0 +1,96 @@
+import importlib.util
+import random
+import pytest
+
+from modules.model.model import Model, build_seeded_deck
+from modules.model.rng import NumpyRandom, StdlibRandom, get_random_source
+from modules.model.shoe import Shoe, build_shoe_cards
+from modules.storage.memory_storage import MemoryStorage
+from modules.utils.compact_cards import generate_compact_deck
+
+# numpy is optional, NumpyRandom is only tested where it is installed
+requires_numpy = pytest.mark.skipif(importlib.util.find_spec('numpy') is None, reason='NumpyRandom needs numpy')
+
+SOURCES = [StdlibRandom, pytest.param(NumpyRandom, marks=requires_numpy)]
+
+
+def play_rounds(rng: object, rounds: int, shoe: bool = False) -> list:
+    storage = MemoryStorage(keep_finished=False, compact_cards=True)
+    model = Model(storage, rng, shoe=Shoe(storage.new_deck, 2, rng=rng) if shoe else None) # type: ignore
+    games = []
+
+    for _ in range(rounds):
+        model.start({ 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } })
+        model.change_state({ 'action': 'Пас' })
+        games.append(model.get_current_game()['state'])
+
+    return games
+
+
+@pytest.mark.parametrize('source', SOURCES)
+def test_batch_api(source: type) -> None:
+    rng = source(7)
+    deck = generate_compact_deck()
+    cards = list(range(52))
+    rng.shuffle(deck)
+    rng.shuffle(cards)
+
+    assert sorted(deck) == list(range(52))
+    assert sorted(cards) == list(range(52))
+    assert sorted(rng.permutation(10)) == list(range(10))
+
+    drawn = rng.draw(cards, 5)
+
+    assert len(set(drawn)) == 5
+    assert set(drawn) <= set(cards)
+
+    with pytest.raises(ValueError):
+        rng.draw(cards, 53)
+
+    for bits in (1, 20, 64, 100):
+        assert 0 <= rng.getrandbits(bits) < 1 << bits
+
+@pytest.mark.parametrize('source', SOURCES)
+def test_same_seed_replays_the_same_games(source: type) -> None:
+    assert play_rounds(source(11), 20) == play_rounds(source(11), 20)
+    assert play_rounds(source(11), 20, shoe=True) == play_rounds(source(11), 20, shoe=True)
+    assert play_rounds(source(11), 20) != play_rounds(source(12), 20)
+
+def test_stdlib_random_instances_are_still_accepted() -> None:
+    assert play_rounds(random.Random(3), 5) == play_rounds(StdlibRandom(3), 5)
+    assert isinstance(get_random_source(), StdlibRandom)
+
+    rng = StdlibRandom(1)
+    assert get_random_source(rng) is rng
+
+@requires_numpy
+def test_seeded_deck_and_shoe_deal_from_the_injected_source() -> None:
+    storage = MemoryStorage(compact_cards=True)
+    model = Model(storage, NumpyRandom(5), seeded_deck=True)
+    model.start({ 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } })
+    state = model.get_current_game()['state']
+
+    assert state['deck_rng'] == 'numpy'
+    assert build_seeded_deck(generate_compact_deck(), state['deck_seed'], rng='numpy') != build_seeded_deck(generate_compact_deck(), state['deck_seed'])
+
+    # the stored source name, not the resuming table's source, decides the order that is replayed
+    resumed = Model(storage, StdlibRandom(1), seeded_deck=True)
+    resumed.start({ 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } })
+    model.change_state({ 'action': 'Взять карту' })
+    resumed.change_state({ 'action': 'Взять карту' })
+
+    assert resumed.get_current_game()['state'] == model.get_current_game()['state']
+
+    shoe = Shoe(generate_compact_deck, 2, rng=NumpyRandom(3))
+    shoe.shuffle()
+
+    assert shoe.source == 'numpy'
+    assert shoe.remaining() == build_shoe_cards(generate_compact_deck, 2, shoe.seed, 'numpy') # type: ignore
+    assert shoe.remaining() != build_shoe_cards(generate_compact_deck, 2, shoe.seed) # type: ignore
+
+def test_seeded_dealing_needs_a_registered_source() -> None:
+    class CustomRandom(StdlibRandom):
+        pass
+
+    with pytest.raises(Exception):
+        Shoe(generate_compact_deck, rng=CustomRandom(1))
@@ -0,0 +1,281 @@
+import asyncio
+import glob
+import json
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+from modules.server.server import GameServer, file_storage_factory
+from modules.server.tokens import PlayerTokens
+from modules.view.network_view import ERROR_MESSAGE, IDENTITY_MESSAGE, decode_message, encode_message
+
+Client = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+def run_with_server(scenario: Callable[[GameServer], Awaitable[None]], **options: Any) -> None:
+    async def main() -> None:
+        server = GameServer(**options)
+        await server.start()
+
+        try:
+            await scenario(server)
+        finally:
+            await server.close()
+
+    asyncio.run(main())
+
+
+async def connect(server: GameServer, player_id: Optional[str] = None, token: Optional[str] = None) -> Client:
+    client = await asyncio.open_connection('127.0.0.1', server.port)
+    client[1].write(encode_message('INIT', None if player_id is None else { 'player_id': player_id, 'token': token }))
+
+    return client
+
+
+async def send(client: Client, message_type: str, data: Any = None) -> dict:
+    reader, writer = client
+    writer.write(encode_message(message_type, data))
+    await writer.drain()
+
+    return await receive(client)
+
+
+async def receive(client: Client) -> dict:
+    return dict(decode_message(await asyncio.wait_for(client[0].readline(), 5)))
+
+
+async def wait_for_sessions(server: GameServer, count: int) -> None:
+    for _ in range(500):
+        if server.sessions == count:
+            return
+
+        await asyncio.sleep(0.01)
+
+    raise Exception(f'Server still has {server.sessions} sessions')
+
+
+def test_play_round_over_socket() -> None:
+    async def scenario(server: GameServer) -> None:
+        client = await connect(server)
+        greeting = await receive(client)
+
+        assert greeting['type'] == 'INIT'
+        assert greeting['data']['available_bets'] == ['5', '25', '50']
+
+        change_state = await send(client, 'INIT', { 'bet': '5' })
+
+        assert change_state['type'] == 'CHANGE_STATE'
+        assert len(change_state['data']['state']['human_cards']) == 2
+        assert change_state['data']['state']['computer_cards_count'] == 2
+        assert 'deck' not in change_state['data']['state']
+        assert 'computer_cards' not in change_state['data']['state']
+
+        finish = await send(client, 'USER_ACTION', { 'action': 'Пас' })
+
+        assert finish['type'] == 'FINISH'
+        assert finish['data']['game']['finished']
+        assert 'computer_cards' in finish['data']['game']['state']
+        assert finish['data']['statistics']['balance']['freeze_human_balance'] == 0
+
+        next_round = await send(client, 'INIT', { 'bet': '5' })
+
+        assert next_round['type'] == 'CHANGE_STATE'
+
+        client[1].close()
+
+    run_with_server(scenario)
+
+def test_rejects_invalid_messages() -> None:
+    async def scenario(server: GameServer) -> None:
+        client = await connect(server)
+        await receive(client)
+
+        assert (await send(client, 'USER_ACTION', { 'action': 'Пас' }))['type'] == ERROR_MESSAGE
+        assert (await send(client, 'INIT', { 'bet': '1000' }))['type'] == ERROR_MESSAGE
+        assert (await send(client, 'RESTART', { 'bet': '5' }))['type'] == ERROR_MESSAGE
+        assert (await send(client, 'FINISH'))['type'] == ERROR_MESSAGE
+
+        client[1].write(b'not json\n')
+        assert (await receive(client))['type'] == ERROR_MESSAGE
+
+        assert (await send(client, 'INIT', { 'bet': '5' }))['type'] == 'CHANGE_STATE'
+        assert (await send(client, 'INIT', { 'bet': '5' }))['type'] == ERROR_MESSAGE
+        assert (await send(client, 'USER_ACTION', { 'action': 'Сдаюсь' }))['type'] == ERROR_MESSAGE
+
+        client[1].close()
+
+    run_with_server(scenario)
+
+def test_sessions_have_isolated_storage() -> None:
+    async def scenario(server: GameServer) -> None:
+        first = await connect(server)
+        second = await connect(server)
+        await receive(first)
+        await receive(second)
+
+        await send(first, 'INIT', { 'bet': '50' })
+        finish = await send(first, 'USER_ACTION', { 'action': 'Пас' })
+
+        assert finish['type'] == 'FINISH'
+
+        assert (await send(second, 'INIT', { 'bet': '5' }))['type'] == 'CHANGE_STATE'
+
+        third = await connect(server)
+        greeting = await receive(third)
+
+        assert greeting['data']['balance'] == { 'human': 100, 'computer': 500, 'freeze_human_balance': 0 }
+
+        for client in (first, second, third):
+            client[1].close()
+
+    run_with_server(scenario)
+
+def test_holds_many_idle_sessions() -> None:
+    async def scenario(server: GameServer) -> None:
+        clients = await asyncio.gather(*(connect(server) for _ in range(1000)))
+        await asyncio.gather(*(receive(client) for client in clients))
+
+        assert server.sessions == 1000
+
+        for _, writer in clients:
+            writer.close()
+
+        for _ in range(100):
+            if server.sessions == 0:
+                break
+            await asyncio.sleep(0.01)
+
+        assert server.sessions == 0
+
+    run_with_server(scenario)
+
+def test_closes_idle_sessions_after_timeout() -> None:
+    async def scenario(server: GameServer) -> None:
+        reader, writer = await connect(server)
+        await receive((reader, writer))
+
+        assert await asyncio.wait_for(reader.readline(), 5) == b''
+
+        writer.close()
+
+    run_with_server(scenario, idle_timeout=0.05)
+
+def test_encode_message_is_one_json_line() -> None:
+    line = encode_message('CHANGE_STATE', { 'action': 'Пас' })
+
+    assert line.endswith(b'\n')
+    assert line.count(b'\n') == 1
+    assert json.loads(line) == { 'type': 'CHANGE_STATE', 'data': { 'action': 'Пас' } }
+
+def test_file_storage_factory_shards_sessions(tmp_path: str) -> None:
+    async def scenario(server: GameServer) -> None:
+        clients = [await connect(server) for _ in range(2)]
+
+        for client in clients:
+            await receive(client)
+            assert (await send(client, 'INIT', { 'bet': '5' }))['type'] == 'CHANGE_STATE'
+            client[1].close()
+
+    run_with_server(scenario, storage_factory=file_storage_factory(str(tmp_path)), offload=True)
+
+    assert len(glob.glob(os.path.join(tmp_path, 'players', '*', '*', 'history.json'))) == 2
+
+def test_returning_player_gets_their_shard_back(tmp_path: str) -> None:
+    async def scenario(server: GameServer) -> None:
+        client = await connect(server, 'alice')
+        identity = await receive(client)
+
+        assert identity['type'] == IDENTITY_MESSAGE
+        assert identity['data']['player_id'] == 'alice'
+
+        await receive(client)
+        await send(client, 'INIT', { 'bet': '50' })
+        finish = await send(client, 'USER_ACTION', { 'action': 'Пас' })
+        client[1].close()
+        await wait_for_sessions(server, 0)
+
+        client = await connect(server, 'alice', identity['data']['token'])
+        greeting = await receive(client)
+
+        assert greeting['type'] == 'INIT'
+        assert greeting['data']['balance'] == finish['data']['statistics']['balance']
+
+        stranger = await connect(server, 'bob')
+        await receive(stranger)
+        greeting = await receive(stranger)
+
+        assert greeting['data']['balance'] == { 'human': 100, 'computer': 500, 'freeze_human_balance': 0 }
+
+        for item in (client, stranger):
+            item[1].close()
+
+    run_with_server(scenario, storage_factory=file_storage_factory(str(tmp_path)), offload=True)
+
+    assert len(glob.glob(os.path.join(tmp_path, 'players', '*', '*', 'history.json'))) == 1
+
+def test_rejects_invalid_player_id() -> None:
+    async def scenario(server: GameServer) -> None:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        client = (reader, writer)
+
+        assert (await send(client, 'USER_ACTION', { 'action': 'Пас' }))['type'] == ERROR_MESSAGE
+        assert (await send(client, 'INIT', { 'player_id': 42 }))['type'] == ERROR_MESSAGE
+        assert (await send(client, 'INIT', { 'player_id': 'alice', 'token': 42 }))['type'] == ERROR_MESSAGE
+        assert (await send(client, 'INIT', { 'player_id': 'alice' }))['type'] == IDENTITY_MESSAGE
+        assert (await receive(client))['type'] == 'INIT'
+
+        writer.close()
+
+    run_with_server(scenario)
+
+def test_rejects_a_second_session_for_a_live_player() -> None:
+    async def scenario(server: GameServer) -> None:
+        first = await connect(server, 'alice')
+        token = (await receive(first))['data']['token']
+        await receive(first)
+
+        second = await connect(server, 'alice', token)
+        rejection = await receive(second)
+
+        assert rejection == { 'type': ERROR_MESSAGE, 'data': 'Player is already connected' }
+        assert await asyncio.wait_for(second[0].readline(), 5) == b''
+
+        assert (await send(first, 'INIT', { 'bet': '5' }))['type'] == 'CHANGE_STATE'
+
+        first[1].close()
+        await wait_for_sessions(server, 0)
+
+        third = await connect(server, 'alice', token)
+
+        assert (await receive(third))['type'] == 'INIT'
+
+        third[1].close()
+
+    run_with_server(scenario)
+
+def test_claimed_player_id_needs_its_token(tmp_path: str) -> None:
+    path = os.path.join(str(tmp_path), 'tokens.json')
+
+    async def scenario(server: GameServer) -> None:
+        owner = await connect(server, 'alice')
+        await receive(owner)
+        owner[1].close()
+        await wait_for_sessions(server, 0)
+
+        for token in (None, 'guessed'):
+            intruder = await connect(server, 'alice', token)
+
+            assert await receive(intruder) == { 'type': ERROR_MESSAGE, 'data': 'Player token is invalid' }
+            assert await asyncio.wait_for(intruder[0].readline(), 5) == b''
+
+            intruder[1].close()
+
+    run_with_server(scenario, tokens=PlayerTokens(path))
+
+    tokens = PlayerTokens(path)
+    issued = tokens.authenticate('bob', None)
+
+    assert issued is not None
+    assert PlayerTokens(path).authenticate('bob', issued) is None
+
+    with open(path, 'r') as file:
+        assert issued not in file.read()
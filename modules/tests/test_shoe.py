@@ -0,0 +1,132 @@
+import random
+import pytest
+
+from pytest_mock import MockerFixture
+
+from modules.model.model import Model
+from modules.model.odds import get_game_odds, get_shoe_counts, get_visible_odds, remove_cards
+from modules.model.shoe import RESERVED_CARDS, Shoe, build_shoe_cards
+from modules.simulation.simulation import Simulator, stand_policy
+from modules.storage.memory_storage import MemoryStorage
+from modules.storage.storage import Storage
+from modules.utils.compact_cards import generate_compact_deck, to_compact_card
+from modules.utils.constants import generate_deck
+
+BET = { 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } }
+
+
+def play_round(model: Model) -> None:
+    model.start(BET) # type: ignore
+
+    while not model.get_current_game()['finished']:
+        model.change_state({ 'action': 'Пас' })
+
+
+def test_shoe_deals_every_card_of_every_deck_once() -> None:
+    shoe = Shoe(generate_compact_deck, decks=6, rng=random.Random(1))
+    shoe.shuffle()
+    cards = [to_compact_card(shoe.draw()) for _ in range(len(shoe))]
+
+    assert sorted(cards) == sorted(list(range(52)) * 6)
+    assert cards == build_shoe_cards(generate_compact_deck, 6, shoe.seed) # type: ignore
+
+    with pytest.raises(Exception):
+        shoe.draw()
+
+def test_cut_card_leaves_room_for_a_round() -> None:
+    shoe = Shoe(generate_compact_deck, decks=2, penetration=0.5)
+
+    assert shoe.needs_shuffle()
+
+    shoe.shuffle()
+
+    for _ in range(51):
+        shoe.draw()
+
+    assert not shoe.needs_shuffle()
+
+    shoe.draw()
+
+    assert shoe.needs_shuffle()
+
+    single = Shoe(generate_compact_deck, penetration=1)
+    single.shuffle()
+    single.restore(single.seed, 52 - RESERVED_CARDS) # type: ignore
+
+    assert single.needs_shuffle()
+
+    with pytest.raises(Exception):
+        Shoe(generate_compact_deck, decks=0)
+
+    with pytest.raises(Exception):
+        Shoe(generate_compact_deck, penetration=0)
+
+def test_model_keeps_one_shoe_across_games(mocker: MockerFixture) -> None:
+    storage = MemoryStorage(keep_finished=False, compact_cards=True)
+    rng = random.Random(5)
+    spy = mocker.spy(rng, 'shuffle')
+    shoe = Shoe(storage.new_deck, decks=4, rng=random.Random(7))
+    model = Model(storage, rng, shoe=shoe)
+    dealt: list[int] = []
+
+    for _ in range(10):
+        play_round(model)
+        state = model.get_current_game()['state']
+        dealt.extend(state['computer_cards'] + state['human_cards']) # type: ignore
+
+    assert spy.call_count == 0
+    assert 'deck' not in state
+    assert state['shoe_decks'] == 4
+    assert sorted(dealt) == sorted(build_shoe_cards(storage.new_deck, 4, shoe.seed)[:len(dealt)]) # type: ignore
+    assert state['shoe_cursor'] == len(dealt)
+
+def test_model_without_shoe_shuffles_once(mocker: MockerFixture) -> None:
+    storage = MemoryStorage(keep_finished=False)
+    rng = random.Random(3)
+    spy = mocker.spy(rng, 'shuffle')
+
+    play_round(Model(storage, rng))
+
+    assert spy.call_count == 1
+
+def test_shoe_game_resumes_from_storage(tmp_path: str) -> None:
+    model = Model(Storage(base_path=str(tmp_path)), shoe=Shoe(generate_deck, decks=2))
+    model.start(BET) # type: ignore
+
+    resumed = Model(Storage(base_path=str(tmp_path)))
+    resumed.start(BET) # type: ignore
+
+    assert resumed.get_current_game()['state'] == model.get_current_game()['state']
+
+    model.change_state({ 'action': 'Взять карту' })
+    resumed.change_state({ 'action': 'Взять карту' })
+
+    assert resumed.get_current_game()['state'] == model.get_current_game()['state']
+
+def test_resized_shoe_keeps_its_penetration(tmp_path: str) -> None:
+    model = Model(Storage(base_path=str(tmp_path)), shoe=Shoe(generate_deck, decks=6))
+    model.start(BET) # type: ignore
+
+    resumed = Model(Storage(base_path=str(tmp_path)), shoe=Shoe(generate_deck, decks=2, penetration=0.5))
+    resumed.start(BET) # type: ignore
+
+    assert resumed._shoe is not None
+    assert resumed._shoe.decks == 6
+    assert resumed._shoe.penetration == 0.5
+
+def test_odds_follow_the_shoe() -> None:
+    storage = MemoryStorage(keep_finished=False)
+    shoe = Shoe(storage.new_deck, decks=2)
+    model = Model(storage, shoe=shoe)
+    model.start(BET) # type: ignore
+    state = model.get_current_game()['state']
+
+    # the cards left in the shoe are never shown, only the player's own hand comes out of the unseen pool
+    assert get_game_odds(model.get_current_game()) == get_visible_odds(state['human_cards'], 2, remove_cards(get_shoe_counts(2), state['human_cards']))
+
+def test_simulator_deals_from_a_shoe() -> None:
+    report = Simulator(stand_policy, rng=random.Random(2), decks=6).run(300)
+
+    assert report['rounds'] == 300
+    outcomes = report['outcomes']
+    assert outcomes['human'] + outcomes['computer'] + outcomes['draw'] == 300
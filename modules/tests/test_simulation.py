@@ -0,0 +1,48 @@
+from modules.simulation.simulation import POLICIES, Simulator, hit_below_17_policy, stand_policy
+from modules.storage.memory_storage import MemoryStorage
+from modules.storage.storage import Game
+from modules.utils.compact_cards import get_card_score
+
+
+def test_run_reports_outcomes() -> None:
+    report = Simulator(stand_policy).run(200)
+
+    assert report['rounds'] == 200
+    outcomes = report['outcomes']
+    assert outcomes['human'] + outcomes['computer'] + outcomes['draw'] == 200
+    assert report['total_wagered'] == 200 * 5
+    assert report['hands_per_second'] > 0
+
+def test_play_round_follows_policy_and_dealer_rule() -> None:
+    simulator = Simulator(stand_policy)
+
+    for _ in range(50):
+        game = simulator.play_round()
+        computer_cards = game['state']['computer_cards']
+        dealt_score = sum(get_card_score(card) for card in computer_cards[:2])
+
+        assert game['finished'] == True
+        assert len(game['state']['human_cards']) == 2
+        assert len(computer_cards) == (3 if dealt_score < 17 else 2)
+
+def test_payouts_match_balance() -> None:
+    storage = MemoryStorage(balance={ 'human': 10 ** 6, 'computer': 10 ** 6, 'freeze_human_balance': 0 }, keep_finished=False)
+
+    report = Simulator(hit_below_17_policy, bet='25', storage=storage).run(300)
+
+    assert report['refills'] == 0
+    assert storage.get_balance()['human'] - 10 ** 6 == report['net']
+    assert storage.get_balance()['computer'] - 10 ** 6 == -report['net']
+    assert len(storage.get_all_games()) == 1
+
+def test_custom_policy() -> None:
+    seen: list[Game] = []
+
+    def policy(game: Game) -> str:
+        seen.append(game)
+        return 'Пас'
+
+    Simulator(policy).run(10) # type: ignore
+
+    assert len(seen) == 10
+    assert set(POLICIES.keys()) >= { 'stand', 'hit_below_17' }
@@ -0,0 +1,105 @@
+import pytest
+
+from modules.storage.sqlite_storage import SqliteStorage
+from modules.storage.storage import Storage
+
+
+@pytest.fixture
+def storage(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> SqliteStorage:
+    monkeypatch.chdir(tmp_path)
+    return SqliteStorage()
+
+
+def test_get_current_game_creates_history(storage: SqliteStorage) -> None:
+    assert storage.has_last_not_ended_game() == False
+
+    current_game = storage.get_current_game()
+
+    assert storage.has_last_not_ended_game() == True
+    assert storage.get_balance() == storage.get_default_balance()
+    assert storage.get_all_games() == [current_game]
+    assert storage.get_current_game() == current_game
+
+def test_update_game_in_history_replaces_last_game(storage: SqliteStorage) -> None:
+    current_game = storage.get_current_game()
+    current_game['events'].append({ 'gamer': 'human', 'value': 5, 'status': 'MADE' })
+    current_game['state']['human_cards'].append(current_game['state']['deck'].pop())
+
+    storage.update_game_in_history(current_game)
+
+    assert storage._get_last_game() == current_game
+
+    storage.update_game_in_history({ **current_game, 'finished': True, 'winner': 'computer' }) # type: ignore
+    next_game = storage.get_current_game()
+
+    assert storage.has_last_not_ended_game() == True
+    assert [game['game_uuid'] for game in storage.get_all_games()] == [current_game['game_uuid'], next_game['game_uuid']]
+    assert storage.get_all_games()[0]['events'] == current_game['events']
+
+def test_update_balance(storage: SqliteStorage) -> None:
+    storage.get_current_game()
+
+    storage.update_balance({ 'human': 90, 'computer': 510, 'freeze_human_balance': 0 })
+
+    assert storage.get_balance() == { 'human': 90, 'computer': 510, 'freeze_human_balance': 0 }
+
+def test_failed_transaction_keeps_previous_state(storage: SqliteStorage) -> None:
+    current_game = storage.get_current_game()
+    broken_game = { **current_game, 'events': [{ 'gamer': 'human', 'value': None, 'status': 'MADE' }] }
+
+    with pytest.raises(Exception):
+        storage.update_game_in_history(broken_game) # type: ignore
+
+    assert storage.get_all_games() == [current_game]
+
+def test_remove_history_file(storage: SqliteStorage) -> None:
+    storage.get_current_game()
+
+    storage.remove_history_file()
+
+    assert storage.has_last_not_ended_game() == False
+    assert storage.get_all_games() == []
+    with pytest.raises(Exception):
+        storage.get_balance()
+
+def test_import_history_file(storage: SqliteStorage) -> None:
+    json_storage = Storage()
+    game = json_storage.get_current_game()
+    game['events'].append({ 'gamer': 'human', 'value': 25, 'status': 'MADE' })
+    json_storage.update_game_in_history(game)
+    json_storage.update_balance({ 'human': 75, 'computer': 500, 'freeze_human_balance': 25 })
+
+    assert storage.import_history_file() == True
+    assert storage.import_history_file() == False
+    assert storage.get_all_games() == json_storage.get_all_games()
+    assert storage.get_balance() == json_storage.get_balance()
+
+def test_commit_changes(storage: SqliteStorage) -> None:
+    first_game = storage.get_current_game()
+    finished_game = { **first_game, 'finished': True, 'winner': 'human' }
+    next_game = storage._create_new_game()
+
+    storage.commit_changes({ 'human': 105, 'computer': 495, 'freeze_human_balance': 0 }, [finished_game, next_game]) # type: ignore
+
+    assert storage.get_all_games() == [finished_game, next_game]
+    assert storage.get_balance()['human'] == 105
+
+def test_opening_an_empty_database_imports_json_and_archived_games(tmp_path: str) -> None:
+    json_storage = Storage(base_path=str(tmp_path))
+
+    for winner in ('human', 'computer'):
+        game = json_storage.get_current_game()
+        json_storage.update_game_in_history({ **game, 'finished': True, 'winner': winner }) # type: ignore
+
+    json_storage.get_current_game()
+
+    assert json_storage.archive_finished_games(fsync=False) == 2
+
+    storage = SqliteStorage(base_path=str(tmp_path))
+
+    assert storage.get_all_games() == json_storage.get_all_games()
+    assert storage.get_balance() == json_storage.get_balance()
+    assert storage.get_aggregates() == json_storage.get_aggregates()
+    assert storage.import_history_file() == False
+
+    storage.close()
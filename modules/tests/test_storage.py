@@ -0,0 +1,185 @@
+import multiprocessing
+import os
+import threading
+import pytest
+
+from modules.storage.journal_storage import JournalStorage
+from modules.storage.memory_storage import MemoryStorage
+from modules.storage.sqlite_storage import SqliteStorage
+from modules.storage.storage import Storage, VersionConflictError, fcntl, get_shard_lock, get_shard_path
+from modules.storage.write_behind_storage import WriteBehindStorage
+
+
+def test_default_storage_keeps_media_history(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    storage = Storage()
+    storage.get_current_game()
+
+    assert os.path.isfile(os.path.join(tmp_path, 'media', 'history.json'))
+
+def test_players_get_separate_shards(tmp_path: str) -> None:
+    first = Storage(player_id='alice', base_path=str(tmp_path))
+    second = Storage(player_id='bob', base_path=str(tmp_path))
+
+    first.get_current_game()
+    first.update_balance({ 'human': 50, 'computer': 550, 'freeze_human_balance': 0 })
+    second.get_current_game()
+
+    assert os.path.isfile(os.path.join(get_shard_path(str(tmp_path), 'alice'), 'history.json'))
+    assert os.path.isfile(os.path.join(get_shard_path(str(tmp_path), 'bob'), 'history.json'))
+    assert first.get_balance()['human'] == 50
+    assert second.get_balance()['human'] == 100
+    assert Storage(player_id='alice', base_path=str(tmp_path)).get_balance()['human'] == 50
+
+def test_shard_path_is_safe_for_any_player_id(tmp_path: str) -> None:
+    path = get_shard_path(str(tmp_path), '../../etc/passwd')
+
+    assert os.path.dirname(os.path.dirname(os.path.dirname(path))) == str(tmp_path)
+    assert get_shard_path(str(tmp_path), 'alice') == get_shard_path(str(tmp_path), 'alice')
+
+def test_shard_locks_are_shared_per_path(tmp_path: str) -> None:
+    first = os.path.join(tmp_path, 'first')
+    second = os.path.join(tmp_path, 'second')
+
+    assert get_shard_lock(first) is get_shard_lock(first)
+    assert get_shard_lock(first) is not get_shard_lock(second)
+
+def test_storages_without_a_shard_do_not_share_a_lock(tmp_path: str) -> None:
+    first = MemoryStorage()
+    second = MemoryStorage()
+    write_behind = WriteBehindStorage(Storage(base_path=str(tmp_path)))
+    entered: list[bool] = []
+
+    def enter_second() -> None:
+        with second.transaction():
+            entered.append(True)
+
+    with first.transaction():
+        thread = threading.Thread(target=enter_second)
+        thread.start()
+        thread.join(timeout=5)
+
+        assert entered == [True]
+
+    assert write_behind._lock is not first._lock
+    assert write_behind._lock is not Storage()._lock
+
+def test_other_shards_do_not_wait_for_transaction(tmp_path: str) -> None:
+    busy = Storage(player_id='busy', base_path=str(tmp_path))
+    idle = Storage(player_id='idle', base_path=str(tmp_path))
+    same_shard = Storage(player_id='busy', base_path=str(tmp_path))
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold_transaction() -> None:
+        with busy.transaction():
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold_transaction)
+    thread.start()
+    entered.wait(5)
+
+    idle.get_current_game()
+    blocked = threading.Thread(target=same_shard.get_current_game)
+    blocked.start()
+    blocked.join(0.05)
+
+    assert blocked.is_alive()
+
+    release.set()
+    thread.join()
+    blocked.join()
+
+def test_backends_accept_player_shards(tmp_path: str) -> None:
+    journal = JournalStorage(player_id='alice', base_path=str(tmp_path))
+    sqlite = SqliteStorage(player_id='bob', base_path=str(tmp_path))
+    journal.get_current_game()
+    sqlite.get_current_game()
+    sqlite.close()
+
+    assert os.path.isfile(os.path.join(get_shard_path(str(tmp_path), 'alice'), 'history.json'))
+    assert os.path.isfile(os.path.join(get_shard_path(str(tmp_path), 'bob'), 'history.sqlite3'))
+
+def increment_balance(base_path: str, times: int) -> None:
+    storage = Storage(base_path=base_path, file_lock=True)
+
+    for _ in range(times):
+        with storage.transaction():
+            balance = storage.get_balance()
+            storage.update_balance({ **balance, 'human': balance['human'] + 1 })
+
+def test_writes_replace_history_atomically(tmp_path: str) -> None:
+    storage = Storage(base_path=str(tmp_path))
+    storage.get_current_game()
+    storage.update_balance({ 'human': 90, 'computer': 510, 'freeze_human_balance': 0 })
+
+    assert storage.get_version() == 2
+    assert sorted(os.listdir(tmp_path)) == ['history.json']
+
+def test_readers_never_see_partial_history(tmp_path: str) -> None:
+    storage = Storage(base_path=str(tmp_path))
+    storage.get_current_game()
+    stop = threading.Event()
+    errors: list[Exception] = []
+
+    def read() -> None:
+        reader = Storage(base_path=str(tmp_path))
+
+        while not stop.is_set():
+            try:
+                reader.get_balance()
+            except Exception as error:
+                errors.append(error)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+
+    for index in range(50):
+        storage.add_game_in_history(storage._create_new_game())
+        storage.update_balance({ 'human': index, 'computer': 500, 'freeze_human_balance': 0 })
+
+    stop.set()
+    thread.join()
+
+    assert errors == []
+
+def test_commit_changes_rejects_stale_version(tmp_path: str) -> None:
+    storage = Storage(base_path=str(tmp_path))
+    game = storage.get_current_game()
+    version = storage.get_version()
+
+    storage.commit_changes(None, [game], expected_version=version)
+
+    with pytest.raises(VersionConflictError):
+        storage.commit_changes(None, [game], expected_version=version)
+
+    assert storage.get_version() == version + 1 # type: ignore
+
+def test_write_behind_detects_concurrent_writer(tmp_path: str) -> None:
+    first = WriteBehindStorage(Storage(base_path=str(tmp_path)), durability='interval', interval=60)
+    second = WriteBehindStorage(Storage(base_path=str(tmp_path)), durability='interval', interval=60)
+    Storage(base_path=str(tmp_path)).get_current_game()
+
+    first.update_balance({ 'human': 95, 'computer': 500, 'freeze_human_balance': 5 })
+    second.update_balance({ 'human': 75, 'computer': 500, 'freeze_human_balance': 25 })
+    first.commit()
+
+    with pytest.raises(VersionConflictError):
+        second.commit()
+
+    assert Storage(base_path=str(tmp_path)).get_balance()['human'] == 95
+
+@pytest.mark.skipif(fcntl is None, reason='advisory locks need fcntl')
+def test_file_lock_serialises_processes(tmp_path: str) -> None:
+    Storage(base_path=str(tmp_path)).get_current_game()
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=increment_balance, args=(str(tmp_path), 50)) for _ in range(4)]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+
+    assert Storage(base_path=str(tmp_path)).get_balance()['human'] == 300
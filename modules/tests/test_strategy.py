@@ -0,0 +1,103 @@
+import os
+import random
+import pytest
+
+from modules.model.hand import add_card_score
+from modules.model.strategy import (
+    CARD_PROBABILITIES,
+    HIT,
+    STAND,
+    StrategySolver,
+    StrategyTable,
+    compare_totals,
+    get_state_key,
+    load_strategy_table,
+)
+from modules.simulation.simulation import POLICIES, Simulator
+from modules.storage.storage import Game
+from modules.utils.compact_cards import encode_card
+
+
+@pytest.fixture(scope='module')
+def tables() -> dict[bool, StrategyTable]:
+    return { soft_aces: StrategySolver(soft_aces).solve() for soft_aces in (False, True) }
+
+def get_initial_value(table: StrategyTable, soft_aces: bool) -> float:
+    value = 0.0
+
+    for first, first_probability in CARD_PROBABILITIES.items():
+        for second, second_probability in CARD_PROBABILITIES.items():
+            total, soft = add_card_score(*add_card_score(0, 0, first, soft_aces), second, soft_aces)
+            value += float(first_probability * second_probability) * max(table.get_values(total, soft > 0, 2, False))
+
+    return value
+
+
+def test_compare_totals_follows_model_rules() -> None:
+    assert compare_totals(20, 19) == 1
+    assert compare_totals(18, 22) == 1
+    assert compare_totals(22, 18) == -1
+    assert compare_totals(17, 17) == 0
+    assert compare_totals(23, 22) == 0
+
+def test_dealer_outcomes_are_distributions(tables: dict[bool, StrategyTable]) -> None:
+    for table in tables.values():
+        for key in table._dealer:
+            assert sum(table.get_dealer_outcomes(*key).values()) == pytest.approx(1)
+
+        assert min(table.get_dealer_outcomes(2, True)) >= 17
+
+@pytest.mark.parametrize('soft_aces', [False, True])
+def test_actions(tables: dict[bool, StrategyTable], soft_aces: bool) -> None:
+    table = tables[soft_aces]
+
+    assert table.get_action(11, False, 2, False) == HIT
+    assert table.get_action(20, False, 2, False) == STAND
+    assert table.get_action(21, False, 3, True) == STAND
+
+    stand, hit = table.get_values(21, False, 2, False)
+    assert stand > hit
+
+def test_state_key_reads_player_view() -> None:
+    game: Game = {
+        'game_uuid': '',
+        'events': [],
+        'state': {
+            'human_cards': [encode_card({ 'suit': 'hearts', 'type': 'ace' }), encode_card({ 'suit': 'hearts', 'type': '5' }), 1],
+            'computer_cards': [2, 3, 4],
+            'human_score': 0,
+            'computer_score': 0,
+        },
+        'finished': False,
+        'winner': None,
+    }
+
+    assert get_state_key(game, True) == (16, False, 3, False)
+    assert get_state_key(game, False) == (26, False, 3, False)
+
+    game['state']['human_cards'].append(5)
+
+    assert get_state_key(game, False)[3] is True
+
+def test_table_is_cached_on_disk(tmp_path: str) -> None:
+    path = os.path.join(tmp_path, 'strategy.json')
+    load_strategy_table.cache_clear()
+    table = load_strategy_table(False, path)
+
+    assert os.path.isfile(path)
+    assert load_strategy_table(False, path) is table
+
+    load_strategy_table.cache_clear()
+    loaded = load_strategy_table(False, path)
+
+    assert loaded is not table
+    assert loaded.get_values(16, False, 2, False) == table.get_values(16, False, 2, False)
+
+@pytest.mark.parametrize('soft_aces', [False, True])
+def test_table_value_matches_simulation(tables: dict[bool, StrategyTable], soft_aces: bool, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr('modules.simulation.simulation.load_strategy_table', lambda soft: tables[soft]) # type: ignore
+    policy = POLICIES['basic_strategy_soft_aces' if soft_aces else 'basic_strategy']
+    report = Simulator(policy, rng=random.Random(7), soft_aces=soft_aces).run(4000)
+
+    # a fresh single deck each round versus the infinite deck of the table, plus sampling noise
+    assert report['net'] / report['total_wagered'] == pytest.approx(get_initial_value(tables[soft_aces], soft_aces), abs=0.05)
@@ -0,0 +1,45 @@
+import random
+import pytest
+from pytest_mock import MockerFixture
+
+np = pytest.importorskip('numpy')
+
+from modules.model.model import Model
+from modules.simulation.simulation import Simulator, hit_below_12_policy, hit_below_17_policy, stand_policy
+from modules.storage.memory_storage import MemoryStorage
+from modules.simulation.vectorized import COMPUTER_WINS, DRAW, HUMAN_WINS, encode_decks, play_batch, simulate
+from modules.utils.constants import generate_deck
+
+
+@pytest.mark.parametrize('soft_aces', [False, True])
+@pytest.mark.parametrize('policy, threshold', [(stand_policy, 0), (hit_below_12_policy, 12), (hit_below_17_policy, 17)])
+def test_play_batch_matches_scalar_model(mocker: MockerFixture, policy: object, threshold: int, soft_aces: bool) -> None:
+    seeded = random.Random(2022)
+    decks = []
+
+    for _ in range(300):
+        deck = generate_deck()
+        seeded.shuffle(deck)
+        decks.append(deck)
+
+    mocker.patch('modules.storage.memory_storage.generate_deck', side_effect=[list(deck) for deck in decks])
+    mocker.patch.object(Model, '_shuffle_cards')
+    simulator = Simulator(policy, storage=MemoryStorage(keep_finished=False), soft_aces=soft_aces) # type: ignore
+    codes = { 'human': HUMAN_WINS, 'computer': COMPUTER_WINS, None: DRAW }
+    scalar = []
+
+    for _ in decks:
+        game = simulator.play_round()
+        scalar.append((codes[game['winner']], game['state']['human_score'], game['state']['computer_score']))
+
+    result = play_batch(encode_decks(decks), threshold, soft_aces)
+    vectorized = list(zip(result['winners'].tolist(), result['human_scores'].tolist(), result['computer_scores'].tolist()))
+
+    assert vectorized == scalar
+
+def test_simulate_is_reproducible() -> None:
+    report = simulate(20_000, 17, seed=7, batch_size=3_000)
+
+    assert report == simulate(20_000, 17, seed=7, batch_size=3_000)
+    assert report['human'] + report['computer'] + report['draw'] == 20_000
+    assert -1 <= report['expected_value'] <= 1
@@ -92,3 +92,23 @@ def test_render_finish_screen_if_balance_ended(mocker: MockerFixture, current_ga
     view.render_finish_screen({ 'game': current_game, 'statistics': { 'balance': { **balance, 'human': 0 }, 'winrate': 0.25 }, 'available_bets': ['5', '25', '50'] }) # type: ignore
 
     stub.assert_called_once()
+
+def test_render_compact_cards(mocker: MockerFixture, current_game: Game) -> None:
+    view = View()
+    MockStdout(mocker)
+    print_stub = mocker.patch('builtins.print')
+    current_game['state']['human_cards'] = [0, 51]
+
+    view.render(current_game)
+
+    assert "'Туз Бубны', 'Двойка Трефы'" in print_stub.call_args[0][0]
+
+def test_render_hint(mocker: MockerFixture, current_game: Game) -> None:
+    view = View(hints=True)
+    MockStdout(mocker)
+    print_stub = mocker.patch('builtins.print')
+    mocker.patch('modules.view.view.load_strategy_table').return_value.get_game_action.return_value = 'Пас'
+
+    view.render(current_game)
+
+    assert print_stub.call_args_list[1][0][0] == 'Подсказка: Пас'
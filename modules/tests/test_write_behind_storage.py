@@ -0,0 +1,123 @@
+import json
+import pytest
+from pytest_mock import MockerFixture
+
+from modules.headless import close_model
+from modules.model.model import Model
+from modules.storage.storage import Storage, VersionConflictError
+from modules.storage.write_behind_storage import WriteBehindStorage
+
+
+@pytest.fixture
+def storage(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> Storage:
+    monkeypatch.chdir(tmp_path)
+    return Storage()
+
+def start_payload() -> dict:
+    return { 'bet': { 'value': '5', 'status': 'MADE', 'gamer_type': 'human' } }
+
+
+def test_one_write_per_model_action(mocker: MockerFixture, storage: Storage) -> None:
+    spy = mocker.spy(storage, '_create_history_file')
+    model = Model(WriteBehindStorage(storage))
+
+    model.start(start_payload()) # type: ignore
+
+    assert spy.call_count == 1
+    assert storage.get_balance()['freeze_human_balance'] == 5
+    assert len(storage._get_last_game()['state']['human_cards']) == 2
+
+    model.change_state({ 'action': 'Пас' })
+
+    assert spy.call_count == 2
+    assert storage._get_last_game()['finished'] == True
+    assert storage.get_balance()['freeze_human_balance'] == 0
+
+def test_per_game_durability_defers_writes_until_finish(mocker: MockerFixture, storage: Storage) -> None:
+    spy = mocker.spy(storage, '_create_history_file')
+    write_behind = WriteBehindStorage(storage, durability='game')
+    model = Model(write_behind)
+
+    model.start(start_payload()) # type: ignore
+
+    assert spy.call_count == 0
+    assert write_behind.has_last_not_ended_game() == True
+    assert write_behind.get_balance()['freeze_human_balance'] == 5
+
+    model.change_state({ 'action': 'Пас' })
+
+    assert spy.call_count == 1
+    assert storage.get_all_games() == write_behind.get_all_games()
+
+def test_interval_durability(mocker: MockerFixture, storage: Storage) -> None:
+    spy = mocker.spy(storage, '_create_history_file')
+    write_behind = WriteBehindStorage(storage, durability='interval', interval=3600)
+    model = Model(write_behind)
+
+    model.start(start_payload()) # type: ignore
+    model.change_state({ 'action': 'Пас' })
+
+    assert spy.call_count == 0
+
+    write_behind.commit()
+
+    assert spy.call_count == 1
+    assert storage._get_last_game()['finished'] == True
+
+def test_failed_transaction_is_rolled_back(storage: Storage) -> None:
+    write_behind = WriteBehindStorage(storage, durability='game')
+    write_behind.get_current_game()
+    balance = write_behind.get_balance()
+
+    with pytest.raises(ValueError):
+        with write_behind.transaction():
+            write_behind.update_balance({ **balance, 'human': 0 }) # type: ignore
+            raise ValueError()
+
+    assert write_behind.get_balance() == balance
+
+def test_version_conflict_reloads_backing_storage(storage: Storage) -> None:
+    write_behind = WriteBehindStorage(storage, durability='game')
+    write_behind.get_current_game()
+    write_behind.commit()
+    balance = write_behind.get_balance()
+
+    storage.update_balance({ **balance, 'human': 50 })
+    write_behind.update_balance({ **balance, 'human': 0 })
+
+    with pytest.raises(VersionConflictError):
+        write_behind.commit()
+
+    assert write_behind.get_balance()['human'] == 50
+
+    write_behind.update_balance({ **balance, 'human': 75 })
+    write_behind.commit()
+
+    assert storage.get_balance()['human'] == 75
+
+def test_close_flushes_the_last_interval(storage: Storage) -> None:
+    write_behind = WriteBehindStorage(storage, durability='interval', interval=3600)
+    model = Model(write_behind)
+    model.start(start_payload()) # type: ignore
+    model.change_state({ 'action': 'Пас' })
+
+    close_model(model)
+
+    assert storage._get_last_game()['finished'] == True
+
+    with WriteBehindStorage(storage, durability='interval', interval=3600) as buffered:
+        buffered.update_balance({ **buffered.get_balance(), 'human': 42 })
+
+    assert storage.get_balance()['human'] == 42
+
+def test_broken_history_is_not_reset(storage: Storage) -> None:
+    storage.get_current_game()
+    balance = { 'human': 42, 'computer': 500, 'freeze_human_balance': 0 }
+
+    with open('media/history.json', 'w') as file:
+        json.dump({ 'balance': balance, 'games': [] }, file)
+
+    with pytest.raises(IndexError):
+        WriteBehindStorage(storage).get_current_game()
+
+    assert storage.get_balance() == balance
@@ -0,0 +1,65 @@
+from array import array
+from typing import Iterable, Union
+
+from modules.utils.constants import CARDS, MAP_CARDS_FOR_SCORE, SUITS, Card, CardTypes, Deck, SuitTypes, generate_deck
+
+CompactCard = int
+CompactDeck = Union[array, list[CompactCard]]
+AnyCard = Union[Card, CompactCard]
+
+CARD_TYPES: list[CardTypes] = list(CARDS.keys())
+CARD_SUITS: list[SuitTypes] = list(SUITS.keys())
+
+# card id = suit index * 13 + type index, the same order generate_deck yields cards in
+CARD_IDS: dict[tuple[SuitTypes, CardTypes], CompactCard] = {
+    (card['suit'], card['type']): index for index, card in enumerate(generate_deck())
+}
+CARD_SCORES: bytes = bytes(MAP_CARDS_FOR_SCORE[card['type']] for card in generate_deck())
+
+
+def encode_card(card: Card) -> CompactCard:
+    return CARD_IDS[(card['suit'], card['type'])]
+
+
+def decode_card(card: CompactCard) -> Card:
+    return {'suit': CARD_SUITS[card // len(CARD_TYPES)], 'type': CARD_TYPES[card % len(CARD_TYPES)]}
+
+
+def generate_compact_deck() -> array:
+    return array('B', range(len(CARD_SCORES)))
+
+
+def encode_deck(deck: Iterable[Card]) -> array:
+    return array('B', (encode_card(card) for card in deck))
+
+
+def decode_deck(deck: Iterable[CompactCard]) -> Deck:
+    return [decode_card(card) for card in deck]
+
+
+def to_card(card: AnyCard) -> Card:
+    if isinstance(card, int):
+        return decode_card(card)
+
+    return card
+
+
+def to_compact_card(card: AnyCard) -> CompactCard:
+    if isinstance(card, int):
+        return card
+
+    return encode_card(card)
+
+
+def get_card_type(card: AnyCard) -> CardTypes:
+    if isinstance(card, int):
+        return CARD_TYPES[card % len(CARD_TYPES)]
+
+    return card['type']
+
+
+def get_card_score(card: AnyCard) -> int:
+    if isinstance(card, int):
+        return CARD_SCORES[card]
+
+    return MAP_CARDS_FOR_SCORE[card['type']]
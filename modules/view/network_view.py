@@ -0,0 +1,200 @@
+import asyncio
+import json
+from typing import Any, Literal, Optional, Union
+from typing_extensions import TypedDict
+
+from modules.model.model import BET_STATUS, AvailableBetsWithBalance, FinishPayload, Game
+from modules.observer.async_observer import AsyncObserver
+from modules.storage.storage import State
+from modules.utils.compact_cards import to_card
+from modules.utils.constants import OBSERVER_MESSAGES
+
+Message = TypedDict('Message', { 'type': str, 'data': Any })
+
+Identity = TypedDict('Identity', { 'player_id': Optional[str], 'token': Optional[str] })
+
+Phase = Union[Literal['bet'], Literal['action'], Literal['closed']]
+
+ERROR_MESSAGE = 'ERROR'
+IDENTITY_MESSAGE = 'IDENTITY'
+DEFAULT_BETS = ['5', '25', '50']
+ACTIONS = ['Взять карту', 'Пас']
+HIDDEN_STATE_KEYS = ('deck', 'deck_seed', 'deck_cursor', 'deck_rng', 'shoe_seed', 'shoe_cursor', 'shoe_rng')
+
+
+def encode_message(message_type: str, data: Any = None) -> bytes:
+    return json.dumps({ 'type': message_type, 'data': data }, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def decode_message(line: bytes) -> Message:
+    message = json.loads(line)
+
+    if not isinstance(message, dict) or not isinstance(message.get('type'), str):
+        raise Exception('Message must be an object with a string type')
+
+    return { 'type': message['type'], 'data': message.get('data') }
+
+
+def get_public_game(game: Game, reveal_computer: bool) -> dict:
+    state: State = game['state']
+    public_state: dict[str, Any] = { key: value for key, value in state.items() if key not in HIDDEN_STATE_KEYS }
+    public_state['human_cards'] = [to_card(card) for card in state['human_cards']]
+
+    if reveal_computer:
+        public_state['computer_cards'] = [to_card(card) for card in state['computer_cards']]
+    else:
+        del public_state['computer_cards']
+        del public_state['computer_score']
+        public_state['computer_cards_count'] = len(state['computer_cards'])
+
+    return { **game, 'state': public_state }
+
+
+def get_identity(message: Message) -> Identity:
+    if message['type'] != OBSERVER_MESSAGES['init']:
+        raise Exception(f"Expected {OBSERVER_MESSAGES['init']} message")
+
+    data = message['data'] if isinstance(message['data'], dict) else {}
+    player_id = data.get('player_id')
+    token = data.get('token')
+
+    if player_id is not None and (not isinstance(player_id, str) or player_id == ''):
+        raise Exception('Player id must be a non-empty string')
+
+    if token is not None and (not isinstance(token, str) or token == ''):
+        raise Exception('Token must be a non-empty string')
+
+    return { 'player_id': player_id, 'token': token }
+
+
+class NetworkView(AsyncObserver):
+    _phase: Phase
+    _allowed_bets: list[str]
+    _bet_type: Union[Literal['init'], Literal['restart']]
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, idle_timeout: Optional[float] = None) -> None:
+        super().__init__()
+        self._reader = reader
+        self._writer = writer
+        self._idle_timeout = idle_timeout
+        self._phase = 'bet'
+        self._allowed_bets = []
+        self._bet_type = 'init'
+
+    async def start_game(self, payload: AvailableBetsWithBalance) -> None:
+        self._await_bet(payload)
+        await self._send(OBSERVER_MESSAGES['init'], payload)
+
+    async def render(self, game: Game) -> None:
+        self._phase = 'action'
+        await self._send(OBSERVER_MESSAGES['change_state'], get_public_game(game, reveal_computer=False))
+
+    async def render_finish_screen(self, payload: FinishPayload) -> None:
+        self._await_bet({ 'available_bets': payload['available_bets'], 'balance': payload['statistics']['balance'] })
+        await self._send(OBSERVER_MESSAGES['finish'], { **payload, 'game': get_public_game(payload['game'], reveal_computer=True) })
+
+    async def identify(self) -> Identity:
+        # the opening INIT names the player whose shard the table plays on, anonymous clients leave it out
+        while self._phase != 'closed':
+            line = await self._readline()
+
+            if not line:
+                break
+
+            try:
+                return get_identity(decode_message(line))
+            except Exception as error:
+                await self._send(ERROR_MESSAGE, str(error))
+
+        self._phase = 'closed'
+        raise ConnectionError('Client left before identifying')
+
+    async def send_identity(self, player_id: str, token: str) -> None:
+        await self._send(IDENTITY_MESSAGE, { 'player_id': player_id, 'token': token })
+
+    async def reject(self, reason: str) -> None:
+        await self._send(ERROR_MESSAGE, reason)
+        await self.close()
+
+    async def serve(self) -> None:
+        while self._phase != 'closed':
+            line = await self._readline()
+
+            if not line:
+                break
+
+            try:
+                await self._handle(decode_message(line))
+            except ConnectionError:
+                break
+            except Exception as error:
+                await self._send(ERROR_MESSAGE, str(error))
+
+        self._phase = 'closed'
+
+    async def close(self) -> None:
+        self._phase = 'closed'
+        await super().close()
+        self._writer.close()
+
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def _handle(self, message: Message) -> None:
+        message_type = message['type']
+        data = message['data']
+
+        if message_type == OBSERVER_MESSAGES['user_action']:
+            if self._phase != 'action':
+                raise Exception('No game in progress')
+
+            if not isinstance(data, dict) or data.get('action') not in ACTIONS:
+                raise Exception(f'Action must be one of {ACTIONS}')
+
+            await self.notify(OBSERVER_MESSAGES['user_action'], { 'action': data['action'] })
+            return
+
+        if message_type in (OBSERVER_MESSAGES['init'], OBSERVER_MESSAGES['restart']):
+            if self._phase != 'bet':
+                raise Exception('Game is already in progress')
+
+            if message_type != OBSERVER_MESSAGES[self._bet_type]:
+                raise Exception(f'Expected {OBSERVER_MESSAGES[self._bet_type]} message')
+
+            bet = data.get('bet') if isinstance(data, dict) else None
+
+            if bet not in self._allowed_bets:
+                raise Exception(f'Bet must be one of {self._allowed_bets}')
+
+            await self.notify(message_type, { 'bet': {
+                'value': bet,
+                'status': BET_STATUS['made'],
+                'gamer_type': 'human'
+            }})
+            return
+
+        raise Exception(f'Unknown message type: {message_type}')
+
+    def _await_bet(self, payload: AvailableBetsWithBalance) -> None:
+        balance = payload['balance']
+        self._phase = 'bet'
+
+        if balance['computer'] == 0 or balance['human'] == 0:
+            self._bet_type = 'restart'
+            self._allowed_bets = DEFAULT_BETS
+        else:
+            self._bet_type = 'init'
+            self._allowed_bets = payload['available_bets']
+
+    async def _readline(self) -> bytes:
+        try:
+            return await asyncio.wait_for(self._reader.readline(), self._idle_timeout)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            return b''
+
+    async def _send(self, message_type: str, data: Any = None) -> None:
+        self._writer.write(encode_message(message_type, data))
+        # waits only when the client stops reading, so a slow socket cannot buffer unbounded output
+        await self._writer.drain()
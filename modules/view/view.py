@@ -1,10 +1,11 @@
 from typing import Literal, Optional, Union
 from typing_extensions import TypedDict
-import inquirer
 from modules.model.model import BET_STATUS, AvailableBetsWithBalance, Game, GamerType
+from modules.model.strategy import load_strategy_table
 from modules.observer.observer import Observer
 from modules.storage.storage import Balance
-from modules.utils.constants import CARDS, OBSERVER_MESSAGES, SUITS, Card
+from modules.utils.compact_cards import AnyCard, to_card
+from modules.utils.constants import CARDS, OBSERVER_MESSAGES, SUITS
 
 
 def get_winner(gamer_type: Optional[GamerType]) -> str:
@@ -28,6 +29,11 @@ FinishScreenPayload = TypedDict('FinishScreenPayload', {
 
 
 class View(Observer):
+    def __init__(self, hints: bool = False, soft_aces: bool = False) -> None:
+        super().__init__()
+        self._hints = hints
+        self._soft_aces = soft_aces
+
     def start_game(self, payload: AvailableBetsWithBalance) -> None:
         self._continue_prompt('Приветствую! Готов сыграть в Blackjack?')
         self._check_user_balance(payload)
@@ -35,6 +41,9 @@ class View(Observer):
     def render(self, game: Game) -> None:
         print(self._get_game_info_message(game))
 
+        if self._hints:
+            print(f"Подсказка: {load_strategy_table(self._soft_aces).get_game_action(game, self._soft_aces)}")
+
         answer = self._create_prompt(
             'action',
             message='Ваше действие',
@@ -82,8 +91,9 @@ class View(Observer):
         user_cards = game['state']['human_cards']
         return f"\nКоличество карт у компьютера: {len(game['state']['computer_cards'])}" + " | " + f"Ваше количество очков: {game['state']['human_score']}" + " | " + f"Ваши карты: {', '.join([self._get_card_info(card) for card in user_cards])}"
 
-    def _get_card_info(self, card: Card) -> str:
-        return f"'{CARDS[card['type']]} {SUITS[card['suit']]}'"
+    def _get_card_info(self, card: AnyCard) -> str:
+        info = to_card(card)
+        return f"'{CARDS[info['type']]} {SUITS[info['suit']]}'"
 
     def _continue_prompt(self, text: str) -> None:
         answer = self._create_prompt(
@@ -108,6 +118,9 @@ class View(Observer):
         }})
 
     def _create_prompt(self, key: str, message: str = '', choices: list = []) -> dict:
+        # inquirer drags in blessed and readchar, only a terminal session should pay for them
+        import inquirer
+
         questions = [inquirer.List(key, message=message, choices=choices)]
         answer = inquirer.prompt(questions)
         return answer
@@ -0,0 +1,27 @@
+import argparse
+import json
+
+from modules.storage.journal_storage import JournalStorage
+from modules.storage.sqlite_storage import SqliteStorage
+from modules.storage.storage import Storage
+
+STORAGES: dict[str, type[Storage]] = {
+    'json': Storage,
+    'journal': JournalStorage,
+    'sqlite': SqliteStorage,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Recompute winrate and statistics aggregates from the full history')
+    parser.add_argument('--storage', choices=list(STORAGES.keys()), default='json')
+    parser.add_argument('--player', default=None, help='rebuild the shard of a single player')
+    parser.add_argument('--base-path', default=None, help='storage root, defaults to ./media')
+    args = parser.parse_args()
+
+    aggregates = STORAGES[args.storage](player_id=args.player, base_path=args.base_path).rebuild_aggregates()
+    print(json.dumps(aggregates, indent=2))
+
+
+if __name__ == '__main__':
+    main()
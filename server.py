@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import os
+from typing import Optional
+
+from modules.metrics.instrumentation import enable_instrumentation, write_metrics
+from modules.model.rng import RNG_SOURCES
+from modules.server.server import GameServer, file_storage_factory, memory_storage_factory
+from modules.server.tokens import PlayerTokens
+
+
+async def dump_metrics(path: str, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        write_metrics(path)
+
+
+async def serve(server: GameServer, metrics_file: Optional[str], metrics_interval: float) -> None:
+    if metrics_file is None:
+        await server.serve_forever()
+        return
+
+    enable_instrumentation()
+    dumper = asyncio.create_task(dump_metrics(metrics_file, metrics_interval))
+
+    try:
+        await server.serve_forever()
+    finally:
+        dumper.cancel()
+        write_metrics(metrics_file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serve blackjack tables over newline-delimited JSON')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--idle-timeout', type=float, default=None, help='close sessions idle for this many seconds')
+    parser.add_argument('--soft-aces', action='store_true', help='count aces as 1 or 11')
+    parser.add_argument('--storage-dir', default=None, help='keep each player in their own history shard under this directory, with the tokens that claim them')
+    parser.add_argument('--rng', choices=list(RNG_SOURCES.keys()), default='stdlib', help='random source every table gets its own instance of')
+    parser.add_argument('--metrics-file', default=None, help='record latencies and storage I/O, SQLite writes excluded, dumped here in Prometheus text format')
+    parser.add_argument('--metrics-interval', type=float, default=15.0, help='seconds between metrics dumps')
+    args = parser.parse_args()
+
+    server = GameServer(
+        args.host,
+        args.port,
+        storage_factory=memory_storage_factory if args.storage_dir is None else file_storage_factory(args.storage_dir),
+        offload=args.storage_dir is not None,
+        idle_timeout=args.idle_timeout,
+        soft_aces=args.soft_aces,
+        rng_factory=RNG_SOURCES[args.rng],
+        tokens=PlayerTokens(None if args.storage_dir is None else os.path.join(args.storage_dir, 'tokens.json'))
+    )
+    asyncio.run(serve(server, args.metrics_file, args.metrics_interval))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import json
+
+from modules.model.rng import RNG_SOURCES
+from modules.model.shoe import DEFAULT_PENETRATION
+from modules.simulation.parallel import run_parallel
+from modules.simulation.simulation import POLICIES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Play many headless blackjack rounds across all cores')
+    parser.add_argument('--rounds', type=int, default=100_000)
+    parser.add_argument('--policy', choices=list(POLICIES.keys()), default='hit_below_17')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bet', choices=['5', '25', '50'], default='5')
+    parser.add_argument('--shard-size', type=int, default=10_000)
+    parser.add_argument('--soft-aces', action='store_true', help='count aces as 1 or 11')
+    parser.add_argument('--decks', type=int, default=None, help='deal from a shoe of this many decks instead of a fresh deck per round')
+    parser.add_argument('--penetration', type=float, default=DEFAULT_PENETRATION, help='share of the shoe dealt before the cut card')
+    parser.add_argument('--rng', choices=list(RNG_SOURCES.keys()), default='stdlib', help='random source each shard draws from')
+    args = parser.parse_args()
+
+    report = run_parallel(
+        args.rounds, args.policy, args.workers, args.seed, args.bet, args.shard_size, args.soft_aces, args.decks, args.penetration, args.rng
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()